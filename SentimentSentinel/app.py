@@ -1,9 +1,10 @@
 import streamlit as st
-from utils.news_api import fetch_and_analyze_news, setup_api_keys, categorize_sentiment
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime
+import threading
+import time
+
+# pandas, plotly and the Google client libraries are imported where they are
+# used so the empty-state page paints without waiting for them; warm_start
+# loads them in the background once per process
 
 # Page configuration with a professional, clean look
 st.set_page_config(
@@ -214,6 +215,9 @@ st.markdown("""
 if "news_data" not in st.session_state:
     st.session_state.news_data = None
     
+if "news_data_hash" not in st.session_state:
+    st.session_state.news_data_hash = None
+    
 if "overall_sentiment" not in st.session_state:
     st.session_state.overall_sentiment = None
     
@@ -251,38 +255,68 @@ with col1:
 with col2:
     run_analysis = st.button("✨ Analyze", use_container_width=True)
 
-# Run analysis when button is clicked
-if run_analysis:
-    if search_query:
-        # Save the search query to session state for persistence
-        st.session_state.search_query = search_query
-        
-        # Add to search history
-        if search_query not in st.session_state.search_history:
-            st.session_state.search_history.append(search_query)
-            # Keep only the last 5 searches
-            if len(st.session_state.search_history) > 5:
-                st.session_state.search_history = st.session_state.search_history[-5:]
-        
-        with st.spinner("Analyzing sentiment in news articles..."):
-            # Parse the search terms
-            search_terms = [search_query.strip()]
-            
-            # Fetch news data
-            news_df = fetch_and_analyze_news(
-                queries=search_terms,
-                max_results_per_query=7,  # Increased for better analysis
-                with_progress=True  # Show progress
+# Windows offered when reloading stored articles, in days (None for everything)
+HISTORY_WINDOWS = {"Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90, "All time": None}
+
+# Reload earlier results from the local article store instead of searching again
+if st.toggle("📚 Load from history"):
+    from datetime import datetime, timedelta
+    from utils.article_store import get_default_article_store
+    from utils.view_model import content_hash, overall_sentiment
+
+    store = get_default_article_store()
+    stored_queries = store.queries()
+    if not stored_queries:
+        st.info("No stored articles yet. Results of every analysis are saved here automatically.")
+    else:
+        article_counts = {entry['query']: entry['articles'] for entry in stored_queries}
+        hcol1, hcol2, hcol3 = st.columns([3, 2, 1])
+        with hcol1:
+            history_query = st.selectbox(
+                "Stored query",
+                list(article_counts),
+                format_func=lambda query: f"{query} ({article_counts[query]} articles)",
+                label_visibility="collapsed"
             )
-            
-            # Store in session state
+        with hcol2:
+            history_window = st.selectbox("Window", list(HISTORY_WINDOWS), label_visibility="collapsed")
+        with hcol3:
+            load_history = st.button("Load", use_container_width=True)
+
+        if load_history:
+            days = HISTORY_WINDOWS[history_window]
+            start = datetime.today() - timedelta(days=days) if days is not None else None
+            news_df = store.load([history_query], start=start)
+
+            st.session_state.search_query = history_query
             st.session_state.news_data = news_df
-            
-            # Calculate average sentiment
-            if not news_df.empty:
-                st.session_state.overall_sentiment = news_df['sentiment_score'].mean()
-    else:
-        st.warning("Please enter keywords to analyze.")
+            st.session_state.news_data_hash = content_hash(news_df)
+            st.session_state.overall_sentiment = overall_sentiment(news_df)
+            st.session_state.total_articles_analyzed = len(news_df)
+
+    # Queries kept fresh in the background (recent searches and the watchlist)
+    from utils.refresh_scheduler import get_default_scheduler
+
+    refresh_status = get_default_scheduler().status()
+    if refresh_status:
+        with st.expander(f"🔄 Background refresh ({len(refresh_status)} tracked queries)"):
+            now = datetime.now()
+            st.dataframe(
+                [
+                    {
+                        "Query": entry['query'],
+                        "Watchlist": entry['watchlist'],
+                        "Every (min)": entry['interval_minutes'],
+                        "Last refresh": datetime.fromtimestamp(entry['last_run']).strftime("%H:%M") if entry['last_run'] else "-",
+                        "Next refresh in (min)": max(0, round((entry['next_run'] - now.timestamp()) / 60)),
+                        "New articles": entry['new_articles'],
+                        "Error": entry['error'] or "",
+                    }
+                    for entry in refresh_status
+                ],
+                use_container_width=True,
+                hide_index=True
+            )
 
 # Format sentiment scores for display
 def format_sentiment(sentiment_value):
@@ -295,30 +329,17 @@ def format_sentiment(sentiment_value):
             formatted = "+" + formatted
         return formatted
 
-# Dashboard overview section
-if st.session_state.news_data is not None and not st.session_state.news_data.empty:
-    # Dashboard stats
-    total_articles = len(st.session_state.news_data)
-    positive_articles = len(st.session_state.news_data[st.session_state.news_data['sentiment_score'] > 0.05])
-    negative_articles = len(st.session_state.news_data[st.session_state.news_data['sentiment_score'] < -0.05])
-    neutral_articles = total_articles - positive_articles - negative_articles
-    
-    # Overall sentiment metric
-    overall_sentiment = st.session_state.overall_sentiment
-    
-    # Determine sentiment label and color using Google's palette
-    if overall_sentiment is None:
-        sentiment_label = "Unknown"
-        sentiment_color = "#9AA0A6"  # Google grey
-    elif overall_sentiment > 0.05:
-        sentiment_label = "Positive"
-        sentiment_color = "#34A853"  # Google green
-    elif overall_sentiment < -0.05:
-        sentiment_label = "Negative"
-        sentiment_color = "#EA4335"  # Google red
-    else:
-        sentiment_label = "Neutral"
-        sentiment_color = "#FBBC05"  # Google yellow
+# Render the sentiment dashboard for a set of analyzed articles
+def render_dashboard(news_data, overall_sentiment, total_articles_analyzed, search_query, key_prefix="dashboard", data_hash=None):
+    from utils import tracing
+    from utils.view_model import get_view_model
+    
+    # Counts, categories, figures and cards are computed once per result
+    with tracing.span("render.view_model"):
+        view = get_view_model(news_data, overall_sentiment, data_hash)
+    total_articles = view.total_articles
+    sentiment_label = view.sentiment_label
+    sentiment_color = view.sentiment_color
     
     # Dashboard layout
     st.markdown("<h2 style='text-align: center; margin-top: 2rem; font-family: \"Google Sans\", \"Roboto\", Arial, sans-serif; font-weight: 400; color: #202124;'>Sentiment Analysis Dashboard</h2>", unsafe_allow_html=True)
@@ -349,10 +370,10 @@ if st.session_state.news_data is not None and not st.session_state.news_data.emp
     </div>
     """.format(
         total_articles, 
-        positive_articles,
-        neutral_articles,
-        negative_articles,
-        st.session_state.total_articles_analyzed
+        view.positive_articles,
+        view.neutral_articles,
+        view.negative_articles,
+        total_articles_analyzed
     ), unsafe_allow_html=True)
     
     # Display overall sentiment score in a modern metric box
@@ -366,204 +387,281 @@ if st.session_state.news_data is not None and not st.session_state.news_data.emp
             {sentiment_label}
         </div>
         <div style="font-size: 14px; color: #666; margin-top: 10px;">
-            Based on {total_articles} articles related to "{st.session_state.search_query}"
+            Based on {total_articles} articles related to "{search_query}"
         </div>
     </div>
     """, unsafe_allow_html=True)
     
-    # Add sentiment category for visualization
-    news_df = st.session_state.news_data.copy()
-    news_df['sentiment_category'] = news_df['sentiment_score'].apply(categorize_sentiment)
-    
     # Enhanced visualizations
     col1, col2 = st.columns(2)
     
-    with col1:
-        # Create a professional gauge chart for sentiment
-        fig = go.Figure(go.Indicator(
-            mode = "gauge+number",
-            value = overall_sentiment,
-            domain = {'x': [0, 1], 'y': [0, 1]},
-            title = {'text': "Sentiment Gauge", 'font': {'size': 24}},
-            gauge = {
-                'axis': {'range': [-1, 1], 'tickwidth': 1, 'tickcolor': "darkblue"},
-                'bar': {'color': sentiment_color},
-                'bgcolor': "white",
-                'borderwidth': 2,
-                'bordercolor': "gray",
-                'steps': [
-                    {'range': [-1, -0.05], 'color': 'rgba(234, 67, 53, 0.3)'},  # Google red
-                    {'range': [-0.05, 0.05], 'color': 'rgba(251, 188, 5, 0.3)'}, # Google yellow
-                    {'range': [0.05, 1], 'color': 'rgba(52, 168, 83, 0.3)'}      # Google green
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': overall_sentiment
-                }
-            }
-        ))
-        
-        fig.update_layout(
-            height=300,
-            margin=dict(l=20, r=20, t=50, b=20),
-            paper_bgcolor="white",
-            font={"color": "#1f77b4", "family": "Arial"}
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+    with tracing.span("render.charts"):
+        with col1:
+            st.plotly_chart(view.figures['gauge'], use_container_width=True, key=f"{key_prefix}_gauge")
+            st.plotly_chart(view.figures['distribution'], use_container_width=True, key=f"{key_prefix}_distribution")
         
-        # Sentiment distribution chart - upgraded pie chart
-        sentiment_counts = news_df['sentiment_category'].value_counts().reset_index()
-        sentiment_counts.columns = ['Sentiment', 'Count']
-        
-        # Set a custom color scale for sentiment categories using Google colors
-        color_map = {'positive': '#34A853', 'neutral': '#FBBC05', 'negative': '#EA4335'}
-        
-        fig = px.pie(
-            sentiment_counts, 
-            values='Count', 
-            names='Sentiment',
-            title="<b>Sentiment Distribution</b>",
-            color='Sentiment',
-            color_discrete_map=color_map,
-            hole=0.4,
-        )
-        
-        fig.update_traces(
-            textinfo='percent+label', 
-            textfont_size=14,
-            marker=dict(line=dict(color='#FFFFFF', width=2))
-        )
-        
-        fig.update_layout(
-            legend_title_text='',
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=-0.1,
-                xanchor="center",
-                x=0.5
-            ),
-            height=350,
-            margin=dict(l=20, r=20, t=50, b=80),
-            title_x=0.5,
-            paper_bgcolor="white",
-            font={"family": "Arial"}
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        with col2:
+            st.plotly_chart(view.figures['headlines'], use_container_width=True, key=f"{key_prefix}_headlines")
+            st.plotly_chart(view.figures['sources'], use_container_width=True, key=f"{key_prefix}_sources")
     
-    with col2:
-        # Enhanced horizontal bar chart
-        news_df['abs_sentiment'] = news_df['sentiment_score'].abs()
-        
-        # Sort by absolute sentiment for better visualization
-        sorted_df = news_df.sort_values('abs_sentiment', ascending=False).head(8)
-        
-        # Truncate long titles
-        sorted_df['short_title'] = sorted_df['title'].apply(lambda x: (x[:40] + '...') if len(x) > 40 else x)
+    # News articles section with improved cards
+    st.markdown("<h3 style='margin-top: 2rem; font-family: \"Google Sans\", \"Roboto\", Arial, sans-serif; font-weight: 400; color: #202124;'>Top News Articles</h3>", unsafe_allow_html=True)
+    
+    # Cards for every article, strongest sentiment first, in a single element
+    with tracing.span("render.cards"):
+        st.markdown(view.cards_html, unsafe_allow_html=True)
+
+# Render rolling sentiment and a daily trend for a query from the stored aggregates
+def render_trend(query, key_prefix="trend"):
+    import plotly.express as px
+    from utils.article_store import get_default_article_store
+
+    aggregates = get_default_article_store().aggregates
+    rolling = aggregates.rolling(query)
+    if not rolling[max(rolling)]['count']:
+        return
+
+    st.markdown("<h3 style='margin-top: 2rem; font-family: \"Google Sans\", \"Roboto\", Arial, sans-serif; font-weight: 400; color: #202124;'>Sentiment Trend</h3>", unsafe_allow_html=True)
+
+    # Rolling windows, read from per-day totals rather than the articles
+    window_labels = {1: "Last 24 Hours", 7: "Last 7 Days", 30: "Last 30 Days"}
+    boxes = "".join(f"""
+        <div class="stat-box">
+            <div class="stat-value">{format_sentiment(totals['mean'])}</div>
+            <div class="stat-label">{window_labels[window]} ({totals['count']} articles)</div>
+        </div>""" for window, totals in rolling.items())
+    st.markdown(f"""
+    <div class="dashboard-stats">{boxes}
+    </div>
+    """, unsafe_allow_html=True)
+
+    daily = aggregates.daily(query)
+    fig = px.line(
+        daily,
+        x='day',
+        y='mean',
+        markers=True,
+        title="<b>Daily Average Sentiment (30 days)</b>",
+        labels={'day': 'Day', 'mean': 'Avg. Sentiment', 'count': 'Articles'},
+        hover_data=['count'],
+        color_discrete_sequence=['#1a73e8']
+    )
+
+    fig.add_hline(y=0, line_dash="dash", line_color="gray")
+
+    fig.update_layout(
+        height=300,
+        margin=dict(l=20, r=20, t=50, b=20),
+        title_x=0.5,
+        xaxis_title="",
+        yaxis_title="Average Sentiment",
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        font={"family": "Arial"}
+    )
+
+    st.plotly_chart(fig, use_container_width=True, key=f"{key_prefix}_daily")
+
+# Follow an analysis job in the worker processes, drawing partial results, until it finishes
+def wait_for_job(job_id, search_query):
+    from utils.job_queue import POLL_INTERVAL, QUEUED, get_default_job_queue
+    from utils.view_model import overall_sentiment
+    
+    queue = get_default_job_queue()
+    job = queue.get(job_id)
+    if job is None:
+        return None
+    st.write(f"Date Range: {job.params['start_date'][:10]} to {job.params['end_date'][:10]}")
+    progress = st.progress(0.0)
+    live_dashboard = st.empty()
+    shown = 0
+    while not job.finished:
+        status = "Waiting for a worker..." if job.status == QUEUED else f"Analyzed {job.articles} articles so far..."
+        progress.progress(job.progress, text=status)
         
-        # Create a custom color scale based on sentiment values
-        fig = px.bar(
-            sorted_df, 
-            x='sentiment_score', 
-            y='short_title', 
-            orientation='h',
-            title="<b>Top Headlines by Sentiment Impact</b>",
-            color='sentiment_score',
-            color_continuous_scale=['#EA4335', '#FBBC05', '#34A853'],  # Google colors
-            labels={'sentiment_score': 'Sentiment Score', 'short_title': 'Headline'}
-        )
+        # Partial results are drawn as the worker reports them
+        if job.articles > shown:
+            shown = job.articles
+            partial_df = queue.result(job_id)
+            with live_dashboard.container():
+                render_dashboard(
+                    partial_df,
+                    overall_sentiment(partial_df),
+                    len(partial_df),
+                    search_query,
+                    key_prefix=f"partial_{shown}"
+                )
         
-        # Add a vertical line at x=0 to indicate neutral sentiment
-        fig.add_vline(x=0, line_dash="dash", line_color="gray")
+        time.sleep(POLL_INTERVAL)
+        job = queue.get(job_id)
+        if job is None:
+            break
+    
+    # The full dashboard below replaces the partial one
+    progress.empty()
+    live_dashboard.empty()
+    return job
+
+# Collapsed panel with per-stage timings and counters of the last analysis and render
+def render_debug_panel(traces):
+    from utils.job_queue import get_default_job_queue, get_default_worker_pool
+    from utils.result_cache import get_default_result_cache
+    
+    with st.expander("🐞 Debug: timings"):
+        # Traces as Trace.to_dict(), including those of worker processes
+        for trace in traces:
+            st.markdown(f"**{trace['trace']}** took {trace['duration_ms']:.0f} ms")
+            st.dataframe(trace['stages'], use_container_width=True, hide_index=True)
+            if trace['counters']:
+                st.dataframe(
+                    [{"Counter": name, "Value": value} for name, value in sorted(trace['counters'].items())],
+                    use_container_width=True,
+                    hide_index=True
+                )
         
-        # Format the y-axis labels to truncate long headlines
-        fig.update_traces(hovertemplate='<b>%{customdata}</b><br>Sentiment: %{x:.2f}', customdata=sorted_df['title'])
+        # Searches shared between sessions: through the job queue when workers
+        # run the analyses, through the in-process result cache otherwise
+        pool = get_default_worker_pool()
+        if pool is not None:
+            job_stats = get_default_job_queue().stats()
+            st.caption(
+                f"Shared searches: {job_stats['submitted']} new jobs, {job_stats['coalesced']} joined a running job, "
+                f"{job_stats['reused']} reused a finished one"
+            )
+            st.caption(
+                f"Workers: {pool.alive()} processes; jobs: {job_stats['queued']} queued, "
+                f"{job_stats['running']} running, {job_stats['done']} done, {job_stats['failed']} failed"
+            )
+        else:
+            cache_stats = get_default_result_cache().stats()
+            st.caption(
+                f"Shared results: {cache_stats['entries']} cached ({cache_stats['bytes'] / 1024:.0f} KiB), "
+                f"{cache_stats['hits']} hits, {cache_stats['coalesced']} coalesced, {cache_stats['misses']} computed, "
+                f"{cache_stats['evictions']} evicted"
+            )
+
+# Run analysis when button is clicked
+if run_analysis:
+    if search_query:
+        # Save the search query to session state for persistence
+        st.session_state.search_query = search_query
         
-        fig.update_layout(
-            height=300,
-            margin=dict(l=20, r=20, t=50, b=20),
-            title_x=0.5,
-            xaxis_title="Sentiment Score",
-            yaxis_title="",
-            coloraxis_colorbar=dict(
-                title="Sentiment",
-                tickvals=[-1, 0, 1],
-                ticktext=["Negative", "Neutral", "Positive"],
-            ),
-            paper_bgcolor="white",
-            plot_bgcolor="white",
-            font={"family": "Arial"}
-        )
+        # Add to search history
+        if search_query not in st.session_state.search_history:
+            st.session_state.search_history.append(search_query)
+            # Keep only the last 5 searches
+            if len(st.session_state.search_history) > 5:
+                st.session_state.search_history = st.session_state.search_history[-5:]
         
-        st.plotly_chart(fig, use_container_width=True)
+        # Keep recent searches fresh in the background
+        from utils.refresh_scheduler import get_default_scheduler
+        get_default_scheduler().track(search_query)
         
-        # Source distribution
-        source_sentiment = news_df.groupby('source')['sentiment_score'].mean().reset_index()
-        source_sentiment = source_sentiment.sort_values('sentiment_score', ascending=False)
+        from utils import tracing
+        from utils.job_queue import get_default_job_queue, get_default_worker_pool
         
-        fig = px.bar(
-            source_sentiment,
-            x='source',
-            y='sentiment_score',
-            title="<b>Average Sentiment by News Source</b>",
-            color='sentiment_score',
-            color_continuous_scale=['#EA4335', '#FBBC05', '#34A853'],  # Google colors
-            labels={'sentiment_score': 'Avg. Sentiment', 'source': 'News Source'}
-        )
+        if get_default_worker_pool() is not None:
+            from datetime import datetime, timedelta
+            
+            # Worker processes run the analysis; it is followed below, also
+            # across reruns, until it finishes
+            end_date = datetime.today()
+            st.session_state.job_id = get_default_job_queue().submit(
+                [search_query.strip()],
+                max_results_per_query=7,
+                start_date=end_date - timedelta(days=7),
+                end_date=end_date
+            )
+        else:
+            with st.spinner("Analyzing sentiment in news articles..."), tracing.trace("analysis") as analysis_trace:
+                from utils.news_api import fetch_and_analyze_news
+                from utils.view_model import content_hash, overall_sentiment
+                
+                # Parse the search terms
+                search_terms = [search_query.strip()]
+                
+                # Partial results are drawn here as headlines are scored
+                live_dashboard = st.empty()
+                
+                def show_partial_results(partial_df, update):
+                    with live_dashboard.container():
+                        render_dashboard(
+                            partial_df,
+                            overall_sentiment(partial_df),
+                            len(partial_df),
+                            search_query,
+                            key_prefix=f"partial_{update}"
+                        )
+                
+                # Fetch news data
+                news_df = fetch_and_analyze_news(
+                    queries=search_terms,
+                    max_results_per_query=7,  # Increased for better analysis
+                    with_progress=True,  # Show progress
+                    on_partial=show_partial_results
+                )
+                
+                # The full dashboard below replaces the partial one
+                live_dashboard.empty()
+                
+                # Store in session state, with the hash that keys its view model
+                st.session_state.news_data = news_df
+                st.session_state.news_data_hash = content_hash(news_df)
+                
+                # Calculate average sentiment
+                if not news_df.empty:
+                    st.session_state.overall_sentiment = overall_sentiment(news_df)
+            
+            # Kept for the debug panel below the dashboard
+            st.session_state.last_traces = [analysis_trace.to_dict()]
+    else:
+        st.warning("Please enter keywords to analyze.")
+
+# Analysis running in the worker processes
+if st.session_state.get('job_id'):
+    from utils import tracing
+    from utils.job_queue import FAILED, get_default_job_queue
+    from utils.view_model import content_hash, overall_sentiment
+    
+    with st.spinner("Analyzing sentiment in news articles..."), tracing.trace("analysis") as analysis_trace:
+        job = wait_for_job(st.session_state.job_id, st.session_state.search_query)
+    st.session_state.job_id = None
+    
+    if job is None:
+        st.error("The analysis was lost; please search again.")
+    elif job.status == FAILED:
+        st.error(f"Analysis failed: {job.error}")
+    else:
+        if job.error:
+            st.warning(f"Some results are missing: {job.error}")
+        news_df = get_default_job_queue().result(job.id)
         
-        fig.add_hline(y=0, line_dash="dash", line_color="gray")
+        # Store in session state, with the hash that keys its view model
+        st.session_state.news_data = news_df
+        st.session_state.news_data_hash = content_hash(news_df)
+        st.session_state.total_articles_analyzed = len(news_df)
+        if not news_df.empty:
+            st.session_state.overall_sentiment = overall_sentiment(news_df)
         
-        fig.update_layout(
-            height=350,
-            margin=dict(l=20, r=20, t=50, b=80),
-            title_x=0.5,
-            xaxis_title="",
-            yaxis_title="Average Sentiment",
-            xaxis_tickangle=-45,
-            paper_bgcolor="white",
-            plot_bgcolor="white",
-            font={"family": "Arial"}
+        # The worker's own trace shows where the job's time went
+        st.session_state.last_traces = [analysis_trace.to_dict()] + ([job.timings] if job.timings else [])
+
+# Dashboard overview section
+if st.session_state.news_data is not None and not st.session_state.news_data.empty:
+    from utils import tracing
+    
+    with tracing.trace("render") as render_trace:
+        render_dashboard(
+            st.session_state.news_data,
+            st.session_state.overall_sentiment,
+            st.session_state.total_articles_analyzed,
+            st.session_state.search_query,
+            data_hash=st.session_state.news_data_hash
         )
-        
-        st.plotly_chart(fig, use_container_width=True)
-    
-    # News articles section with improved cards
-    st.markdown("<h3 style='margin-top: 2rem; font-family: \"Google Sans\", \"Roboto\", Arial, sans-serif; font-weight: 400; color: #202124;'>Top News Articles</h3>", unsafe_allow_html=True)
-    
-    # Get headlines with the strongest sentiment (both positive and negative)
-    top_headlines = news_df.sort_values('abs_sentiment', ascending=False)
+        with tracing.span("render.trend"):
+            render_trend(st.session_state.get('search_query', '').strip())
     
-    # Display as modern cards with improved formatting
-    for _, row in top_headlines.iterrows():
-        sentiment = row['sentiment_category']
-        score = row['sentiment_score']
-        
-        st.markdown(f"""
-        <div class="news-card">
-            <div style="display: flex; justify-content: space-between; align-items: flex-start;">
-                <div style="flex: 1;">
-                    <h4 style="margin-top: 0; font-family: 'Google Sans', 'Roboto', Arial, sans-serif; font-weight: 400; color: #202124;">
-                        <a href="{row['link']}" target="_blank" style="color: #1a73e8; text-decoration: none;">
-                            {row['title']}
-                        </a>
-                    </h4>
-                    <p style="color: #5f6368; margin-bottom: 8px; font-size: 14px; font-family: 'Roboto', Arial, sans-serif;">
-                        <span style="font-weight: 500;">Source:</span> {row['source']} | 
-                        <span style="font-weight: 500;">Query:</span> {row['query']}
-                    </p>
-                    <p style="margin-bottom: 0; color: #3c4043; font-family: 'Roboto', Arial, sans-serif; line-height: 1.5;">
-                        {row['snippet']}
-                    </p>
-                </div>
-                <div style="margin-left: 15px;">
-                    <span class="sentiment-badge {sentiment}">{sentiment.upper()}<br>{score:.2f}</span>
-                </div>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+    render_debug_panel(st.session_state.get('last_traces', []) + [render_trace.to_dict()])
 else:
     # Show empty state with improved UI
     st.markdown("""
@@ -616,3 +714,34 @@ st.markdown("""
     </p>
 </div>
 """, unsafe_allow_html=True)
+
+# Load heavy modules and shared resources in the background, once per
+# process, so the first search does not pay for their initialization
+@st.cache_resource(show_spinner=False)
+def warm_start():
+    def load():
+        import plotly.express
+        import plotly.graph_objects
+        from utils.clients import get_registry
+        from utils.job_queue import get_default_worker_pool
+        from utils.news_api import GEMINI_MODEL_NAME, setup_api_keys
+        from utils.refresh_scheduler import get_default_scheduler
+        from utils.search_cache import get_default_search_cache
+        from utils.sentiment_cache import get_default_cache
+        
+        get_default_cache()
+        get_default_search_cache()
+        get_default_scheduler()
+        get_default_worker_pool()
+        
+        api_key, _, gemini_api_key, api_configured = setup_api_keys()
+        if api_configured:
+            registry = get_registry()
+            registry.search_service(api_key)
+            registry.gemini_model(gemini_api_key, GEMINI_MODEL_NAME)
+    
+    thread = threading.Thread(target=load, name="sentigrade-warm-start", daemon=True)
+    thread.start()
+    return thread
+
+warm_start()
@@ -0,0 +1,126 @@
+"""
+Compare memory and dashboard operations on untyped and typed article frames.
+
+The untyped frame is built the way the pipeline used to build it, one dict
+per article, with whatever column types pandas infers and 'Unknown date'
+strings among the dates. The typed frame is built from Article records with article_frame:
+categorical query and source, datetime64 dates with NaT, int8 scores. Both
+then go through the sorts, group-bys and filters the dashboard runs.
+
+Run from the SentimentSentinel directory:
+
+    python -m benchmarks.bench_article_frames --rows 10000 100000 --repeat 5
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from utils.articles import Article, article_frame, typed_articles
+from utils.view_model import build_view_model, overall_sentiment
+
+QUERIES = ["Singapore", "Malaysia", "Thailand", "Vietnam", "Indonesia", "Philippines", "Myanmar", "Cambodia"]
+
+
+def synthetic_records(rows, seed=0):
+    """
+    Articles spread over queries and 50 sources; about one in ten has no date.
+    """
+    rng = np.random.default_rng(seed)
+    now = datetime.today()
+    minutes = rng.integers(0, 7 * 24 * 60, rows).tolist()
+    sources = rng.integers(0, 50, rows).tolist()
+    undated = (rng.random(rows) < 0.1).tolist()
+    scores = (rng.integers(1, 11, rows) * rng.choice([-1, 1], rows)).tolist()
+    articles = [
+        Article(
+            title=f"Headline {i} about regional markets and policy moves",
+            link=f"https://example.com/{i}",
+            snippet="A short synthetic snippet describing the story.",
+            source=f"news{sources[i]}.example.com",
+            date=None if undated[i] else now - timedelta(minutes=minutes[i]),
+        )
+        for i in range(rows)
+    ]
+    return articles, scores
+
+
+def untyped_frame(articles, scores):
+    """
+    One dict per article and inferred column types, as the pipeline used to build them.
+    """
+    frames = []
+    for i, query in enumerate(QUERIES):
+        rows = {
+            position: {
+                'query': query,
+                'title': articles[position].title,
+                'link': articles[position].link,
+                'snippet': articles[position].snippet,
+                'source': articles[position].source,
+                'date': articles[position].date or 'Unknown date',
+                'sentiment_score': scores[position],
+                'duplicate_of': None,
+            }
+            for position in range(i, len(articles), len(QUERIES))
+        }
+        frames.append(pd.DataFrame.from_dict(rows, orient='index'))
+    return pd.concat(frames, ignore_index=True)
+
+
+def typed_frame(articles, scores):
+    frames = []
+    for i, query in enumerate(QUERIES):
+        positions = range(i, len(articles), len(QUERIES))
+        frames.append(article_frame(
+            query,
+            [articles[position] for position in positions],
+            [scores[position] for position in positions],
+            [None] * len(positions),
+        ))
+    return typed_articles(pd.concat(frames, ignore_index=True))
+
+
+def dashboard_operations(news_data):
+    """
+    The per-result work of the dashboard outside plotting.
+    """
+    news_data.sort_values('sentiment_score', key=abs, ascending=False, kind='stable')
+    news_data.groupby('source', observed=True)['sentiment_score'].mean()
+    news_data.groupby('query', observed=True)['sentiment_score'].agg(['mean', 'count'])
+    news_data[news_data['query'] == QUERIES[0]]
+    news_data[news_data['duplicate_of'].isna()]
+    overall_sentiment(news_data)
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000], help="result sizes to compare")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per operation (best is shown)")
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'frame':<8} {'memory MB':>10} {'build ms':>10} {'ops ms':>10} {'view model ms':>14}")
+    for rows in args.rows:
+        articles, scores = synthetic_records(rows)
+        for name, build in (("untyped", untyped_frame), ("typed", typed_frame)):
+            news_data = build(articles, scores)
+            memory = news_data.memory_usage(deep=True).sum() / 1e6
+            build_ms = timed(lambda: build(articles, scores), args.repeat)
+            ops_ms = timed(lambda: dashboard_operations(news_data), args.repeat)
+            view_ms = timed(lambda: build_view_model(news_data, overall_sentiment(news_data)), args.repeat)
+            print(f"{rows:>8} {name:<8} {memory:>10.1f} {build_ms:>10.1f} {ops_ms:>10.1f} {view_ms:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
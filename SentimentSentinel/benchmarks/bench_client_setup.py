@@ -0,0 +1,75 @@
+"""
+Measure per-request client setup and connection time with and without the client registry.
+
+Each simulated request sets up the Custom Search and Gemini clients and
+sends one search to the local fake Custom Search server. The old way
+builds fresh clients, so every search opens a new connection; the
+registry reuses its clients and sends searches over its pooled keep-alive
+connections, which its stats report as ``http_connections``.
+
+Run from the SentimentSentinel directory:
+
+    python -m benchmarks.bench_client_setup --requests 50
+"""
+import argparse
+import os
+import time
+
+import google.generativeai as genai
+from googleapiclient.discovery import build
+
+from benchmarks.fake_server import FakeGoogleServer
+from utils import news_api
+from utils.clients import ClientRegistry
+
+
+def per_request_setup(api_key):
+    """
+    What every search and scoring call used to do before issuing a request.
+    """
+    service = build("customsearch", "v1", developerKey=api_key, cache_discovery=False,
+                    client_options={"api_endpoint": os.environ["CUSTOM_SEARCH_API_ENDPOINT"]})
+    genai.configure(api_key=api_key)
+    genai.GenerativeModel(news_api.GEMINI_MODEL_NAME)
+    service.cse().list(q="markets", cx="cse", num=10, start=1).execute()
+
+
+def registry_setup(registry, api_key):
+    service = registry.search_service(api_key)
+    registry.gemini_model(api_key, news_api.GEMINI_MODEL_NAME)
+    registry.execute(service.cse().list(q="markets", cx="cse", num=10, start=1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50, help="number of simulated requests")
+    parser.add_argument("--latency", type=float, default=0.0, help="fake search response time in seconds")
+    args = parser.parse_args()
+
+    api_key = "fake-key"
+
+    with FakeGoogleServer(search_latency=args.latency) as server, server.environment():
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            per_request_setup(api_key)
+        rebuild_time = time.perf_counter() - start
+
+        registry = ClientRegistry()
+        start = time.perf_counter()
+        registry_setup(registry, api_key)
+        first_time = time.perf_counter() - start
+        for _ in range(args.requests - 1):
+            registry_setup(registry, api_key)
+        registry_time = time.perf_counter() - start
+        steady_time = registry_time - first_time
+
+    print(f"requests:           {args.requests} ({server.search_requests} searches sent)")
+    print(f"rebuild per call:   {rebuild_time / args.requests * 1000:.2f} ms/request, "
+          f"{args.requests} connections")
+    print(f"shared registry:    {registry_time / args.requests * 1000:.3f} ms/request "
+          f"(first {first_time * 1000:.2f} ms, then {steady_time / max(1, args.requests - 1) * 1000:.4f} ms)")
+    print(f"registry stats:     {registry.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Compare sequential, concurrent and batched headline scoring against a local
+fake Gemini.
+
+Run from the SentimentSentinel directory:
+
+    python -m benchmarks.bench_concurrent_scoring --headlines 20 --latency 0.3
+"""
+import argparse
+import os
+import random
+import time
+
+from benchmarks.fake_server import FakeGoogleServer
+from utils import news_api
+
+
+def sequential_baseline(titles, api_key):
+    """
+    The original loop: one blocking call per headline followed by a random sleep.
+    """
+    scores = []
+    for title in titles:
+        scores.append(news_api.gemini_analyze_sentiment(title, api_key))
+        time.sleep(random.uniform(0.5, 1.5))
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--headlines", type=int, default=20, help="number of headlines to score")
+    parser.add_argument("--latency", type=float, default=0.3, help="fake Gemini response time in seconds")
+    parser.add_argument("--concurrency", type=int, default=news_api.DEFAULT_MAX_CONCURRENCY)
+    parser.add_argument("--rps", type=float, default=news_api.DEFAULT_REQUESTS_PER_SECOND)
+    parser.add_argument("--batch-size", type=int, default=news_api.DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    titles = [f"Benchmark headline number {i} about Singapore business" for i in range(args.headlines)]
+
+    with FakeGoogleServer(latency=args.latency) as server:
+        os.environ["GEMINI_API_ENDPOINT"] = server.endpoint
+        api_key = "fake-key"
+
+        start = time.perf_counter()
+        baseline = sequential_baseline(titles, api_key)
+        sequential_time = time.perf_counter() - start
+
+        sequential_requests = server.requests
+
+        start = time.perf_counter()
+        concurrent = news_api.score_headlines(
+            titles,
+            api_key,
+            max_concurrency=args.concurrency,
+            rate_limiter=news_api.TokenBucket(args.rps),
+            batch_size=1,
+        )
+        concurrent_time = time.perf_counter() - start
+        concurrent_requests = server.requests - sequential_requests
+
+        start = time.perf_counter()
+        batched = news_api.score_headlines(
+            titles,
+            api_key,
+            max_concurrency=args.concurrency,
+            rate_limiter=news_api.TokenBucket(args.rps),
+            batch_size=args.batch_size,
+        )
+        batched_time = time.perf_counter() - start
+        batched_requests = server.requests - sequential_requests - concurrent_requests
+
+    assert baseline == concurrent, "concurrent scores must match sequential scores in order"
+    assert baseline == batched, "batched scores must match sequential scores in order"
+
+    print(f"headlines:   {args.headlines}")
+    print(f"sequential:  {sequential_time:.2f}s, {sequential_requests} requests")
+    print(f"concurrent:  {concurrent_time:.2f}s, {concurrent_requests} requests (concurrency={args.concurrency}, rps={args.rps})")
+    print(f"batched:     {batched_time:.2f}s, {batched_requests} requests (batch size={args.batch_size})")
+    print(f"speedup:     {sequential_time / concurrent_time:.1f}x concurrent, {sequential_time / batched_time:.1f}x batched")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Compare publish-date coverage, accuracy and speed of the old and new date extraction.
+
+The fixture corpus (benchmarks/data/search_items.json) holds Custom Search
+items with their dates where real results carry them: in metatags,
+structured data, the snippet prefix or a publishedTime field, as ISO-8601,
+RFC-2822, written or relative dates, plus items without any date. Each
+entry gives the expected publish date; relative dates count back from the
+item's fetchedAt time, which the pipeline stamps on every fetched item.
+
+The old extraction read only publishedTime with a single strptime format.
+The report shows, per place and overall, how many items got a date and how
+many got the right one, then the time per item.
+
+Run from the SentimentSentinel directory:
+
+    python -m benchmarks.bench_date_extraction --repeat 200
+"""
+import argparse
+import json
+import os
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from utils.publish_dates import extract_publish_date
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "data", "search_items.json")
+
+# Dates within this of the expected one count as right
+TOLERANCE = timedelta(minutes=1)
+
+
+def old_extract(item):
+    """
+    Publish date as search_news used to read it.
+    """
+    published_date = item.get('publishedTime', None)
+    if published_date:
+        try:
+            published_date = datetime.strptime(published_date, "%a, %d %b %Y %H:%M:%S %Z")
+        except ValueError:
+            published_date = None
+    return published_date or None
+
+
+def expected_date(text):
+    """
+    Expected date as the naive local time extract_publish_date returns.
+    """
+    if text is None:
+        return None
+    value = datetime.fromisoformat(text)
+    return value.astimezone().replace(tzinfo=None) if value.tzinfo else value
+
+
+def score(extract, corpus):
+    """
+    Per place: items, items with a date, items with the right date (or rightly none).
+    """
+    counts = defaultdict(lambda: [0, 0, 0])
+    for entry in corpus:
+        expected = expected_date(entry["expected"])
+        found = extract(entry["item"])
+        row = counts[entry["where"]]
+        row[0] += 1
+        row[1] += found is not None
+        row[2] += (found is None if expected is None
+                   else found is not None and abs(found - expected) <= TOLERANCE)
+    return counts
+
+
+def microseconds_per_item(extract, corpus, repeat):
+    items = [entry["item"] for entry in corpus]
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in items:
+            extract(item)
+        best = min(best, time.perf_counter() - started)
+    return best / len(items) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixture", default=FIXTURE, help="JSON list of {where, format, expected, item}")
+    parser.add_argument("--repeat", type=int, default=200, help="timed passes over the corpus (best is shown)")
+    args = parser.parse_args()
+
+    with open(args.fixture, encoding="utf-8") as f:
+        corpus = json.load(f)
+
+    results = {name: score(extract, corpus) for name, extract in (("old", old_extract), ("new", extract_publish_date))}
+    places = list(dict.fromkeys(entry["where"] for entry in corpus))
+    print(f"{'place':<20} {'items':>6} {'old dated':>10} {'old right':>10} {'new dated':>10} {'new right':>10}")
+    for place in places + ["all"]:
+        rows = {
+            name: [sum(counts[p][i] for p in (places if place == "all" else [place])) for i in range(3)]
+            for name, counts in results.items()
+        }
+        print(f"{place:<20} {rows['new'][0]:>6} {rows['old'][1]:>10} {rows['old'][2]:>10} "
+              f"{rows['new'][1]:>10} {rows['new'][2]:>10}")
+
+    for name, extract in (("old", old_extract), ("new", extract_publish_date)):
+        print(f"{name}: {microseconds_per_item(extract, corpus, args.repeat):6.2f} µs per item")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Measure near-duplicate headline clustering on a synthetic syndicated corpus.
+
+Every headline in benchmarks/data/labelled_headlines.csv is republished a
+random number of times with the edits syndication typically makes (a
+source suffix, different case or punctuation, a dropped article). The
+report shows how many scoring requests clustering saves, how many copies
+it missed, and whether any distinct stories were merged.
+
+Run from the SentimentSentinel directory:
+
+    python -m benchmarks.bench_dedup --copies 5 --repeat 100
+"""
+import argparse
+import os
+import random
+import time
+
+import pandas as pd
+
+from utils.dedup import DEFAULT_SIMILARITY, HeadlineClusterer
+
+LABELLED_HEADLINES = os.path.join(os.path.dirname(__file__), "data", "labelled_headlines.csv")
+
+SOURCES = ["Reuters", "AP News", "CNBC", "Yahoo Finance", "The Straits Times", "Bloomberg"]
+
+
+def syndicate(title, rng):
+    """
+    One republished copy of a headline.
+    """
+    edit = rng.randrange(4)
+    if edit == 0:
+        title = f"{title} - {rng.choice(SOURCES)}"
+    elif edit == 1:
+        title = f"{title} | {rng.choice(SOURCES)}"
+    elif edit == 2:
+        title = title.upper() + "!"
+    else:
+        title = title.replace(" the ", " ").replace(" a ", " ")
+    return title
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--copies", type=int, default=5, help="most republished copies per story")
+    parser.add_argument("--repeat", type=int, default=100, help="corpora clustered, to time steady state")
+    parser.add_argument("--similarity", type=float, default=DEFAULT_SIMILARITY)
+    args = parser.parse_args()
+
+    originals = pd.read_csv(LABELLED_HEADLINES)['title'].tolist()
+    rng = random.Random(0)
+    corpus = []
+    for story, title in enumerate(originals):
+        corpus.append((story, title))
+        corpus.extend((story, syndicate(title, rng)) for _ in range(rng.randint(0, args.copies)))
+    rng.shuffle(corpus)
+    stories = [story for story, _ in corpus]
+    titles = [title for _, title in corpus]
+
+    clusterer = HeadlineClusterer(args.similarity)
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        representatives = clusterer.cluster(titles)
+    elapsed = (time.perf_counter() - start) / args.repeat
+
+    scored = sum(1 for position, first in enumerate(representatives) if position == first)
+    false_merges = sum(1 for position, first in enumerate(representatives) if stories[position] != stories[first])
+
+    print(f"headlines:        {len(titles)} ({len(originals)} stories)")
+    print(f"scored:           {scored} ({1 - scored / len(titles):.0%} of requests saved)")
+    print(f"missed copies:    {scored - len(originals) + false_merges}")
+    print(f"false merges:     {false_merges}")
+    print(f"clustering time:  {elapsed * 1000:.2f} ms ({elapsed / len(titles) * 1e6:.1f} µs/headline)")
+
+
+if __name__ == "__main__":
+    main()
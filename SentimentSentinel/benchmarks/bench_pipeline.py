@@ -0,0 +1,383 @@
+"""
+End-to-end benchmark of the search -> score -> render pipeline.
+
+Search and Gemini requests go to the local fake server (benchmarks/
+fake_server.py), so runs use no API quota and are repeatable. Four stages
+are measured:
+
+    search    search_news for every query: latency per API call and per query
+    score     score_headlines on the queries' headlines: latency per Gemini
+              request, headlines/sec
+    pipeline  iter_analyze_news over all queries, as the app and the CLI
+              run it: time to first results, latency per query, headlines/sec
+    render    the dashboard's view model (figures, their JSON for the
+              browser and the card HTML) for synthetic results of each size
+
+Every stage also reports its Python memory peak, measured in a separate
+run under tracemalloc so tracing doesn't skew the timings. Results are
+written as JSON; pass two result files to --compare to see what changed.
+
+Run from the SentimentSentinel directory:
+
+    python -m benchmarks.bench_pipeline -o before.json
+    python -m benchmarks.bench_pipeline -o after.json
+    python -m benchmarks.bench_pipeline --compare before.json after.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.fake_server import FakeGoogleServer, fake_search_results
+from utils import news_api
+from utils.articles import typed_articles
+from utils.rate_limiter import AdaptiveRateLimiter
+from utils.sentiment_backends import GeminiBackend
+from utils.view_model import build_view_model, overall_sentiment
+
+QUERIES = ["Singapore", "Malaysia", "Thailand", "Vietnam", "Indonesia", "Philippines", "Myanmar", "Cambodia"]
+
+# Metrics --compare reports, matched on the end of their name
+COMPARED_METRICS = ("p50_ms", "p90_ms", "p99_ms", "headlines_per_sec", "peak_mb", "seconds")
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """
+    Latency summary in milliseconds of samples given in seconds.
+    """
+    if not samples:
+        return {'count': 0}
+    ms = np.asarray(samples) * 1000
+    return {
+        'count': len(samples),
+        'mean_ms': round(float(ms.mean()), 3),
+        'p50_ms': round(float(np.percentile(ms, 50)), 3),
+        'p90_ms': round(float(np.percentile(ms, 90)), 3),
+        'p99_ms': round(float(np.percentile(ms, 99)), 3),
+        'max_ms': round(float(ms.max()), 3),
+    }
+
+
+def peak_memory_mb(fn: Callable[[], object]) -> float:
+    """
+    Peak Python memory allocated while ``fn`` runs, in MB.
+    """
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1e6, 3)
+
+
+class Timings:
+    """
+    Thread-safe list of durations, filled by the timing wrappers below.
+    """
+
+    def __init__(self):
+        self.samples = []
+        self._lock = threading.Lock()
+
+    def wrap(self, fn: Callable) -> Callable:
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.samples.append(time.perf_counter() - started)
+        return timed
+
+
+class TimedBackend(GeminiBackend):
+    """
+    Gemini backend that records how long each request takes.
+    """
+
+    def __init__(self, api_key: str, timings: Timings):
+        super().__init__(api_key)
+        self.score = timings.wrap(super().score)
+        self.score_batch = timings.wrap(super().score_batch)
+
+
+def warm_up(api_key: str) -> None:
+    """
+    Build the API clients and send one request each, so one-time imports
+    and client setup aren't counted in the first stage's latencies.
+    """
+    from utils.clients import execute, get_search_service
+
+    execute(get_search_service(api_key).cse().list(q='"warm up"', cx="warm-up", num=1, start=1))
+    GeminiBackend(api_key).score("warm up")
+
+
+def bench_search(args, api_key, cse_id, start_date, end_date) -> Dict:
+    calls = Timings()
+    per_query = []
+
+    def run():
+        with mock.patch.object(news_api, "execute", calls.wrap(news_api.execute)):
+            for query in QUERIES[:args.queries]:
+                started = time.perf_counter()
+                news_api._search_news(query, api_key, cse_id, args.max_results, start_date, end_date,
+                                      cache=None, max_age=0, incremental=False)
+                per_query.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - started
+    result = {
+        'seconds': round(seconds, 3),
+        'api_call_latency': percentiles(calls.samples),
+        'query_latency': percentiles(per_query),
+    }
+    result['peak_mb'] = peak_memory_mb(run)
+    return result
+
+
+def bench_score(args, api_key) -> Dict:
+    titles = [
+        item['title']
+        for query in QUERIES[:args.queries]
+        for item in fake_search_results(f'"{query}"', args.max_results, match_rate=1.0)
+    ]
+    requests = Timings()
+
+    def run():
+        news_api.score_headlines(
+            titles, api_key,
+            max_concurrency=args.concurrency,
+            rate_limiter=AdaptiveRateLimiter(args.rps),
+            batch_size=args.batch_size,
+            backend=TimedBackend(api_key, requests),
+        )
+
+    started = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - started
+    result = {
+        'headlines': len(titles),
+        'seconds': round(seconds, 3),
+        'headlines_per_sec': round(len(titles) / seconds, 1),
+        'request_latency': percentiles(requests.samples),
+    }
+    result['peak_mb'] = peak_memory_mb(run)
+    return result
+
+
+def bench_pipeline(args, start_date, end_date) -> Dict:
+    queries = QUERIES[:args.queries]
+    first_results = []
+    per_query = []
+    headlines = []
+
+    def run():
+        started = time.perf_counter()
+        first = None
+        scored = 0
+        for chunk in news_api.iter_analyze_news(
+            queries,
+            max_results_per_query=args.max_results,
+            max_concurrency=args.concurrency,
+            requests_per_second=args.rps,
+            batch_size=args.batch_size,
+            use_cache=False,
+            start_date=start_date,
+            end_date=end_date,
+        ):
+            if not chunk.articles.empty:
+                scored += len(chunk.articles)
+                if first is None:
+                    first = time.perf_counter() - started
+            if chunk.query_done:
+                per_query.append(time.perf_counter() - started)
+        first_results.append(first)
+        headlines.append(scored)
+
+    started = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - started
+    result = {
+        'queries': len(queries),
+        'articles': headlines[0],
+        'seconds': round(seconds, 3),
+        'headlines_per_sec': round(headlines[0] / seconds, 1),
+        'first_results_ms': round(first_results[0] * 1000, 3) if first_results[0] is not None else None,
+        'query_latency': percentiles(per_query[:len(queries)]),
+    }
+    result['peak_mb'] = peak_memory_mb(run)
+    return result
+
+
+def synthetic_articles(rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Scored articles shaped like fetch_and_analyze_news output.
+    """
+    rng = np.random.default_rng(seed)
+    positions = np.arange(rows)
+    scores = rng.integers(1, 11, rows) * rng.choice([-1, 1], rows)
+    sources = np.array([f"news{i}.example.com" for i in range(50)])[rng.integers(0, 50, rows)]
+    dates = pd.Timestamp(datetime.today()) - pd.to_timedelta(rng.integers(0, 7 * 24 * 60, rows), unit="min")
+    return typed_articles(pd.DataFrame({
+        'query': np.array(QUERIES)[positions % len(QUERIES)],
+        'title': [f"Headline {i} about regional markets and policy moves" for i in range(rows)],
+        'link': [f"https://example.com/{i}" for i in range(rows)],
+        'snippet': "A short synthetic snippet describing the story.",
+        'source': sources,
+        'date': dates,
+        'sentiment_score': scores,
+        'duplicate_of': None,
+    }))
+
+
+def bench_render(rows: int, repeat: int) -> Dict:
+    news_data = synthetic_articles(rows)
+    overall = overall_sentiment(news_data)
+    build_times = []
+    serialize_times = []
+
+    def run():
+        started = time.perf_counter()
+        view_model = build_view_model(news_data, overall)
+        built = time.perf_counter()
+        for figure in view_model.figures.values():
+            figure.to_json()
+        build_times.append(built - started)
+        serialize_times.append(time.perf_counter() - built)
+        return view_model
+
+    view_model = run()  # warm-up (plotly templates, imports)
+    build_times.clear()
+    serialize_times.clear()
+    for _ in range(repeat):
+        run()
+
+    return {
+        'rows': rows,
+        'build_latency': percentiles(build_times),
+        'figure_json_latency': percentiles(serialize_times),
+        'render_latency': percentiles([a + b for a, b in zip(build_times, serialize_times)]),
+        'cards_html_mb': round(len(view_model.cards_html) / 1e6, 3),
+        'peak_mb': peak_memory_mb(run),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def flatten(report: Dict, prefix: str = "") -> Dict[str, float]:
+    values = {}
+    for key, value in report.items():
+        name = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            values.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[name] = value
+    return values
+
+
+def compare(before_path: str, after_path: str) -> None:
+    """
+    Print the change in every compared metric between two result files.
+    """
+    with open(before_path, encoding="utf-8") as f:
+        before = flatten(json.load(f)['stages'])
+    with open(after_path, encoding="utf-8") as f:
+        after = flatten(json.load(f)['stages'])
+
+    print(f"{'metric':<48} {'before':>12} {'after':>12} {'change':>9}")
+    for name in sorted(before.keys() & after.keys()):
+        if not name.endswith(COMPARED_METRICS):
+            continue
+        old, new = before[name], after[name]
+        change = f"{(new - old) / old:+.1%}" if old else "n/a"
+        print(f"{name:<48} {old:>12.3f} {new:>12.3f} {change:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-o", "--output", help="write the results to this JSON file (default: print them)")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two result files and exit")
+    parser.add_argument("--queries", type=int, default=4, choices=range(1, len(QUERIES) + 1), metavar="N",
+                        help=f"queries searched (1-{len(QUERIES)})")
+    parser.add_argument("--max-results", type=int, default=20, help="articles per query")
+    parser.add_argument("--latency", type=float, default=0.1, help="fake Gemini response time in seconds")
+    parser.add_argument("--search-latency", type=float, default=0.05, help="fake search response time in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of fake requests that fail")
+    parser.add_argument("--concurrency", type=int, default=news_api.DEFAULT_MAX_CONCURRENCY)
+    parser.add_argument("--rps", type=float, default=news_api.DEFAULT_REQUESTS_PER_SECOND)
+    parser.add_argument("--search-rps", type=float, default=news_api.DEFAULT_SEARCH_REQUESTS_PER_SECOND)
+    parser.add_argument("--batch-size", type=int, default=news_api.DEFAULT_BATCH_SIZE)
+    parser.add_argument("--render-rows", type=int, nargs="+", default=[10, 1000, 100000],
+                        help="result sizes the dashboard is rendered for")
+    parser.add_argument("--repeat", type=int, default=5, help="timed renders per size")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    api_key, cse_id, _, _ = news_api.setup_api_keys()
+    end_date = datetime.today()
+    start_date = end_date - timedelta(days=7)
+
+    stages = {}
+    with FakeGoogleServer(latency=args.latency, search_latency=args.search_latency,
+                          error_rate=args.error_rate, match_rate=0.5, seed=args.seed) as server, \
+            server.environment(), \
+            mock.patch.object(news_api, "_search_limiter", AdaptiveRateLimiter(args.search_rps)):
+        warm_up(api_key)
+        stages['search'] = bench_search(args, api_key, cse_id,
+                                        start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"))
+        print(f"search:   {stages['search']['seconds']:.2f}s", file=sys.stderr)
+        stages['score'] = bench_score(args, api_key)
+        print(f"score:    {stages['score']['headlines_per_sec']} headlines/s", file=sys.stderr)
+        stages['pipeline'] = bench_pipeline(args, start_date, end_date)
+        print(f"pipeline: {stages['pipeline']['headlines_per_sec']} headlines/s", file=sys.stderr)
+        requests = {'gemini': server.requests - 1, 'search': server.search_requests - 1, 'errors': server.errors}
+
+    stages['render'] = {}
+    for rows in args.render_rows:
+        stages['render'][str(rows)] = bench_render(rows, args.repeat)
+        print(f"render {rows}: {stages['render'][str(rows)]['render_latency']['p50_ms']:.1f} ms", file=sys.stderr)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec="seconds"),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'arguments': {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+            'fake_server_requests': requests,
+        },
+        'stages': stages,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Compare multi-keyword searches as one quoted phrase and as planned sub-queries.
+
+Comma-separated queries are searched against the local fake Custom Search
+server. The phrase run sends them the way search_news used to, as a single
+quoted "a AND b" phrase, which the fake server, like Custom Search, treats
+as a literal phrase few pages contain. The planned run splits them with
+plan_queries, runs the sub-queries side by side and merges their results.
+The report shows API calls, articles and keywords covered per query, and
+wall time per query.
+
+Run from the SentimentSentinel directory:
+
+    python -m benchmarks.bench_query_planner --max-results 20
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+
+from benchmarks.fake_server import FakeGoogleServer
+from utils import news_api
+from utils.query_planner import SubQuery, keyword_coverage, split_keywords
+from utils.rate_limiter import AdaptiveRateLimiter
+
+QUERIES = [
+    "Singapore, Malaysia",
+    "inflation, interest rates, central bank",
+    "Thailand, Vietnam, Indonesia, Philippines",
+    "Singapore, Malaysia, Thailand, Vietnam, Indonesia, Philippines, Myanmar, Cambodia",
+]
+
+
+def phrase_plan(query):
+    """
+    The single sub-query search_news used to send: all keywords in one quoted phrase.
+    """
+    keywords = [k.strip() for k in query.split(",")]
+    return [SubQuery(text=f'"{" AND ".join(keywords)}"', keywords=tuple(keywords))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-results", type=int, default=20, help="articles wanted per query")
+    parser.add_argument("--search-latency", type=float, default=0.05, help="fake search response time in seconds")
+    args = parser.parse_args()
+
+    end_date = datetime.today()
+    start_date = end_date - timedelta(days=7)
+
+    with FakeGoogleServer(search_latency=args.search_latency) as server, server.environment():
+        api_key, cse_id, _, _ = news_api.setup_api_keys()
+        for name in ("phrase", "planned"):
+            plan = phrase_plan if name == "phrase" else news_api.plan_queries
+            # A fresh limiter so one run's throttling doesn't slow the next
+            with mock.patch.object(news_api, "_search_limiter", AdaptiveRateLimiter(1e6)), \
+                    mock.patch.object(news_api, "plan_queries", plan):
+                print(name)
+                for query in QUERIES:
+                    keywords = [keyword.lower() for keyword in split_keywords(query)]
+                    before = server.search_requests
+                    started = time.perf_counter()
+                    articles = news_api._search_news(query, api_key, cse_id, args.max_results,
+                                                     start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"),
+                                                     None, 0, False)
+                    seconds = time.perf_counter() - started
+                    calls = server.search_requests - before
+                    covered = sum(
+                        1 for keyword in keywords
+                        if any(keyword_coverage(article.title, [keyword]) for article in articles)
+                    )
+                    print(f"  {len(keywords)} keywords  {calls:3d} calls  {len(articles):3d} articles  "
+                          f"{len(articles) / max(1, calls):5.2f} articles/call  "
+                          f"{covered}/{len(keywords)} keywords covered  {seconds * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
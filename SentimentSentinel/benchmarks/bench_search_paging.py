@@ -0,0 +1,120 @@
+"""
+Compare Custom Search calls and latency per query before and after early-exit paging.
+
+A fake Custom Search service answers every query with up to 100 results,
+of which only a fraction mention the query in the title, after a fixed
+per-call latency. The baseline pages until it holds ``max_results`` raw
+items and filters afterwards, as search_news used to, so it returns fewer
+articles than asked for; over-fetch pages through every result to get
+them all. The current path filters as pages arrive and stops once enough
+articles match.
+
+Run from the SentimentSentinel directory:
+
+    python -m benchmarks.bench_search_paging --match-rate 0.3 --max-results 7
+"""
+import argparse
+import random
+import time
+from unittest import mock
+
+from utils import news_api
+
+
+class FakeRequest:
+    def __init__(self, service, start, num):
+        self.service = service
+        self.start = start
+        self.num = num
+
+    def execute(self):
+        self.service.calls += 1
+        time.sleep(self.service.latency)
+        items = self.service.results[self.start - 1:self.start - 1 + self.num]
+        return {'items': items} if items else {}
+
+
+class FakeSearchService:
+    """
+    Stand-in for the Custom Search client with a fixed result list.
+    """
+
+    def __init__(self, query, total, match_rate, latency, seed=0):
+        rng = random.Random(seed)
+        self.latency = latency
+        self.calls = 0
+        self.results = [
+            {
+                'title': f"{query} headline {i}" if rng.random() < match_rate else f"Unrelated headline {i}",
+                'link': f"https://example.com/{i}",
+                'snippet': "",
+                'displayLink': "example.com",
+            }
+            for i in range(total)
+        ]
+
+    def cse(self):
+        return self
+
+    def list(self, q, cx, num, start):
+        return FakeRequest(self, start, num)
+
+
+def baseline_search(service, query, max_results, raw_results=None):
+    """
+    Page until ``raw_results`` raw items (default ``max_results``), then
+    filter, as search_news used to.
+    """
+    raw_results = raw_results or max_results
+    results = []
+    start_index = 1
+    while len(results) < raw_results:
+        batch_size = min(10, raw_results - len(results))
+        items = service.list(q=query, cx="", num=batch_size, start=start_index).execute().get('items', [])
+        if not items:
+            break
+        results.extend(items)
+        start_index += batch_size
+    return [item for item in results[:raw_results] if query.lower() in item['title'].lower()][:max_results]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=20, help="queries searched")
+    parser.add_argument("--max-results", type=int, default=7, help="articles wanted per query")
+    parser.add_argument("--match-rate", type=float, default=0.3, help="share of results whose title matches")
+    parser.add_argument("--total", type=int, default=100, help="results the fake service has per query")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per fake API call")
+    args = parser.parse_args()
+
+    # Paging is what's measured here, not the shared rate limit
+    news_api.get_rate_limiters()['search'].set_rate(1e6)
+
+    for name in ("baseline", "over-fetch", "early exit"):
+        calls = articles = 0
+        start = time.perf_counter()
+        for i in range(args.queries):
+            query = f"topic{i}"
+            service = FakeSearchService(query, args.total, args.match_rate, args.latency, seed=i)
+            if name == "baseline":
+                found = baseline_search(service, query, args.max_results)
+            elif name == "over-fetch":
+                found = baseline_search(service, query, args.max_results, raw_results=args.total)
+            else:
+                with mock.patch.object(news_api, "get_search_service", lambda api_key: service), \
+                        mock.patch.object(news_api, "execute", lambda request: request.execute()):
+                    found = news_api._search_news(query, "fake-key", "fake-cse", args.max_results,
+                                                  None, None, None, 0, False)
+            calls += service.calls
+            articles += len(found)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<11} {calls / args.queries:5.1f} calls/query  "
+              f"{articles / args.queries:5.1f} articles/query  "
+              f"{calls / max(1, articles):5.2f} calls/article  "
+              f"{elapsed / args.queries * 1000:7.1f} ms/query")
+
+    print(f"search stats: {news_api.search_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Compare concurrent sessions running the same search with and without the shared result cache.
+
+Every simulated session searches the same query at the same moment against
+the local fake Gemini and Custom Search server. Without sharing each
+session runs its own pipeline; with the result cache the first session
+runs it and the others wait for its result. The report shows API requests
+made, wall time until every session has its results, and the cache's
+counters.
+
+Run from the SentimentSentinel directory:
+
+    python -m benchmarks.bench_shared_results --sessions 10
+"""
+import argparse
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+
+import pandas as pd
+
+from benchmarks.fake_server import FakeGoogleServer
+from utils import news_api
+from utils.rate_limiter import AdaptiveRateLimiter
+from utils.result_cache import ResultCache
+
+
+def analyze(query, args, start_date, end_date):
+    """
+    One session's pipeline run, without the search and score caches so
+    every run makes its own requests.
+    """
+    frames = [
+        chunk.articles
+        for chunk in news_api.iter_analyze_news(
+            [query],
+            max_results_per_query=args.max_results,
+            use_cache=False,
+            start_date=start_date,
+            end_date=end_date,
+        )
+        if not chunk.articles.empty
+    ]
+    return pd.concat(frames) if frames else pd.DataFrame()
+
+
+def run_sessions(args, cache, start_date, end_date):
+    """
+    Start every session at once; seconds until the last one has its results.
+    """
+    barrier = threading.Barrier(args.sessions)
+    rows = []
+
+    def session():
+        barrier.wait()
+        compute = lambda: analyze(args.query, args, start_date, end_date)
+        if cache is None:
+            result = compute()
+        else:
+            result, _ = cache.get_or_compute(args.query, compute, copy=pd.DataFrame.copy)
+        rows.append(len(result))
+
+    threads = [threading.Thread(target=session) for _ in range(args.sessions)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=10, help="sessions searching at once")
+    parser.add_argument("--query", default="Singapore business")
+    parser.add_argument("--max-results", type=int, default=20, help="articles per query")
+    parser.add_argument("--latency", type=float, default=0.1, help="fake Gemini response time in seconds")
+    parser.add_argument("--search-latency", type=float, default=0.05, help="fake search response time in seconds")
+    args = parser.parse_args()
+
+    end_date = datetime.today()
+    start_date = end_date - timedelta(days=7)
+
+    with FakeGoogleServer(latency=args.latency, search_latency=args.search_latency) as server, \
+            server.environment():
+        for name in ("per session", "shared"):
+            cache = ResultCache() if name == "shared" else None
+            # Fresh limiters so one run's throttling doesn't slow the next
+            with mock.patch.object(news_api, "_search_limiter", AdaptiveRateLimiter(1e6)), \
+                    mock.patch.object(news_api, "_gemini_limiter", AdaptiveRateLimiter(1e6)):
+                before = server.requests + server.search_requests
+                seconds, rows = run_sessions(args, cache, start_date, end_date)
+            requests = server.requests + server.search_requests - before
+            print(f"{name:<12} {requests:5d} API requests  {seconds:6.2f} s  "
+                  f"{sum(rows) / len(rows):5.1f} articles/session")
+            if cache is not None:
+                print(f"cache stats: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Measure Gemini quota saved by tiered scoring and its agreement with labels.
+
+Every headline in benchmarks/data/labelled_headlines.csv is scored locally
+with VADER; only headlines inside the uncertainty band go to Gemini. The
+local fake Gemini answers with the labelled polarity, so the agreement
+figures isolate the accuracy of the headlines VADER kept for itself.
+
+Run from the SentimentSentinel directory:
+
+    python -m benchmarks.bench_tiered_scoring --band -0.5 0.5
+"""
+import argparse
+import os
+
+import pandas as pd
+
+from benchmarks.fake_server import FakeGoogleServer
+from utils import news_api
+from utils.sentiment_analyzer import analyze_sentiment_batch
+from utils.sentiment_cache import SentimentCache
+from utils.tiered_scorer import DEFAULT_UNCERTAINTY_BAND, TieredRouter, vader_to_scale
+
+LABELLED_HEADLINES = os.path.join(os.path.dirname(__file__), "data", "labelled_headlines.csv")
+
+
+def agreement(scores, labels):
+    """
+    Share of scores whose sign matches the label; neutral and failed scores disagree.
+    """
+    if not scores:
+        return 0.0
+    matches = sum(
+        1 for score, label in zip(scores, labels)
+        if score and score is not news_api.SCORE_FAILED and (score > 0) == (label == "positive")
+    )
+    return matches / len(scores)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--band", type=float, nargs=2, default=DEFAULT_UNCERTAINTY_BAND,
+                        metavar=("LOW", "HIGH"), help="VADER compound scores sent to Gemini")
+    parser.add_argument("--latency", type=float, default=0.3, help="fake Gemini response time in seconds")
+    args = parser.parse_args()
+
+    labelled = pd.read_csv(LABELLED_HEADLINES)
+    titles = labelled["title"].tolist()
+    labels = labelled["label"].tolist()
+    oracle = {title: 7 if label == "positive" else -7 for title, label in zip(titles, labels)}
+
+    router = TieredRouter(tuple(args.band))
+    with FakeGoogleServer(latency=args.latency, answers=oracle) as server:
+        os.environ["GEMINI_API_ENDPOINT"] = server.endpoint
+        tiered = news_api.score_headlines(titles, "fake-key", cache=SentimentCache(":memory:"), router=router)
+        gemini_requests = server.requests
+
+    vader_only = vader_to_scale(analyze_sentiment_batch(titles)).tolist()
+    local_positions = [
+        position for position, compound in enumerate(analyze_sentiment_batch(titles))
+        if not args.band[0] <= compound <= args.band[1]
+    ]
+
+    stats = router.stats()
+    print(f"headlines:            {stats['total']}")
+    print(f"scored locally:       {stats['local']}")
+    print(f"sent to Gemini:       {stats['gemini']} ({gemini_requests} requests)")
+    print(f"quota saved:          {stats['quota_saved']:.0%}")
+    print(f"VADER-only agreement: {agreement(vader_only, labels):.0%}")
+    print(f"local-tier agreement: {agreement([tiered[p] for p in local_positions], [labels[p] for p in local_positions]):.0%}")
+    print(f"tiered agreement:     {agreement(tiered, labels):.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Measure analysis job throughput against the number of worker processes.
+
+Distinct searches are submitted to a fresh job queue at once and drained
+by a pool of 1, 2, 4, ... workers running the real pipeline against the
+local fake Gemini and Custom Search server. Caches and the article store
+live in a temporary directory, so every run starts cold.
+
+Run from the SentimentSentinel directory:
+
+    python -m benchmarks.bench_worker_pool --jobs 16 --workers 1 2 4 8
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.fake_server import FakeGoogleServer
+from utils.job_queue import POLL_INTERVAL, JobQueue, WorkerPool
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=16, help="searches submitted per run")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="pool sizes to compare")
+    parser.add_argument("--max-results", type=int, default=20, help="articles per search")
+    parser.add_argument("--latency", type=float, default=0.1, help="fake Gemini response time in seconds")
+    parser.add_argument("--search-latency", type=float, default=0.05, help="fake search response time in seconds")
+    args = parser.parse_args()
+
+    end_date = datetime.today()
+    start_date = end_date - timedelta(days=7)
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            FakeGoogleServer(latency=args.latency, search_latency=args.search_latency) as server, \
+            server.environment():
+        # Read by the workers at startup
+        os.environ["SENTIGRADE_SENTIMENT_CACHE"] = os.path.join(tmp, "sentiment.sqlite3")
+        os.environ["SENTIGRADE_SEARCH_CACHE"] = os.path.join(tmp, "search.sqlite3")
+        os.environ["SENTIGRADE_ARTICLE_STORE"] = os.path.join(tmp, "articles.sqlite3")
+
+        for workers in args.workers:
+            queue = JobQueue(os.path.join(tmp, f"jobs-{workers}.sqlite3"))
+            pool = WorkerPool(workers, queue.path)
+            pool.start()
+            try:
+                # Let the workers import the pipeline before the clock starts
+                warm = queue.submit([f"warm up {workers}"], max_results_per_query=1,
+                                    start_date=start_date, end_date=end_date)
+                while not queue.get(warm).finished:
+                    time.sleep(POLL_INTERVAL)
+                time.sleep(1)
+
+                started = time.perf_counter()
+                job_ids = [
+                    queue.submit([f"topic {workers}-{i}"], max_results_per_query=args.max_results,
+                                 start_date=start_date, end_date=end_date)
+                    for i in range(args.jobs)
+                ]
+                while not all(queue.get(job_id).finished for job_id in job_ids):
+                    time.sleep(POLL_INTERVAL / 5)
+                seconds = time.perf_counter() - started
+            finally:
+                pool.stop()
+
+            jobs = [queue.get(job_id) for job_id in job_ids]
+            articles = sum(job.articles for job in jobs)
+            failed = sum(1 for job in jobs if job.status != "done")
+            print(f"{workers:2d} workers  {seconds:6.2f} s  {args.jobs / seconds:5.2f} jobs/s  "
+                  f"{articles / seconds:7.1f} articles/s  {failed} failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""
+Local stand-in for the Gemini and Custom Search REST endpoints.
+
+Point the app at it by setting GEMINI_API_ENDPOINT and
+CUSTOM_SEARCH_API_ENDPOINT to ``server.endpoint``; the client registry then
+sends Gemini (over REST) and Custom Search requests to this server, so the
+whole pipeline runs offline. ``server.environment()`` does both for the
+duration of a ``with`` block.
+
+Answers are deterministic: scores come from a hash of the headline and
+search results from a hash of the query. Latency, jitter and the share of
+requests answered with an error status are configurable, and the random
+draws are seeded, so load tests are repeatable.
+"""
+import json
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from utils.sentiment_backends import mock_score as fake_score
+
+# "[3] headline" lines of a batch prompt
+_BATCH_LINE = re.compile(r"^\[(\d+)\] (.*)$", re.MULTILINE)
+
+# Quoted keywords of a search query, as built by search_news
+_QUOTED = re.compile(r'"([^"]*)"')
+
+# Custom Search never returns more than this many results per query
+MAX_SEARCH_RESULTS = 100
+
+# Results for a literal phrase that hardly any page contains
+RARE_PHRASE_RESULTS = 6
+
+_ERROR_STATUS_NAMES = {429: "RESOURCE_EXHAUSTED", 500: "INTERNAL", 503: "UNAVAILABLE"}
+
+
+def fake_answer(prompt: str, answers: Optional[Dict[str, int]] = None) -> str:
+    """
+    Answer a single-headline prompt with a bare number and a batch prompt
+    with the JSON array ``gemini_analyze_sentiment_batch`` expects.
+
+    Headlines found in ``answers`` get that score instead of a pseudo score.
+    """
+    answers = answers or {}
+    batch = _BATCH_LINE.findall(prompt)
+    if batch:
+        return json.dumps([
+            {"index": int(i), "score": answers.get(text, fake_score(text))} for i, text in batch
+        ])
+    headline = prompt.rsplit(": ", 1)[-1].rstrip(".")
+    return str(answers.get(headline, fake_score(headline)))
+
+
+def fake_search_results(query: str, total: int = MAX_SEARCH_RESULTS, match_rate: float = 0.5) -> List[Dict]:
+    """
+    Deterministic Custom Search items for a query.
+
+    About ``match_rate`` of the titles mention the query's quoted keywords;
+    the rest don't, as with real results. A quoted "a AND b" is taken as
+    the literal phrase it is, which few pages contain, so it gets at most
+    RARE_PHRASE_RESULTS results. Publish times fall in the week
+    before today and are given the ways real results give them: in the
+    page's metatags, its structured data or in front of the snippet, in
+    various formats; one item in eight has none.
+    """
+    phrases = _QUOTED.findall(query)
+    keywords = " ".join(phrases) or query.split(" after:")[0]
+    topics = [word.strip() for phrase in phrases or [keywords] for word in phrase.split(" AND ") if word.strip()]
+    topics = topics or ["news"]
+    if any(" AND " in phrase for phrase in phrases):
+        total = min(total, RARE_PHRASE_RESULTS)
+    rng = random.Random(zlib.crc32(keywords.encode("utf-8")))
+    today = datetime.combine(datetime.today().date(), datetime.min.time())
+    items = []
+    for i in range(total):
+        # Results of OR-ed phrases take turns mentioning each
+        keyword = topics[i % len(topics)]
+        topic = keyword if rng.random() < match_rate else rng.choice(["Markets", "Weather", "Sports", "Tech"])
+        verb = rng.choice(["surges", "slumps", "steadies", "faces questions", "beats forecasts", "draws criticism"])
+        published = today - timedelta(minutes=rng.randrange(7 * 24 * 60))
+        domain = rng.choice(["example.com", "news.example.org", "daily.example.net", "wire.example.io"])
+        item = {
+            "title": f"{topic} {verb} in report {i}",
+            "link": f"https://{domain}/{zlib.crc32(keywords.encode('utf-8'))}/{i}",
+            "snippet": f"Story {i} about {topic.lower()}.",
+            "displayLink": domain,
+        }
+        _add_publish_date(item, published, i % 8)
+        items.append(item)
+    return items
+
+
+def _add_publish_date(item: Dict, published: datetime, style: int) -> None:
+    """
+    Put a naive local publish time into a search item in one of eight styles.
+    """
+    aware = published.astimezone()
+    metatags = {"og:type": "article", "og:title": item["title"]}
+    if style == 0:
+        metatags["article:published_time"] = aware.isoformat()
+    elif style == 1:
+        metatags["og:updated_time"] = aware.isoformat()
+        metatags["pubdate"] = aware.strftime("%a, %d %b %Y %H:%M:%S %z")
+    elif style == 2:
+        item["pagemap"] = {"newsarticle": [{"headline": item["title"], "datepublished": published.strftime("%Y-%m-%d")}]}
+    elif style == 3:
+        days = (datetime.today() - published).days
+        item["snippet"] = (f"{days} days ago ... " if days else "5 hours ago ... ") + item["snippet"]
+    elif style == 4:
+        item["snippet"] = published.strftime("%b %d, %Y") + " ... " + item["snippet"]
+    elif style == 5:
+        metatags["date"] = aware.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    elif style == 6:
+        item["publishedTime"] = aware.astimezone(timezone.utc).strftime("%a, %d %b %Y %H:%M:%S GMT")
+    item.setdefault("pagemap", {})["metatags"] = [metatags]
+
+
+class _FakeGoogleHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY the body
+    # waits on the client's delayed ACK (~40 ms) on every keep-alive request
+    disable_nagle_algorithm = True
+
+    def _send_json(self, status: int, body: Dict, headers: Optional[Dict[str, str]] = None) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_error_status(self, status: int, message: str) -> None:
+        headers = {}
+        if status == 429 and self.server.retry_after is not None:
+            headers["Retry-After"] = str(self.server.retry_after)
+        self._send_json(status, {
+            "error": {"code": status, "message": message, "status": _ERROR_STATUS_NAMES.get(status, "UNKNOWN")}
+        }, headers)
+
+    def _simulate(self, kind: str) -> bool:
+        """
+        Wait out the simulated latency; False if this request should fail.
+        """
+        delay, failed = self.server.draw(kind)
+        time.sleep(delay)
+        if failed:
+            self._send_error_status(self.server.error_status, "Simulated failure from the fake server")
+        return not failed
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if not url.path.endswith("/customsearch/v1"):
+            self._send_error_status(404, f"Unknown path {url.path}")
+            return
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+        if not self._simulate("search"):
+            return
+
+        start = int(params.get("start", 1))
+        num = int(params.get("num", 10))
+        if not 1 <= num <= 10 or start + num > MAX_SEARCH_RESULTS + 1:
+            self._send_error_status(400, "Request contains an invalid argument.")
+            return
+
+        results = fake_search_results(params.get("q", ""), self.server.search_results, self.server.match_rate)
+        items = results[start - 1:start - 1 + num]
+        body = {"kind": "customsearch#search", "searchInformation": {"totalResults": str(len(results))}}
+        if items:
+            body["items"] = items
+        self._send_json(200, body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        prompt = "".join(
+            part.get("text", "")
+            for content in body.get("contents", [])
+            for part in content.get("parts", [])
+        )
+        if not self._simulate("gemini"):
+            return
+
+        self._send_json(200, {
+            "candidates": [{
+                "content": {"parts": [{"text": fake_answer(prompt, self.server.answers)}], "role": "model"},
+                "finishReason": "STOP",
+                "index": 0,
+            }]
+        })
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeGoogleServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server answering Gemini ``generateContent`` and Custom
+    Search ``cse.list`` calls.
+
+    Use as a context manager; the server runs on a daemon thread on a free
+    port. Every request waits ``latency`` seconds, plus or minus up to
+    ``jitter``, and fails with ``error_status`` at ``error_rate``.
+    ``answers`` maps headlines to fixed scores, e.g. to stand in for a
+    perfectly accurate model on a labelled set.
+    """
+
+    daemon_threads = True
+    # Room for many sessions connecting at once
+    request_queue_size = 128
+
+    def __init__(self,
+                 latency: float = 0.3,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 answers: Optional[Dict[str, int]] = None,
+                 search_latency: Optional[float] = None,
+                 jitter: float = 0.0,
+                 error_rate: float = 0.0,
+                 error_status: int = 429,
+                 retry_after: Optional[float] = None,
+                 search_results: int = MAX_SEARCH_RESULTS,
+                 match_rate: float = 0.5,
+                 seed: int = 0):
+        """
+        Args:
+            latency (float): Seconds each Gemini request takes
+            host (str): Interface to listen on
+            port (int): Port to listen on (0 picks a free one)
+            answers (Optional[Dict[str, int]]): Fixed scores per headline
+            search_latency (Optional[float]): Seconds each search request takes
+                (defaults to ``latency``)
+            jitter (float): Largest random change to each request's latency
+            error_rate (float): Share of requests answered with ``error_status``
+            error_status (int): HTTP status of simulated failures
+            retry_after (Optional[float]): Retry-After seconds sent with 429s
+            search_results (int): Results available per query (at most 100)
+            match_rate (float): Share of result titles mentioning the query
+            seed (int): Seed for latency jitter and failures
+        """
+        super().__init__((host, port), _FakeGoogleHandler)
+        self.latency = latency
+        self.search_latency = latency if search_latency is None else search_latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.answers = answers or {}
+        self.search_results = min(search_results, MAX_SEARCH_RESULTS)
+        self.match_rate = match_rate
+        self.requests = 0
+        self.search_requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def draw(self, kind: str):
+        """
+        Count a request and draw its latency and whether it fails.
+        """
+        with self._lock:
+            if kind == "search":
+                self.search_requests += 1
+                delay = self.search_latency
+            else:
+                self.requests += 1
+                delay = self.latency
+            delay = max(0.0, delay + self._random.uniform(-self.jitter, self.jitter))
+            failed = self._random.random() < self.error_rate
+            self.errors += failed
+        return delay, failed
+
+    @contextmanager
+    def environment(self) -> Iterator["FakeGoogleServer"]:
+        """
+        Point Gemini and Custom Search clients at this server for the block.
+        """
+        from utils.clients import get_registry
+
+        names = ("GEMINI_API_ENDPOINT", "CUSTOM_SEARCH_API_ENDPOINT")
+        saved = {name: os.environ.get(name) for name in names}
+        os.environ.update({name: self.endpoint for name in names})
+        try:
+            yield self
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+            # Gemini configuration is process-global; rebuild it on next use
+            get_registry().clear()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+
+# Earlier name, from when only Gemini was faked
+FakeGeminiServer = FakeGoogleServer
@@ -0,0 +1,134 @@
+"""
+Report how long each of the app's imports takes on a cold interpreter.
+
+Every module is imported in a fresh subprocess with ``-X importtime`` so
+timings are not hidden by modules an earlier import already loaded. The
+report lists the wall time of each import and the slowest modules it pulled
+in, followed by the time to import what the empty-state page needs and the
+time a cold run of app.py takes to render it.
+
+Run from the SentimentSentinel directory:
+
+    python -m benchmarks.startup_report
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+# Imports in the order the app used to load them at startup
+MODULES = [
+    "streamlit",
+    "pandas",
+    "plotly.express",
+    "plotly.graph_objects",
+    "googleapiclient.discovery",
+    "google.generativeai",
+    "nltk",
+    "utils.sentiment_analyzer",
+    "utils.news_api",
+]
+
+# What app.py needs before it paints the empty-state page
+EMPTY_STATE_MODULES = ["streamlit"]
+
+# "import time: self [us] | cumulative | imported package"
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_import(modules, top=5):
+    """
+    Import modules in a fresh interpreter.
+
+    Returns:
+        dict: wall time in seconds and the ``top`` slowest nested imports
+    """
+    code = "; ".join(f"import {module}" for module in modules)
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        return {'modules': modules, 'error': result.stderr.strip().splitlines()[-1]}
+
+    nested = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            nested.append((int(match.group(2)) / 1e6, match.group(4).strip()))
+    nested.sort(reverse=True)
+    return {
+        'modules': modules,
+        'wall_seconds': round(wall, 3),
+        'slowest': [{'module': name, 'seconds': round(seconds, 3)} for seconds, name in nested[:top]],
+    }
+
+
+# Runs app.py once headless and prints how long the script took
+_FIRST_PAINT = """
+import time
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("app.py", default_timeout=120)
+started = time.perf_counter()
+app.run()
+print(time.perf_counter() - started)
+"""
+
+
+def time_first_paint():
+    """
+    Seconds for a cold run of app.py to render the empty-state page.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", _FIRST_PAINT],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": APP_DIR},
+    )
+    if result.returncode != 0:
+        return None
+    return round(float(result.stdout.strip().splitlines()[-1]), 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = {
+        'imports': [time_import([module]) for module in MODULES],
+        'empty_state': time_import(EMPTY_STATE_MODULES),
+        'eager_startup': time_import(MODULES),
+        'first_paint_seconds': time_first_paint(),
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    for entry in report['imports']:
+        name = entry['modules'][0]
+        if 'error' in entry:
+            print(f"{name:28} failed: {entry['error']}")
+            continue
+        slowest = ", ".join(f"{item['module']} {item['seconds']:.2f}s" for item in entry['slowest'][:3])
+        print(f"{name:28} {entry['wall_seconds']:6.2f}s  ({slowest})")
+    print()
+    print(f"{'empty-state page imports':28} {report['empty_state'].get('wall_seconds', float('nan')):6.2f}s")
+    print(f"{'all imports up front':28} {report['eager_startup'].get('wall_seconds', float('nan')):6.2f}s")
+    first_paint = report['first_paint_seconds']
+    print(f"{'app.py empty-state run':28} {first_paint if first_paint is not None else float('nan'):6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
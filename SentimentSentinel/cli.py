@@ -0,0 +1,348 @@
+"""
+Run the news sentiment pipeline headless, without the Streamlit app.
+
+Queries are read from a text file, one per line; blank lines and lines
+starting with # are skipped. Results stream to a JSONL file, or to a
+directory of Parquet part files, as each query finishes. A checkpoint next
+to the output records every finished query, so re-running the same command
+after a crash or Ctrl-C resumes where the last run stopped.
+
+Run from the SentimentSentinel directory:
+
+    python cli.py queries.txt -o results.jsonl
+    python cli.py queries.txt -o results.parquet --parallel-queries 8
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from utils import tracing
+from utils.article_store import ArticleStore, get_default_article_store
+from utils.articles import ARTICLE_COLUMNS, typed_articles
+from utils.news_api import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MAX_PARALLEL_QUERIES,
+    DEFAULT_REQUESTS_PER_SECOND,
+    iter_analyze_news,
+    setup_api_keys,
+)
+from utils.sentiment_backends import BACKENDS, get_backend
+from utils.tiered_scorer import TieredRouter
+
+logger = logging.getLogger("sentigrade.cli")
+
+# Articles buffered before a Parquet part file is written
+DEFAULT_FLUSH_ROWS = 1000
+
+
+def read_queries(path: str) -> List[str]:
+    """
+    Read queries from a file, one per line, dropping blanks, comments and repeats.
+    """
+    queries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            query = line.strip()
+            if query and not query.startswith("#"):
+                queries.append(query)
+    return list(dict.fromkeys(queries))
+
+
+def normalize_articles(articles: pd.DataFrame) -> pd.DataFrame:
+    """
+    Give a query's articles a fixed column order and types.
+
+    The pipeline's compact types are widened to one schema for every
+    output part: query and source as plain strings rather than categoricals
+    (whose codes grow with the number of categories), and int64 scores, as
+    in earlier output. Unknown publish dates are NaT.
+    """
+    if articles.empty:
+        return pd.DataFrame(columns=ARTICLE_COLUMNS)
+    articles = typed_articles(articles).reindex(columns=ARTICLE_COLUMNS)
+    articles['query'] = articles['query'].astype(object)
+    articles['source'] = articles['source'].astype(object)
+    articles['sentiment_score'] = articles['sentiment_score'].astype('int64')
+    return articles.reset_index(drop=True)
+
+
+class Checkpoint:
+    """
+    Append-only record of finished queries, one JSON object per line.
+
+    Each entry is fsynced before the next query is recorded, so after a crash
+    the file describes exactly what made it into the output. A torn last
+    line from a crash mid-write is cut off on load, so later entries start
+    on a line of their own.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> List[Dict]:
+        if not os.path.exists(self.path):
+            return []
+        entries = []
+        with open(self.path, "r+b") as f:
+            valid = 0
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("unterminated line")
+                    entries.append(json.loads(line))
+                except ValueError:
+                    f.truncate(valid)
+                    break
+                valid += len(line)
+        return entries
+
+    def record(self, entries: List[Dict]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def remove(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class JsonlWriter:
+    """
+    Appends each finished query's articles to a JSONL file.
+
+    The checkpoint stores the file size after every query; on resume the file
+    is truncated back to the last recorded size, dropping rows from a query
+    that was written but never checkpointed.
+    """
+
+    def __init__(self, path: str, checkpoint: Checkpoint, entries: List[Dict]):
+        self.path = path
+        self.checkpoint = checkpoint
+        offset = entries[-1]['offset'] if entries else 0
+        mode = "r+b" if os.path.exists(path) else "wb"
+        self._file = open(path, mode)
+        self._file.truncate(offset)
+        self._file.seek(offset)
+
+    def write(self, query: str, articles: pd.DataFrame) -> None:
+        if not articles.empty:
+            lines = articles.to_json(orient='records', lines=True, date_format='iso', force_ascii=False)
+            self._file.write(lines.encode("utf-8"))
+            if not lines.endswith("\n"):
+                self._file.write(b"\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self.checkpoint.record([{'query': query, 'rows': len(articles), 'offset': self._file.tell()}])
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetWriter:
+    """
+    Writes finished queries to numbered Parquet part files in a directory.
+
+    Parquet files are unreadable until closed, so articles are buffered and
+    written ``flush_rows`` at a time as complete part files. Queries are
+    checkpointed only once their part file is on disk; on resume any part
+    file the checkpoint doesn't mention is deleted. The directory can be
+    read back with ``pd.read_parquet(path)``.
+    """
+
+    def __init__(self, path: str, checkpoint: Checkpoint, entries: List[Dict], flush_rows: int = DEFAULT_FLUSH_ROWS):
+        self.path = path
+        self.checkpoint = checkpoint
+        self.flush_rows = flush_rows
+        os.makedirs(path, exist_ok=True)
+
+        parts = {entry['part'] for entry in entries if entry.get('part')}
+        for name in os.listdir(path):
+            if name not in parts:
+                os.remove(os.path.join(path, name))
+        self._next_part = len(parts)
+        self._frames = []
+        self._entries = []
+        self._rows = 0
+
+    def write(self, query: str, articles: pd.DataFrame) -> None:
+        if not articles.empty:
+            self._frames.append(articles)
+            self._rows += len(articles)
+        self._entries.append({'query': query, 'rows': len(articles)})
+        if self._rows >= self.flush_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        part = None
+        if self._frames:
+            part = f"part-{self._next_part:05d}.parquet"
+            tmp_path = os.path.join(self.path, part + ".tmp")
+            pd.concat(self._frames, ignore_index=True).to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, os.path.join(self.path, part))
+            self._next_part += 1
+        if self._entries:
+            self.checkpoint.record([{**entry, 'part': part} for entry in self._entries])
+        self._frames = []
+        self._entries = []
+        self._rows = 0
+
+    def close(self) -> None:
+        self.flush()
+
+
+def run(queries: List[str],
+        output: str,
+        output_format: str,
+        fresh: bool = False,
+        flush_rows: int = DEFAULT_FLUSH_ROWS,
+        store: Optional[ArticleStore] = None,
+        **analyze_kwargs) -> Dict[str, float]:
+    """
+    Analyze queries and stream the results to ``output``, resuming from its checkpoint.
+
+    Args:
+        queries (List[str]): Queries to analyze
+        output (str): JSONL file or Parquet directory to write
+        output_format (str): 'jsonl' or 'parquet'
+        fresh (bool): Discard any previous output and checkpoint first
+        flush_rows (int): Articles per Parquet part file
+        store (Optional[ArticleStore]): Also append each query's articles here
+        **analyze_kwargs: Passed on to iter_analyze_news
+
+    Returns:
+        Dict[str, float]: Queries processed, failed and skipped, articles
+        written and elapsed seconds
+    """
+    checkpoint = Checkpoint(output + ".checkpoint")
+    if fresh or not os.path.exists(output):
+        checkpoint.remove()
+        if os.path.isdir(output):
+            shutil.rmtree(output)
+        elif os.path.exists(output):
+            os.remove(output)
+
+    entries = checkpoint.load()
+    finished = {entry['query'] for entry in entries}
+    todo = [query for query in queries if query not in finished]
+    if finished:
+        logger.info("Resuming: %d of %d queries already done", len(queries) - len(todo), len(queries))
+
+    if output_format == "parquet":
+        writer = ParquetWriter(output, checkpoint, entries, flush_rows)
+    else:
+        writer = JsonlWriter(output, checkpoint, entries)
+
+    started = time.perf_counter()
+    pending = {}
+    done = 0
+    failed = 0
+    articles_written = 0
+    try:
+        for chunk in iter_analyze_news(todo, **analyze_kwargs):
+            if not chunk.articles.empty:
+                pending.setdefault(chunk.query_index, []).append(chunk.articles)
+            if not chunk.query_done:
+                continue
+
+            frames = pending.pop(chunk.query_index, [])
+            if chunk.error is not None:
+                # Left out of the checkpoint so the next run retries it
+                failed += 1
+                logger.warning("[%d/%d] %s: failed, will retry on resume", done + failed, len(todo), chunk.query)
+                continue
+
+            articles = normalize_articles(pd.concat(frames).sort_index() if frames else pd.DataFrame())
+            writer.write(chunk.query, articles)
+            if store is not None:
+                store.add(articles)
+            done += 1
+            articles_written += len(articles)
+            logger.info("[%d/%d] %s: %d articles", done + failed, len(todo), chunk.query, len(articles))
+    finally:
+        writer.close()
+
+    return {
+        'queries': done,
+        'failed': failed,
+        'skipped': len(queries) - len(todo),
+        'articles': articles_written,
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("queries", help="text file with one query per line")
+    parser.add_argument("-o", "--output", required=True, help="JSONL file or Parquet directory to write")
+    parser.add_argument("--format", choices=["jsonl", "parquet"],
+                        help="output format (default: from the output's extension)")
+    parser.add_argument("--max-results", type=int, default=20, help="articles per query")
+    parser.add_argument("--days", type=int, default=7, help="search the last N days")
+    parser.add_argument("--parallel-queries", type=int, default=DEFAULT_MAX_PARALLEL_QUERIES)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY,
+                        help="Gemini requests in flight per query")
+    parser.add_argument("--rps", type=float, default=DEFAULT_REQUESTS_PER_SECOND,
+                        help="Gemini requests per second across all queries")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--backend", choices=BACKENDS, default="gemini", help="model that scores headlines")
+    parser.add_argument("--tiered", action="store_true", help="score confident headlines locally with VADER")
+    parser.add_argument("--no-dedup", action="store_true", help="score near-duplicate headlines separately")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only fetch results newer than each query's last cached run")
+    parser.add_argument("--no-cache", action="store_true", help="ignore cached searches and scores")
+    parser.add_argument("--no-store", action="store_true", help="don't add results to the local article store")
+    parser.add_argument("--flush-rows", type=int, default=DEFAULT_FLUSH_ROWS, help="articles per Parquet part file")
+    parser.add_argument("--fresh", action="store_true", help="discard previous output instead of resuming")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    output_format = args.format or ("parquet" if args.output.endswith(".parquet") else "jsonl")
+    queries = read_queries(args.queries)
+    end_date = datetime.today()
+    backend = get_backend(args.backend, setup_api_keys()[2])
+
+    try:
+        with tracing.trace("cli"):
+            summary = run(
+                queries,
+                args.output,
+                output_format,
+                fresh=args.fresh,
+                flush_rows=args.flush_rows,
+                store=None if args.no_store else get_default_article_store(),
+                max_results_per_query=args.max_results,
+                max_concurrency=args.concurrency,
+                requests_per_second=args.rps,
+                batch_size=args.batch_size,
+                use_cache=not args.no_cache,
+                incremental=args.incremental,
+                max_parallel_queries=args.parallel_queries,
+                start_date=end_date - timedelta(days=args.days),
+                end_date=end_date,
+                router=TieredRouter() if args.tiered else None,
+                dedup=not args.no_dedup,
+                backend=backend,
+            )
+    except KeyboardInterrupt:
+        logger.warning("Interrupted; run the same command again to resume")
+        return 130
+
+    logger.info("Done: %d queries (%d resumed, %d failed), %d articles in %.1fs",
+                summary['queries'], summary['skipped'], summary['failed'], summary['articles'], summary['seconds'])
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
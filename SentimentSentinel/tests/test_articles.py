@@ -0,0 +1,33 @@
+"""
+Article frames keep their column types whether or not they have rows.
+
+Run from the SentimentSentinel directory:
+
+    python -m pytest -q tests
+"""
+from datetime import datetime
+
+import pandas as pd
+
+from utils.articles import Article, article_frame, empty_articles, typed_articles
+
+
+def one_article_frame():
+    article = Article(title="Markets rally", link="https://example.com/1", snippet="Shares rose.",
+                      source="example.com", date=datetime(2025, 10, 5))
+    return article_frame("markets", [article], [4], [None])
+
+
+def test_empty_article_frame_has_the_types_of_a_full_one():
+    full = one_article_frame()
+    empty = article_frame("markets", [], [], [])
+    assert list(empty.columns) == list(full.columns)
+    assert empty.dtypes.map(str).to_dict() == full.dtypes.map(str).to_dict()
+    assert empty.dtypes.map(str).to_dict() == empty_articles().dtypes.map(str).to_dict()
+
+
+def test_concatenating_an_empty_frame_keeps_the_types():
+    full = one_article_frame()
+    combined = typed_articles(pd.concat([full, article_frame("other", [], [], [])], ignore_index=True))
+    assert combined.dtypes.map(str).to_dict() == full.dtypes.map(str).to_dict()
+    assert combined['title'].tolist() == ["Markets rally"]
@@ -0,0 +1,97 @@
+"""
+The CLI checkpoints only fully scored queries and resumes cleanly after a
+crash mid-write.
+
+Run from the SentimentSentinel directory:
+
+    python -m pytest -q tests
+"""
+import json
+from datetime import datetime
+from unittest import mock
+
+import pandas as pd
+
+import cli
+from utils import news_api
+from utils.articles import Article
+
+
+class FlakyBackend:
+    """
+    Local backend that fails any headline containing "fail".
+    """
+
+    model_name = "flaky"
+    version = "1"
+    local = True
+
+    def score(self, text):
+        if "fail" in text:
+            raise RuntimeError("backend unavailable")
+        return 5
+
+    def score_batch(self, texts):
+        return {i: self.score(text) for i, text in enumerate(texts)}
+
+
+def fake_search(query, *args, **kwargs):
+    return [
+        Article(title=f"{query} headline {i}", link=f"https://example.com/{query}/{i}", snippet="",
+                source="example.com", date=datetime(2025, 10, 5))
+        for i in range(3)
+    ]
+
+
+def offline():
+    return mock.patch.multiple(news_api, setup_api_keys=lambda: ("key", "cse", "gemini", True),
+                               _search_news=fake_search)
+
+
+def run_cli(tmp_path, queries):
+    (tmp_path / "queries.txt").write_text("\n".join(queries) + "\n")
+    with offline(), mock.patch.object(cli, "get_backend", lambda name, api_key: FlakyBackend()):
+        return cli.main([str(tmp_path / "queries.txt"), "-o", str(tmp_path / "out.jsonl"),
+                         "--no-cache", "--no-store", "--batch-size", "1"])
+
+
+def checkpointed(tmp_path):
+    return [entry['query'] for entry in cli.Checkpoint(str(tmp_path / "out.jsonl.checkpoint")).load()]
+
+
+def output_queries(tmp_path):
+    return pd.read_json(tmp_path / "out.jsonl", lines=True)['query'].tolist()
+
+
+def test_query_with_scoring_failures_is_not_checkpointed(tmp_path):
+    assert run_cli(tmp_path, ["alpha", "fail"]) == 1
+    assert checkpointed(tmp_path) == ["alpha"]
+    assert output_queries(tmp_path) == ["alpha"] * 3
+
+    # The next run retries only the failed query
+    with mock.patch.object(FlakyBackend, "score", lambda self, text: 5):
+        assert run_cli(tmp_path, ["alpha", "fail"]) == 0
+    assert checkpointed(tmp_path) == ["alpha", "fail"]
+    assert output_queries(tmp_path) == ["alpha"] * 3 + ["fail"] * 3
+
+
+def test_resume_truncates_rows_and_checkpoint_lines_torn_by_a_crash(tmp_path):
+    output = str(tmp_path / "out.jsonl")
+    with offline():
+        cli.run(["alpha", "beta"], output, "jsonl", backend=FlakyBackend(), use_cache=False)
+
+    # A crash while writing gamma: its rows reached the output, but only half
+    # of its checkpoint line was written
+    with open(output, "a", encoding="utf-8") as f:
+        f.write(json.dumps({'query': "gamma"}) + "\n" + '{"query": "gam')
+    with open(output + ".checkpoint", "a", encoding="utf-8") as f:
+        f.write('{"query": "gamma", "rows": 3, "off')
+
+    with offline():
+        summary = cli.run(["alpha", "beta", "gamma"], output, "jsonl", backend=FlakyBackend(), use_cache=False)
+
+    assert (summary['skipped'], summary['queries'], summary['articles']) == (2, 1, 3)
+    # Queries finish in any order
+    assert sorted(output_queries(tmp_path)) == ["alpha"] * 3 + ["beta"] * 3 + ["gamma"] * 3
+    assert output_queries(tmp_path)[-3:] == ["gamma"] * 3
+    assert sorted(checkpointed(tmp_path)) == ["alpha", "beta", "gamma"]
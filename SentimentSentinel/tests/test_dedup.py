@@ -0,0 +1,68 @@
+"""
+Headlines are grouped when their words overlap by at least the Jaccard
+cut-off, and each group is represented by its first headline.
+
+Run from the SentimentSentinel directory:
+
+    python -m pytest -q tests
+"""
+import pytest
+
+from utils.dedup import DEFAULT_SIMILARITY, HeadlineClusterer, jaccard, normalize_title
+
+
+def words(title):
+    return frozenset(normalize_title(title).split())
+
+
+@pytest.mark.parametrize("first, other, similarity, duplicate", [
+    # 4 of 5 words shared: exactly at the cut-off
+    ("Central bank holds interest rates", "Central bank holds interest", 0.8, True),
+    # 8 of 9 words shared
+    ("Central bank holds rates steady amid slowing inflation",
+     "Central bank holds rates steady amid slowing inflation again", 8 / 9, True),
+    # One word of 8 swapped: 7 shared of 9
+    ("Central bank holds rates steady amid slowing inflation",
+     "Central bank holds rates steady amid rising inflation", 7 / 9, False),
+    # 3 of 4 words shared, just under the cut-off
+    ("Central bank holds rates", "Central bank holds", 0.75, False),
+])
+def test_headlines_are_grouped_from_the_jaccard_cut_off(first, other, similarity, duplicate):
+    assert jaccard(words(first), words(other)) == pytest.approx(similarity)
+    assert (similarity >= DEFAULT_SIMILARITY) == duplicate
+    assert HeadlineClusterer().cluster([first, other]) == ([0, 0] if duplicate else [0, 1])
+
+
+def test_source_suffix_and_punctuation_are_ignored():
+    titles = ["Oil prices jump after OPEC cut - Reuters", "Oil prices jump after OPEC cut | CNN",
+              "oil prices JUMP after OPEC cut!"]
+    assert HeadlineClusterer().cluster(titles) == [0, 0, 0]
+
+
+def test_representative_is_the_first_member_of_a_group():
+    titles = [
+        "Tech shares slide as chip stocks fall",                # 0
+        "Central bank holds interest rates steady",             # 1
+        "Tech shares slide as chip stocks fall sharply",        # 2, copy of 0
+        "Central bank holds interest rates steady again",       # 3, copy of 1
+        "Tech shares slide as chip stocks fall - Reuters",      # 4, exact copy of 0
+    ]
+    assert HeadlineClusterer().cluster(titles) == [0, 1, 0, 1, 0]
+
+
+def test_headline_close_to_two_groups_joins_the_earlier_one():
+    first = "Asian stocks rise as investors weigh trade talks in Tokyo"
+    second = "Asian stocks rise as investors weigh trade talks amid Beijing"
+    both = "Asian stocks rise as investors weigh trade talks in Beijing"
+    assert jaccard(words(first), words(second)) < DEFAULT_SIMILARITY
+    assert jaccard(words(both), words(first)) >= DEFAULT_SIMILARITY
+    assert jaccard(words(both), words(second)) >= DEFAULT_SIMILARITY
+    assert HeadlineClusterer().cluster([first, second, both]) == [0, 1, 0]
+    assert HeadlineClusterer().cluster([second, first, both]) == [0, 1, 0]
+
+
+def test_stats_count_duplicates_across_calls():
+    clusterer = HeadlineClusterer()
+    clusterer.cluster(["Markets rally on jobs data", "Markets rally on jobs data - AP", "Gold falls"])
+    clusterer.cluster(["Gold falls", "Gold falls"])
+    assert clusterer.stats() == {'headlines': 5, 'duplicates': 2, 'saved_share': 0.4}
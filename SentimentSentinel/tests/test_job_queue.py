@@ -0,0 +1,83 @@
+"""
+A job stays with its worker while it runs, however long a stage takes, and
+a worker whose job was taken over can't write over the new run.
+
+Run from the SentimentSentinel directory:
+
+    python -m pytest -q tests
+"""
+import time
+from unittest import mock
+
+import pandas as pd
+
+from utils import job_queue
+from utils.articles import empty_articles
+from utils.job_queue import DONE, RUNNING, JobQueue
+
+
+def make_queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.sqlite3"))
+
+
+def test_requeued_job_is_only_finished_by_its_new_worker(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id = queue.submit(["alpha"], max_results_per_query=1)
+    first = queue.claim("first")
+
+    # The first worker goes silent for longer than STALE_AFTER
+    queue._conn.execute("UPDATE jobs SET heartbeat = ? WHERE id = ?", (time.time() - 2 * job_queue.STALE_AFTER, job_id))
+    second = queue.claim("second")
+    assert second.id == first.id == job_id
+
+    assert not queue.heartbeat(job_id, "first")
+    assert not queue.update(job_id, 0.5, pd.DataFrame({"a": [1]}), worker="first")
+    assert not queue.finish(job_id, pd.DataFrame({"a": [1]}), worker="first")
+    assert queue.get(job_id).status == RUNNING
+
+    assert queue.heartbeat(job_id, "second")
+    assert queue.finish(job_id, pd.DataFrame({"a": [1, 2]}), worker="second")
+    assert queue.get(job_id).status == DONE
+    assert len(queue.result(job_id)) == 2
+
+
+def test_run_job_heartbeats_while_a_stage_runs(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id = queue.submit(["alpha"], max_results_per_query=1, save_articles=False)
+    job = queue.claim("worker")
+    claimed_at = queue._conn.execute("SELECT heartbeat FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+    heartbeats = []
+
+    def slow_analysis(queries, **params):
+        # No chunk finishes while the heartbeat thread runs a few times
+        time.sleep(0.3)
+        heartbeats.append(queue._conn.execute("SELECT heartbeat FROM jobs WHERE id = ?", (job_id,)).fetchone()[0])
+        return iter(())
+
+    with mock.patch.object(job_queue, "HEARTBEAT_INTERVAL", 0.05), \
+            mock.patch("utils.news_api.iter_analyze_news", slow_analysis):
+        job_queue.run_job(queue, job)
+
+    assert heartbeats[0] > claimed_at
+    assert queue.get(job_id).status == DONE
+
+
+def test_stats_count_new_joined_and_reused_submissions(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id = queue.submit(["alpha"], max_results_per_query=1)
+    assert queue.submit(["alpha"], max_results_per_query=1) == job_id
+    job = queue.claim("worker")
+    queue.finish(job.id, pd.DataFrame({"a": [1]}), worker="worker")
+    assert queue.submit(["alpha"], max_results_per_query=1) == job_id
+    queue.submit(["beta"], max_results_per_query=1)
+
+    stats = queue.stats()
+    assert (stats['submitted'], stats['coalesced'], stats['reused']) == (2, 1, 1)
+    assert (stats['queued'], stats['done']) == (1, 1)
+
+
+def test_result_of_a_job_without_articles_has_the_article_columns(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id = queue.submit(["alpha"], max_results_per_query=1)
+    assert list(queue.result(job_id).columns) == list(empty_articles().columns)
+    assert list(queue.result("missing").columns) == list(empty_articles().columns)
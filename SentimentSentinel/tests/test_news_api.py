@@ -0,0 +1,186 @@
+"""
+Search results are filtered while paging, which stops as soon as it can;
+batch responses are parsed defensively; and headlines that fail to score
+are reported as failures, not dropped like neutral ones.
+
+Run from the SentimentSentinel directory:
+
+    python -m pytest -q tests
+"""
+from datetime import datetime
+from unittest import mock
+
+import pytest
+
+from utils import news_api
+from utils.articles import Article
+from utils.news_api import MAX_SEARCH_RESULTS, parse_batch_scores
+from utils.rate_limiter import AdaptiveRateLimiter
+
+
+class FakeSearchService:
+    """
+    Stands in for the Custom Search client, serving pages of ``items`` and
+    recording each request's query and start index.
+    """
+
+    def __init__(self, items):
+        self.items = items
+        self.requests = []
+
+    def cse(self):
+        return self
+
+    def list(self, q, cx, num, start):
+        self.requests.append((q, start))
+        page = self.items[start - 1:start - 1 + num]
+        return lambda: {'items': page} if page else {}
+
+
+def search_item(i, title, published="2025-10-05T09:00:00+00:00"):
+    return {
+        'title': title,
+        'link': f"https://example.com/{i}",
+        'displayLink': "example.com",
+        'pagemap': {'metatags': [{'article:published_time': published}]},
+    }
+
+
+def search(items, max_results, start_date=None, end_date=None):
+    service = FakeSearchService(items)
+    with mock.patch.object(news_api, "get_search_service", lambda api_key: service), \
+            mock.patch.object(news_api, "execute", lambda request: request()), \
+            mock.patch.object(news_api, "_search_limiter", AdaptiveRateLimiter(1e6)):
+        before = news_api.search_stats()
+        articles = news_api._search_news("markets", "key", "cse", max_results, start_date, end_date, None, 0, False)
+        after = news_api.search_stats()
+    wasted = after['wasted_calls'] - before['wasted_calls']
+    return articles, [start for _, start in service.requests], wasted
+
+
+def test_paging_stops_on_a_short_page():
+    articles, starts, _ = search([search_item(i, f"Markets rally {i}") for i in range(23)], max_results=50)
+    assert starts == [1, 11, 21]
+    assert len(articles) == 23
+
+
+def test_paging_stops_on_an_empty_page():
+    articles, starts, _ = search([search_item(i, f"Markets rally {i}") for i in range(20)], max_results=50)
+    assert starts == [1, 11, 21]
+    assert len(articles) == 20
+
+
+def test_paging_stops_once_enough_results_match():
+    items = [search_item(i, f"Markets rally {i}" if i % 2 else f"Weather turns {i}") for i in range(100)]
+    articles, starts, wasted = search(items, max_results=10)
+    assert starts == [1, 11]
+    assert len(articles) == 10 and wasted == 0
+
+
+def test_paging_stops_at_the_result_limit():
+    items = [search_item(i, f"Weather turns {i}") for i in range(150)]
+    articles, starts, wasted = search(items, max_results=10)
+    assert starts == list(range(1, MAX_SEARCH_RESULTS, 10))
+    assert articles == [] and wasted == 10
+
+
+def test_results_outside_the_date_window_are_dropped_while_paging():
+    old = [search_item(i, f"Markets rally {i}", "2025-09-20T09:00:00+00:00") for i in range(10)]
+    undated = [dict(search_item(10, "Markets rally 10"), pagemap={})]
+    recent = [search_item(i, f"Markets rally {i}") for i in range(11, 40)]
+    articles, starts, wasted = search(old + undated + recent, max_results=5,
+                                      start_date="2025-10-01", end_date="2025-10-07")
+
+    # The whole first page falls before the window, so paging goes on; results
+    # without a known date are kept
+    assert starts == [1, 11]
+    assert len(articles) == 5 and wasted == 1
+    assert all(article.date is None or article.date >= datetime(2025, 10, 1) for article in articles)
+
+
+def test_search_asks_for_the_date_window():
+    service = FakeSearchService([])
+    with mock.patch.object(news_api, "get_search_service", lambda api_key: service), \
+            mock.patch.object(news_api, "execute", lambda request: request()), \
+            mock.patch.object(news_api, "_search_limiter", AdaptiveRateLimiter(1e6)):
+        news_api._search_news("markets", "key", "cse", 5, "2025-10-01", "2025-10-07", None, 0, False)
+    assert service.requests == [('"markets" after:2025-10-01 before:2025-10-07', 1)]
+
+
+@pytest.mark.parametrize("response, count, expected", [
+    # Valid: scores are clamped, rounded and 0 becomes neutral
+    ('[{"index": 0, "score": 7}, {"index": 1, "score": -3.6}, {"index": 2, "score": 0}]', 3,
+     {0: 7, 1: -4, 2: None}),
+    ('[{"index": 1, "score": 15}, {"index": 0, "score": "-12"}]', 2, {0: -10, 1: 10}),
+    # Fenced, with or without a language tag
+    ('```json\n[{"index": 0, "score": 4}, {"index": 1, "score": -2}]\n```', 2, {0: 4, 1: -2}),
+    ('```\n[{"index": 0, "score": 4}]\n```', 1, {0: 4}),
+    # Truncated mid-array: nothing parses, so every headline is retried alone
+    ('[{"index": 0, "score": 4}, {"index": 1, "sco', 2, {}),
+    ('```json\n[{"index": 0, "score": 4}', 1, {}),
+    # Short: entries that are missing are left for the caller to rescore
+    ('[{"index": 0, "score": 4}]', 3, {0: 4}),
+    ('[]', 2, {}),
+    # Bad entries are skipped, good ones kept
+    ('[{"index": 3, "score": 4}, {"index": -1, "score": 4}, {"index": true, "score": 4}, '
+     '{"index": 0, "score": "high"}, {"index": 1, "score": NaN}, {"index": 2, "score": 5}, "x"]', 3, {2: 5}),
+    # Not an array at all
+    ('{"index": 0, "score": 4}', 1, {}),
+    ('Sorry, I cannot help with that.', 1, {}),
+])
+def test_parse_batch_scores(response, count, expected):
+    assert parse_batch_scores(response, count) == expected
+
+
+class FlakyBackend:
+    """
+    Local backend that fails any batch with a headline containing "fail".
+    """
+
+    model_name = "flaky"
+    version = "1"
+    local = True
+
+    def score(self, text):
+        if "fail" in text:
+            raise RuntimeError("backend unavailable")
+        return None if "flat" in text else 5
+
+    def score_batch(self, texts):
+        if any("fail" in text for text in texts):
+            raise RuntimeError("backend unavailable")
+        return {i: self.score(text) for i, text in enumerate(texts)}
+
+
+def search_results(*titles):
+    return [
+        Article(title=title, link=f"https://example.com/{i}", snippet="", source="example.com",
+                date=datetime(2025, 10, 5))
+        for i, title in enumerate(titles)
+    ]
+
+
+def analyze(titles, batch_size=1):
+    with mock.patch.object(news_api, "setup_api_keys", lambda: ("key", "cse", "gemini", True)), \
+            mock.patch.object(news_api, "_search_news", lambda *args, **kwargs: search_results(*titles)):
+        return list(news_api.iter_analyze_news(["markets"], use_cache=False, dedup=False, batch_size=batch_size,
+                                               backend=FlakyBackend()))
+
+
+def test_failed_headlines_are_yielded_apart_from_neutral_ones():
+    scores = news_api.score_headlines(["up", "flat", "fail"], "key", batch_size=1, backend=FlakyBackend())
+    assert scores == [5, None, news_api.SCORE_FAILED]
+
+
+def test_query_with_failed_headlines_ends_with_an_error():
+    chunks = analyze(["up one", "fail two", "flat three", "up four"])
+    done = chunks[-1]
+    assert done.query_done
+    assert done.error == "1 of 4 headlines could not be scored"
+    scored = [chunk.articles for chunk in chunks if not chunk.query_done]
+    assert sorted(position for articles in scored for position in articles.index) == [0, 3]
+
+
+def test_query_with_neutral_headlines_only_has_no_error():
+    chunks = analyze(["up one", "flat two"], batch_size=10)
+    assert chunks[-1].query_done and chunks[-1].error is None
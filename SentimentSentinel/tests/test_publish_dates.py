@@ -0,0 +1,34 @@
+"""
+Publish dates are read from every place and format in the fixture corpus of
+Custom Search items: ISO-8601, RFC-2822, written month names, relative
+dates counted back from the fetch time and Unix epochs.
+
+Run from the SentimentSentinel directory:
+
+    python -m pytest -q tests
+"""
+import json
+
+import pytest
+
+from benchmarks.bench_date_extraction import FIXTURE, TOLERANCE, expected_date
+from utils.publish_dates import extract_publish_date
+
+with open(FIXTURE, encoding="utf-8") as f:
+    CORPUS = json.load(f)
+
+
+def test_corpus_covers_every_format():
+    assert {entry['format'] for entry in CORPUS} == {"iso-8601", "rfc-2822", "written", "relative", "unix", "none"}
+
+
+@pytest.mark.parametrize("entry", CORPUS, ids=[
+    f"{i}-{entry['where']}-{entry['format']}".replace(" ", "_") for i, entry in enumerate(CORPUS)
+])
+def test_publish_date_is_extracted(entry):
+    found = extract_publish_date(entry['item'])
+    expected = expected_date(entry['expected'])
+    if expected is None:
+        assert found is None
+    else:
+        assert found is not None and abs(found - expected) <= TOLERANCE
@@ -0,0 +1,77 @@
+"""
+Comma-separated queries are split into at most MAX_SUB_QUERIES sub-queries,
+which share the search's result budget.
+
+Run from the SentimentSentinel directory:
+
+    python -m pytest -q tests
+"""
+import math
+from unittest import mock
+
+import pytest
+
+from utils import news_api
+from utils.query_planner import MAX_SUB_QUERIES, SubQuery, keyword_coverage, plan_queries, split_keywords
+
+
+def test_single_keyword_keeps_the_quoted_query():
+    assert plan_queries("inflation") == [SubQuery('"inflation"', ("inflation",))]
+
+
+def test_blank_and_repeated_keywords_are_dropped():
+    assert split_keywords(" Singapore, , singapore ,Malaysia,") == ["Singapore", "Malaysia"]
+    assert plan_queries(" , ") == []
+
+
+def test_up_to_four_keywords_get_a_sub_query_each():
+    plan = plan_queries("a, b, c, d")
+    assert [sub_query.text for sub_query in plan] == ['"a"', '"b"', '"c"', '"d"']
+
+
+def test_keywords_past_the_cap_are_or_ed_into_the_sub_queries():
+    plan = plan_queries("a, b, c, d, e, f, g, h, i")
+    assert MAX_SUB_QUERIES == 4
+    assert len(plan) == MAX_SUB_QUERIES
+    assert [sub_query.text for sub_query in plan] == [
+        '"a" OR "e" OR "i"',
+        '"b" OR "f"',
+        '"c" OR "g"',
+        '"d" OR "h"',
+    ]
+    assert sorted(keyword for sub_query in plan for keyword in sub_query.keywords) == list("abcdefghi")
+
+
+def test_cap_can_be_lowered():
+    assert [sub_query.keywords for sub_query in plan_queries("a, b, c", max_sub_queries=2)] == [("a", "c"), ("b",)]
+
+
+@pytest.mark.parametrize("text, keywords, covered", [
+    ("Singapore and Malaysia sign trade pact", ["singapore", "malaysia"], 2),
+    ("SINGAPORE exports rise", ["singapore", "malaysia"], 1),
+    ("Oil prices fall", ["singapore", "malaysia"], 0),
+])
+def test_keyword_coverage(text, keywords, covered):
+    assert keyword_coverage(text, keywords) == covered
+
+
+@pytest.mark.parametrize("query, max_results", [
+    ("inflation", 20),
+    ("Singapore, Malaysia", 20),
+    ("Thailand, Vietnam, Indonesia", 20),
+    ("a, b, c, d, e, f", 10),
+    ("a, b, c, d", 7),
+])
+def test_sub_queries_share_the_result_budget(query, max_results):
+    budgets = []
+
+    def fake_sub_query(sub_query, api_key, cse_id, budget, *args):
+        budgets.append(budget)
+        return []
+
+    with mock.patch.object(news_api, "_search_sub_query", fake_sub_query):
+        news_api._search_news(query, "key", "cse", max_results, None, None, None, 0, False)
+
+    plan = plan_queries(query)
+    assert budgets == [math.ceil(max_results / len(plan))] * len(plan)
+    assert sum(budgets) < max_results + len(plan)
@@ -0,0 +1,152 @@
+"""
+Rate limiters pace calls within a process and, with a shared budget,
+across processes; the adaptive limiter backs off on throttling, recovers
+additively and stops calling an API that keeps failing.
+
+Run from the SentimentSentinel directory:
+
+    python -m pytest -q tests
+"""
+import pytest
+
+from utils.rate_limiter import AdaptiveRateLimiter, CircuitOpenError, SharedBudget, TokenBucket
+
+
+class FakeClock:
+    """
+    Clock that only moves when the limiter sleeps, recording each sleep.
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        # Like a real sleep, even the shortest lets some time pass
+        self.now += max(seconds, 1e-6)
+
+
+class ApiError(Exception):
+    """
+    Looks like google.api_core's GoogleAPICallError to classify_error.
+    """
+
+    def __init__(self, code, retry_after=None):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+        self.response = type("Response", (), {"headers": {"retry-after": retry_after} if retry_after else {}})()
+
+
+def make_limiter(**kwargs):
+    clock = FakeClock()
+    return AdaptiveRateLimiter(10.0, clock=clock, sleep=clock.sleep, **kwargs), clock
+
+
+def failing(*errors):
+    """
+    A function raising ``errors`` in turn, then returning "ok"; counts its calls.
+    """
+    errors = list(errors)
+
+    def fn():
+        fn.calls += 1
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    fn.calls = 0
+    return fn
+
+
+def test_throttling_halves_the_rate_and_retries():
+    limiter, clock = make_limiter()
+    fn = failing(ApiError(429))
+    assert limiter.call(fn) == "ok"
+    assert fn.calls == 2
+    # Halved to 5, then a twentieth of the ceiling back for the success
+    assert limiter.rate == 5.5
+    stats = limiter.stats()
+    assert (stats['throttled'], stats['retries']) == (1, 1)
+
+
+def test_retry_after_is_waited_out():
+    limiter, clock = make_limiter()
+    assert limiter.call(failing(ApiError(503, retry_after="7"))) == "ok"
+    assert sum(clock.sleeps) >= 7
+
+
+def test_rate_recovers_additively_to_the_ceiling():
+    limiter, clock = make_limiter()
+    limiter.on_failure(throttled=True, retry_after=None)
+    limiter.on_failure(throttled=True, retry_after=None)
+    assert limiter.rate == 2.5
+
+    rates = []
+    for _ in range(17):
+        limiter.call(lambda: None)
+        rates.append(limiter.rate)
+    assert rates[:3] == [3.0, 3.5, 4.0]
+    assert rates[-3:] == [10.0, 10.0, 10.0]
+
+
+@pytest.mark.parametrize("error", [ApiError(400), ApiError(403), ValueError("bad response")])
+def test_errors_that_are_not_retryable_are_raised_at_once(error):
+    limiter, clock = make_limiter()
+    fn = failing(error)
+    with pytest.raises(type(error)):
+        limiter.call(fn)
+    assert fn.calls == 1
+    assert limiter.stats()['retries'] == 0
+    assert limiter.rate == 10.0
+
+
+def test_circuit_opens_then_lets_one_trial_call_through():
+    limiter, clock = make_limiter(max_retries=0, failure_threshold=3, reset_timeout=30)
+    for _ in range(3):
+        with pytest.raises(ApiError):
+            limiter.call(failing(ApiError(500)))
+    assert limiter.stats()['circuit_open']
+
+    fn = failing()
+    with pytest.raises(CircuitOpenError):
+        limiter.call(fn)
+    assert fn.calls == 0
+
+    # Half-open after reset_timeout: a failed trial opens it again at once
+    clock.now += 30
+    with pytest.raises(ApiError):
+        limiter.call(failing(ApiError(500)))
+    with pytest.raises(CircuitOpenError):
+        limiter.call(fn)
+
+    # A successful trial closes it
+    clock.now += 30
+    assert limiter.call(fn) == "ok"
+    assert limiter.call(fn) == "ok"
+    stats = limiter.stats()
+    assert not stats['circuit_open']
+    assert (stats['circuit_opens'], stats['rejected']) == (2, 2)
+
+
+def test_buckets_with_a_shared_budget_split_one_quota(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    # Two processes' limiters, each allowed a burst of 2
+    first = TokenBucket(1.0, capacity=2, budget=SharedBudget(path, "gemini"))
+    second = TokenBucket(1.0, capacity=2, budget=SharedBudget(path, "gemini"))
+    other_api = TokenBucket(1.0, capacity=2, budget=SharedBudget(path, "search"))
+
+    assert first.try_acquire()
+    assert second.try_acquire()
+    assert not first.try_acquire()
+    assert not second.try_acquire()
+    assert other_api.try_acquire()
+
+
+def test_shared_budget_reports_the_wait_for_the_next_token(tmp_path):
+    budget = SharedBudget(str(tmp_path / "jobs.sqlite3"), "gemini")
+    assert budget.take(1, rate=2.0, capacity=1) == 0
+    assert 0.4 < budget.take(1, rate=2.0, capacity=1) <= 0.5
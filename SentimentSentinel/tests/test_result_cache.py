@@ -0,0 +1,73 @@
+"""
+Concurrent callers asking for the same result share one computation, and
+failed or incomplete results are never kept.
+
+Run from the SentimentSentinel directory:
+
+    python -m pytest -q tests
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.result_cache import ResultCache
+
+
+def wait_for_waiters(cache, count):
+    deadline = time.monotonic() + 5
+    while cache.stats()['waiting'] < count:
+        assert time.monotonic() < deadline, "callers never started waiting"
+        time.sleep(0.01)
+
+
+def test_concurrent_callers_share_one_computation():
+    cache = ResultCache()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return [1, 2, 3]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(cache.get_or_compute, "key", compute, copy=list) for _ in range(4)]
+        wait_for_waiters(cache, 3)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert sorted(how for _, how in results) == ["coalesced"] * 3 + ["computed"]
+    assert all(value == [1, 2, 3] for value, _ in results)
+    assert cache.get_or_compute("key", compute) == ([1, 2, 3], "hit")
+    assert len(calls) == 1
+
+
+def test_an_exception_wakes_the_waiters_and_is_not_cached():
+    cache = ResultCache()
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise RuntimeError("search failed")
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(cache.get_or_compute, "key", fail) for _ in range(3)]
+        wait_for_waiters(cache, 2)
+        release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError, match="search failed"):
+                future.result(timeout=5)
+
+    assert cache.stats()['entries'] == 0
+    assert cache.get_or_compute("key", lambda: "retried") == ("retried", "computed")
+
+
+def test_results_rejected_by_cacheable_are_shared_but_not_kept():
+    cache = ResultCache()
+    assert cache.get_or_compute("key", lambda: "partial", cacheable=lambda value: False) == ("partial", "computed")
+    assert cache.stats()['entries'] == 0
+    assert cache.get_or_compute("key", lambda: "complete") == ("complete", "computed")
+    assert cache.get_or_compute("key", lambda: "other") == ("complete", "hit")
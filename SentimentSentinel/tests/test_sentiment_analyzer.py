@@ -0,0 +1,70 @@
+"""
+clean_text and analyze_sentiment_batch must clean exactly like the original
+three-pass clean_text. Cached VADER scores are keyed on the normalized
+headline (make_key), not on the cleaned text, so a change in cleaning would
+silently change the score behind an existing key.
+
+Run from the SentimentSentinel directory:
+
+    python -m pytest -q tests
+"""
+import random
+import re
+
+import pandas as pd
+import pytest
+
+from utils.sentiment_analyzer import _CLEAN_PATTERN, _URL_PATTERN, _clean_replacement, clean_text
+
+
+def three_pass_clean_text(text):
+    """
+    clean_text as it was before the passes were combined.
+    """
+    if not text:
+        return ""
+    text = text.lower()
+    text = re.sub(r'https?://\S+|www\.\S+', '', text)
+    text = re.sub(r'@\w+', '', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def batch_clean(texts):
+    """
+    The cleaning analyze_sentiment_batch applies to a Series.
+    """
+    return list(
+        pd.Series(texts, dtype=object)
+        .str.lower()
+        .str.replace(_URL_PATTERN, '', regex=True)
+        .str.replace(_CLEAN_PATTERN, _clean_replacement, regex=True)
+        .str.strip()
+    )
+
+
+MIXED = [
+    "@a_bwww.",
+    "@abc_www.x",
+    "@userhttps://t.co/x rest",
+    "see www.example.com/@user now",
+    "hi @bob, read https://a.b/c?d=@e  and  @carol\twww.x.y",
+    "@@ab cd",
+    "a@b@c d",
+    "  Mixed   CASE @Name http://x.y  ",
+    "email me@example.com or www.",
+]
+
+
+@pytest.mark.parametrize("text", MIXED)
+def test_mixed_mentions_and_urls_clean_like_three_passes(text):
+    assert clean_text(text) == three_pass_clean_text(text)
+    assert batch_clean([text]) == [three_pass_clean_text(text)]
+
+
+def test_random_mentions_and_urls_clean_like_three_passes():
+    rng = random.Random(0)
+    pieces = ["@", "_", "a", "b", "w", "www.", "http://", "https://", " ", "\t", "\n", ".", ":", "/", "1", "W"]
+    texts = ["".join(rng.choice(pieces) for _ in range(rng.randrange(16))) for _ in range(20000)]
+    expected = [three_pass_clean_text(text) for text in texts]
+    assert [clean_text(text) for text in texts] == expected
+    assert batch_clean(texts) == expected
@@ -0,0 +1,55 @@
+"""
+The disk tier of the sentiment cache evicts by least recent access, counting
+hits served from memory, and keeps its row count without rescanning.
+
+Run from the SentimentSentinel directory:
+
+    python -m pytest -q tests
+"""
+import itertools
+from unittest import mock
+
+from utils import sentiment_cache
+from utils.sentiment_cache import SentimentCache
+
+
+def disk_keys(cache):
+    return {key for (key,) in cache._conn.execute("SELECT key FROM sentiment_cache")}
+
+
+def test_memory_hits_keep_entries_from_disk_eviction(tmp_path):
+    # Every read of the clock is a second later, so access times are distinct
+    clock = itertools.count(1_000_000).__next__
+    with mock.patch.object(sentiment_cache, "TOUCH_BATCH", 1):
+        cache = SentimentCache(str(tmp_path / "cache.sqlite3"), max_entries=10, memory_entries=10, clock=clock)
+        for i in range(10):
+            cache.put_many({f"k{i}": i})
+        # Served from memory, but still the most recently used on disk
+        assert cache.get_many(["k0"]) == {"k0": 0}
+        cache.put_many({"k10": 10})
+
+    assert len(disk_keys(cache)) == 9
+    assert "k0" in disk_keys(cache)
+    assert not {"k1", "k2"} & disk_keys(cache)
+
+
+def test_row_count_is_tracked_across_inserts_and_overwrites(tmp_path):
+    cache = SentimentCache(str(tmp_path / "cache.sqlite3"))
+    cache.put_many({"a": 1, "b": 2})
+    cache.put_many({"b": 3, "c": None})
+    assert cache._disk_rows == 3
+    assert cache.get_many(["a", "b", "c"]) == {"a": 1, "b": 3, "c": None}
+
+    reopened = SentimentCache(str(tmp_path / "cache.sqlite3"))
+    assert reopened._disk_rows == 3
+    assert reopened.stats()['disk_entries'] == 3
+
+
+def test_entries_expire_after_the_ttl(tmp_path):
+    now = [1_000_000.0]
+    cache = SentimentCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=60, clock=lambda: now[0])
+    cache.put_many({"a": 1})
+    now[0] += 59
+    assert cache.get_many(["a"]) == {"a": 1}
+    now[0] += 2
+    assert cache.get_many(["a"]) == {}
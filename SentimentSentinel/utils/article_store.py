@@ -0,0 +1,224 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from utils.articles import ARTICLE_COLUMNS, typed_articles
+from utils.sentiment_aggregates import SentimentAggregates, day_of
+from utils.sentiment_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_ARTICLE_STORE_PATH = os.environ.get(
+    "SENTIGRADE_ARTICLE_STORE",
+    os.path.join(DEFAULT_CACHE_DIR, "articles.sqlite3")
+)
+
+
+def _to_timestamp(value) -> Optional[float]:
+    """
+    Unix timestamp of a publish date, or None if it is unknown.
+    """
+    if value is None or isinstance(value, str) or pd.isna(value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        # Naive like datetime: Timestamp.timestamp() would read it as UTC
+        value = value.to_pydatetime()
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return pd.Timestamp(value).to_pydatetime().timestamp()
+
+
+class ArticleStore:
+    """
+    Persistent, append-only SQLite store of scored articles.
+
+    Each article is stored once per query, keyed on its link; articles seen
+    again keep their first score. Rows carry an ``article_date`` (the publish
+    date, or the time the article was stored when that is unknown) that is
+    indexed together with the query and the source, so windows of history
+    load without scanning the whole table. Every new article that isn't a
+    near-duplicate of another headline is also folded into ``aggregates``,
+    which serves rolling sentiment and trends.
+    """
+
+    def __init__(self, path: str = DEFAULT_ARTICLE_STORE_PATH):
+        """
+        Args:
+            path (str): SQLite database file (":memory:" for a throwaway store)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS articles ("
+            " query TEXT NOT NULL,"
+            " link TEXT NOT NULL,"
+            " title TEXT NOT NULL,"
+            " snippet TEXT NOT NULL,"
+            " source TEXT NOT NULL,"
+            " published_at REAL,"
+            " article_date REAL NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " sentiment_score INTEGER NOT NULL,"
+            " duplicate_of TEXT,"
+            " PRIMARY KEY (query, link))"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(articles)")}
+        if 'duplicate_of' not in columns:
+            self._conn.execute("ALTER TABLE articles ADD COLUMN duplicate_of TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS articles_query_date ON articles (query, article_date)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS articles_source_date ON articles (source, article_date)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS articles_date ON articles (article_date)")
+
+        self.aggregates = SentimentAggregates(self._conn, self._lock)
+        with self._lock:
+            # Stores created before aggregates existed are folded in once
+            if self.aggregates.is_empty():
+                self.aggregates.apply(
+                    (query, source, day_of(article_date), score)
+                    for query, source, article_date, score in self._conn.execute(
+                        "SELECT query, source, article_date, sentiment_score FROM articles"
+                        " WHERE duplicate_of IS NULL"
+                    )
+                )
+            self._conn.commit()
+
+    def add(self, articles: pd.DataFrame) -> int:
+        """
+        Append scored articles, skipping any already stored for their query.
+
+        Args:
+            articles (pd.DataFrame): Rows shaped like fetch_and_analyze_news output
+
+        Returns:
+            int: Number of new articles stored
+        """
+        if articles.empty:
+            return 0
+        if 'duplicate_of' not in articles.columns:
+            articles = articles.assign(duplicate_of=None)
+
+        now = time.time()
+        rows = []
+        for query, title, link, snippet, source, date, score, duplicate_of in zip(
+            *(articles[column].tolist() for column in ARTICLE_COLUMNS)
+        ):
+            published_at = _to_timestamp(date)
+            rows.append((
+                query, link, title, snippet, source, published_at,
+                published_at if published_at is not None else now, now, int(score),
+                duplicate_of if isinstance(duplicate_of, str) else None
+            ))
+
+        with self._lock:
+            added = []
+            for row in rows:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO articles (query, link, title, snippet, source, published_at,"
+                    " article_date, fetched_at, sentiment_score, duplicate_of) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    row
+                )
+                if cursor.rowcount:
+                    added.append(row)
+            # Copies of a wire story are stored but counted once
+            self.aggregates.apply(
+                (query, source, day_of(article_date), score)
+                for query, _, _, _, source, _, article_date, _, score, duplicate_of in added
+                if duplicate_of is None
+            )
+            self._conn.commit()
+            return len(added)
+
+    def load(self,
+             queries: Optional[List[str]] = None,
+             sources: Optional[List[str]] = None,
+             start: Optional[datetime] = None,
+             end: Optional[datetime] = None) -> pd.DataFrame:
+        """
+        Stored articles in a date window, most recent first within each query.
+
+        Args:
+            queries (Optional[List[str]]): Only these queries (default: all)
+            sources (Optional[List[str]]): Only these sources (default: all)
+            start (Optional[datetime]): Earliest article date (inclusive)
+            end (Optional[datetime]): Latest article date (inclusive)
+
+        Returns:
+            pd.DataFrame: Articles with the columns and types of
+            fetch_and_analyze_news; unknown publish dates are NaT
+        """
+        clauses = []
+        params = []
+        if queries:
+            clauses.append(f"query IN ({', '.join('?' * len(queries))})")
+            params.extend(queries)
+        if sources:
+            clauses.append(f"source IN ({', '.join('?' * len(sources))})")
+            params.extend(sources)
+        if start is not None:
+            clauses.append("article_date >= ?")
+            params.append(start.timestamp())
+        if end is not None:
+            clauses.append("article_date <= ?")
+            params.append(end.timestamp())
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT query, title, link, snippet, source, published_at, sentiment_score, duplicate_of"
+                f" FROM articles{where} ORDER BY query, article_date DESC",
+                params
+            ).fetchall()
+
+        return typed_articles(pd.DataFrame(
+            [
+                (query, title, link, snippet, source,
+                 datetime.fromtimestamp(published_at) if published_at is not None else None,
+                 score, duplicate_of)
+                for query, title, link, snippet, source, published_at, score, duplicate_of in rows
+            ],
+            columns=ARTICLE_COLUMNS
+        ))
+
+    def queries(self) -> List[Dict]:
+        """
+        Stored queries with their article counts, most recently fetched first.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT query, COUNT(*), MAX(fetched_at) FROM articles"
+                " GROUP BY query ORDER BY MAX(fetched_at) DESC"
+            ).fetchall()
+        return [{'query': query, 'articles': count, 'last_fetched': last} for query, count, last in rows]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Number of stored articles and distinct queries.
+        """
+        with self._lock:
+            articles, queries = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT query) FROM articles"
+            ).fetchone()
+        return {'articles': articles, 'queries': queries}
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_article_store() -> ArticleStore:
+    """
+    Process-wide article store shared by every session.
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ArticleStore()
+        return _default_store
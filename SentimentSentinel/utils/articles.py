@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Columns of every article frame, in order
+ARTICLE_COLUMNS = ['query', 'title', 'link', 'snippet', 'source', 'date', 'sentiment_score', 'duplicate_of']
+
+# Types of the non-text columns of article frames: repeated strings are
+# categorical, unknown publish dates are NaT and scores (-10..10) fit in a byte
+ARTICLE_DTYPES = {
+    'query': 'category',
+    'source': 'category',
+    'date': 'datetime64[ns]',
+    'sentiment_score': 'int8',
+    'duplicate_of': 'string',
+}
+
+# Categorical without categories, whose categories are typed like inferred ones
+_EMPTY_CATEGORY = pd.CategoricalDtype(pd.Index([], dtype=str))
+
+
+@dataclass(slots=True)
+class Article:
+    """
+    One search result, before it is scored.
+    """
+    title: str
+    link: str
+    snippet: str
+    source: str
+    date: Optional[datetime]  # None when the publish date is unknown
+
+
+def article_frame(query: str,
+                  articles: Sequence[Article],
+                  scores: Sequence[int],
+                  duplicate_of: Sequence[Optional[str]],
+                  index: Optional[Sequence[int]] = None) -> pd.DataFrame:
+    """
+    Typed frame of one query's scored articles, built column by column.
+
+    Args:
+        query (str): Query the articles were found for
+        articles (Sequence[Article]): Articles, in row order
+        scores (Sequence[int]): Sentiment score of each article
+        duplicate_of (Sequence[Optional[str]]): Link of the headline each
+            article is a near-duplicate of, or None
+        index (Optional[Sequence[int]]): Row labels, e.g. search result positions
+
+    Returns:
+        pd.DataFrame: Articles with ARTICLE_COLUMNS and ARTICLE_DTYPES
+    """
+    count = len(articles)
+    if not count:
+        # Columns built from empty lists would come out as float64
+        return empty_articles()
+    return pd.DataFrame(
+        {
+            'query': pd.Categorical.from_codes(np.zeros(count, dtype=np.int8), [query]),
+            'title': [article.title for article in articles],
+            'link': [article.link for article in articles],
+            'snippet': [article.snippet for article in articles],
+            'source': pd.Categorical([article.source for article in articles]),
+            'date': pd.to_datetime([article.date for article in articles]).as_unit('ns'),
+            'sentiment_score': np.asarray(scores, dtype=np.int8),
+            'duplicate_of': pd.array(list(duplicate_of), dtype='string'),
+        },
+        index=index
+    )
+
+
+def empty_articles() -> pd.DataFrame:
+    """
+    Article frame without rows, with the usual columns and types.
+
+    Text columns and categories get the dtype pandas gives lists of
+    strings, as in frames from article_frame, so concatenating an empty
+    frame with others doesn't change their types.
+    """
+    dtypes = dict(ARTICLE_DTYPES, query=_EMPTY_CATEGORY, source=_EMPTY_CATEGORY)
+    return pd.DataFrame({
+        column: pd.Series(dtype=dtypes.get(column, str)) for column in ARTICLE_COLUMNS
+    })
+
+
+def typed_articles(articles: pd.DataFrame) -> pd.DataFrame:
+    """
+    Give an article frame ARTICLE_COLUMNS and ARTICLE_DTYPES.
+
+    Needed after ``pd.concat``, which turns categoricals with different
+    categories back into object columns, and for frames from older code,
+    whose unknown dates are the string 'Unknown date'. Columns that are
+    already typed are left as they are.
+    """
+    if articles.empty and not len(articles.columns):
+        return empty_articles()
+    articles = articles.reindex(columns=ARTICLE_COLUMNS)
+    converted = {}
+    for column, dtype in ARTICLE_DTYPES.items():
+        values = articles[column]
+        if column == 'date':
+            if values.dtype != 'datetime64[ns]':
+                converted[column] = pd.to_datetime(values, errors='coerce', format='mixed').astype('datetime64[ns]')
+        elif values.dtype != dtype:
+            converted[column] = values.astype(dtype)
+    return articles.assign(**converted) if converted else articles
@@ -0,0 +1,188 @@
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Iterator
+
+from utils import tracing
+
+if TYPE_CHECKING:
+    import google.generativeai as genai
+    import httplib2
+
+# Keep-alive HTTP connections shared by Custom Search requests
+DEFAULT_POOL_SIZE = 8
+HTTP_TIMEOUT = 30
+
+
+class HttpPool:
+    """
+    Pool of keep-alive ``httplib2.Http`` objects.
+
+    ``httplib2.Http`` is not thread-safe, so each request checks one out for
+    its duration. Connections stay open between requests, so concurrent
+    sessions reuse warm sockets instead of opening new ones every search.
+    """
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, timeout: float = HTTP_TIMEOUT):
+        self.size = size
+        self.timeout = timeout
+        self.created = 0
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self) -> Iterator["httplib2.Http"]:
+        import httplib2
+
+        try:
+            http = self._idle.get_nowait()
+        except queue.Empty:
+            http = httplib2.Http(timeout=self.timeout)
+            with self._lock:
+                self.created += 1
+        try:
+            yield http
+        finally:
+            try:
+                self._idle.put_nowait(http)
+            except queue.Full:
+                http.close()
+
+
+class ClientRegistry:
+    """
+    Process-wide registry of API clients, built once per key.
+
+    The Google client libraries are only imported when the first client is
+    built, which keeps them off the app's startup path.
+
+    Streamlit runs every session on its own thread, so all lookups are
+    guarded by a lock. Setup time is recorded so the saving over building a
+    client per request can be measured.
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE):
+        self.http_pool = HttpPool(pool_size)
+        self._search_services = {}
+        self._gemini_models = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'search_builds': 0,
+            'search_reuses': 0,
+            'search_build_seconds': 0.0,
+            'gemini_builds': 0,
+            'gemini_reuses': 0,
+            'gemini_build_seconds': 0.0,
+        }
+
+    def search_service(self, api_key: str):
+        """
+        Custom Search discovery client for an API key.
+
+        If the CUSTOM_SEARCH_API_ENDPOINT environment variable is set (e.g.
+        to a local fake server), requests are sent there instead.
+        """
+        from googleapiclient.discovery import build
+
+        endpoint = os.environ.get("CUSTOM_SEARCH_API_ENDPOINT")
+        key = (api_key, endpoint)
+        with self._lock:
+            service = self._search_services.get(key)
+            if service is not None:
+                self._stats['search_reuses'] += 1
+                return service
+
+            started = time.perf_counter()
+            client_options = {"api_endpoint": endpoint} if endpoint else None
+            with tracing.span("client.build_search"):
+                service = build("customsearch", "v1", developerKey=api_key, cache_discovery=False,
+                                client_options=client_options)
+            self._stats['search_build_seconds'] += time.perf_counter() - started
+            self._stats['search_builds'] += 1
+            self._search_services[key] = service
+            return service
+
+    def gemini_model(self, api_key: str, model_name: str) -> "genai.GenerativeModel":
+        """
+        Gemini model bound to an API key.
+
+        ``genai.configure`` sets process-global state, so configuring and
+        binding the model's client happen together under the lock. If the
+        GEMINI_API_ENDPOINT environment variable is set (e.g. to a local fake
+        server for benchmarking), requests are sent there over REST.
+        """
+        import google.generativeai as genai
+        from google.generativeai import client as genai_client
+
+        endpoint = os.environ.get("GEMINI_API_ENDPOINT")
+        key = (api_key, model_name, endpoint)
+        with self._lock:
+            model = self._gemini_models.get(key)
+            if model is not None:
+                self._stats['gemini_reuses'] += 1
+                return model
+
+            started = time.perf_counter()
+            with tracing.span("client.build_gemini"):
+                if endpoint:
+                    genai.configure(api_key=api_key, transport="rest", client_options={"api_endpoint": endpoint})
+                else:
+                    genai.configure(api_key=api_key)
+                model = genai.GenerativeModel(model_name)
+                # Bind the client now; the model otherwise picks up whatever
+                # configuration is global at its first request. _client is
+                # private to google-generativeai, which pyproject.toml pins
+                # (==0.5.0) for this reason; recheck it when upgrading
+                model._client = genai_client.get_default_generative_client()
+            self._stats['gemini_build_seconds'] += time.perf_counter() - started
+            self._stats['gemini_builds'] += 1
+            self._gemini_models[key] = model
+            return model
+
+    def execute(self, request):
+        """
+        Execute a googleapiclient request on a pooled keep-alive connection.
+        """
+        with self.http_pool.connection() as http:
+            return request.execute(http=http)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Build/reuse counters and cumulative setup time per client type.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats['http_connections'] = self.http_pool.created
+        return stats
+
+    def clear(self) -> None:
+        """
+        Forget every client, e.g. after an API key change.
+        """
+        with self._lock:
+            self._search_services.clear()
+            self._gemini_models.clear()
+
+
+_registry = ClientRegistry()
+
+
+def get_registry() -> ClientRegistry:
+    """
+    The process-wide client registry.
+    """
+    return _registry
+
+
+def get_search_service(api_key: str):
+    return _registry.search_service(api_key)
+
+
+def get_gemini_model(api_key: str, model_name: str) -> "genai.GenerativeModel":
+    return _registry.gemini_model(api_key, model_name)
+
+
+def execute(request):
+    return _registry.execute(request)
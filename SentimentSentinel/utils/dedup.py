@@ -0,0 +1,139 @@
+import hashlib
+import re
+import threading
+import unicodedata
+from typing import Dict, FrozenSet, List
+
+import numpy as np
+
+# Trailing " - Reuters" / " | CNN" style source suffixes on syndicated titles
+_SOURCE_SUFFIX = re.compile(r"\s+[-|–—]\s+[^-|–—]{1,40}$")
+_NON_WORD = re.compile(r"[^\w\s]+")
+
+# Headlines sharing at least this share of their words (Jaccard similarity)
+# are treated as copies of the same story. Kept high because swapping one
+# word ("raises" for "cuts") can flip a headline's sentiment
+DEFAULT_SIMILARITY = 0.8
+
+# MinHash signature length and its split into LSH bands; 16 bands of 4
+# rows make titles above ~0.5 similarity likely to meet in some bucket
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 1 << 31, NUM_PERMUTATIONS).astype(np.uint64)
+_PERM_B = _rng.randint(0, 1 << 31, NUM_PERMUTATIONS).astype(np.uint64)
+
+
+def normalize_title(title: str) -> str:
+    """
+    Headline reduced to lowercase words, without punctuation or a trailing source name.
+    """
+    title = unicodedata.normalize("NFKC", title)
+    title = _SOURCE_SUFFIX.sub("", title.strip())
+    return " ".join(_NON_WORD.sub(" ", title.lower()).split())
+
+
+def minhash(words: FrozenSet[str]) -> np.ndarray:
+    """
+    MinHash signature of a set of words.
+    """
+    if not words:
+        return np.zeros(NUM_PERMUTATIONS, dtype=np.uint64)
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=4).digest(), "big") for word in words],
+        dtype=np.uint64
+    )
+    # a * x stays below 2**63, so the products can't overflow
+    return ((np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME).min(axis=0)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class HeadlineClusterer:
+    """
+    Groups syndicated copies of a story by their headlines.
+
+    Titles are normalized first and identical ones are grouped by hash.
+    Remaining titles get a MinHash signature over their words, and only
+    titles that land in the same bucket of some LSH band are compared; a
+    candidate joins the earlier title's cluster if the two share at least
+    ``similarity`` of their words. Clustering counters are kept across
+    calls.
+    """
+
+    def __init__(self, similarity: float = DEFAULT_SIMILARITY):
+        """
+        Args:
+            similarity (float): Smallest Jaccard similarity between the word
+                sets of two copies of a story
+        """
+        if not 0 < similarity <= 1:
+            raise ValueError("similarity must be in (0, 1]")
+        self.similarity = similarity
+        self.headlines = 0
+        self.duplicates = 0
+        self._lock = threading.Lock()
+
+    def cluster(self, titles: List[str]) -> List[int]:
+        """
+        Find the representative of each headline's cluster.
+
+        Args:
+            titles (List[str]): Headlines, in search result order
+
+        Returns:
+            List[int]: For each headline, the position of the first headline
+            in its cluster (its own position if it is a representative)
+        """
+        representative = list(range(len(titles)))
+        exact = {}
+        word_sets = {}
+        buckets = {}
+        rows = NUM_PERMUTATIONS // LSH_BANDS
+
+        for position, title in enumerate(titles):
+            normalized = normalize_title(title)
+            if normalized in exact:
+                representative[position] = exact[normalized]
+                continue
+
+            words = frozenset(normalized.split())
+            signature = minhash(words)
+            keys = [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(LSH_BANDS)]
+
+            match = None
+            for key in keys:
+                for other in buckets.get(key, ()):
+                    if (match is None or other < match) and jaccard(words, word_sets[other]) >= self.similarity:
+                        match = other
+            if match is not None:
+                representative[position] = match
+                exact[normalized] = match
+                continue
+
+            exact[normalized] = position
+            word_sets[position] = words
+            for key in keys:
+                buckets.setdefault(key, []).append(position)
+
+        with self._lock:
+            self.headlines += len(titles)
+            self.duplicates += sum(1 for position, first in enumerate(representative) if position != first)
+        return representative
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Headlines clustered, duplicates found and the share of scoring requests saved.
+        """
+        with self._lock:
+            return {
+                'headlines': self.headlines,
+                'duplicates': self.duplicates,
+                'saved_share': self.duplicates / self.headlines if self.headlines else 0.0,
+            }
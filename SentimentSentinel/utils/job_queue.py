@@ -0,0 +1,538 @@
+"""
+SQLite-backed analysis job queue and the worker processes that run it.
+
+The app submits a job per search and polls it for progress, partial results
+and the final articles; worker processes claim queued jobs and run them
+through iter_analyze_news. No broker is needed: the queue is one SQLite
+file, so extra workers can also be started on their own against the same
+file:
+
+    python -m utils.job_queue --workers 8
+"""
+import argparse
+import json
+import logging
+import os
+import pickle
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+
+import pandas as pd
+
+from utils import tracing
+from utils.articles import empty_articles
+from utils.search_cache import DEFAULT_SEARCH_MAX_AGE
+from utils.sentiment_cache import DEFAULT_CACHE_DIR
+
+logger = logging.getLogger("sentigrade.jobs")
+
+# Workers run from the app's directory so the utils package imports
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_JOB_QUEUE_PATH = os.environ.get(
+    "SENTIGRADE_JOB_QUEUE",
+    os.path.join(DEFAULT_CACHE_DIR, "jobs.sqlite3")
+)
+
+# Worker processes the app starts; 0 runs analyses in the Streamlit script
+DEFAULT_WORKERS = int(os.environ.get("SENTIGRADE_WORKERS", min(4, os.cpu_count() or 1)))
+
+# Seconds between checks of the queue, by idle workers and by the app
+POLL_INTERVAL = 0.25
+
+# A running job whose worker hasn't reported for this long is requeued
+STALE_AFTER = 10 * 60
+
+# Seconds between heartbeats of a running job, whether or not it made progress
+HEARTBEAT_INTERVAL = STALE_AFTER / 4
+
+# Attempts before a job that keeps losing its worker is failed
+MAX_ATTEMPTS = 3
+
+# Finished jobs are deleted this long after they finished
+JOB_RETENTION = 24 * 60 * 60
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class Job(NamedTuple):
+    """
+    State of one analysis job; ``params`` are iter_analyze_news arguments.
+    """
+    id: str
+    status: str
+    params: Dict
+    submitted_at: float
+    started_at: Optional[float]
+    finished_at: Optional[float]
+    worker: Optional[str]
+    progress: float
+    articles: int
+    error: Optional[str]
+    timings: Optional[Dict]
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+
+_JOB_COLUMNS = ("id, status, params, submitted_at, started_at, finished_at, worker, progress, articles, error, timings")
+
+
+def _to_job(row) -> Job:
+    return Job(
+        id=row[0],
+        status=row[1],
+        params=json.loads(row[2]),
+        submitted_at=row[3],
+        started_at=row[4],
+        finished_at=row[5],
+        worker=row[6],
+        progress=row[7],
+        articles=row[8],
+        error=row[9],
+        timings=json.loads(row[10]) if row[10] else None,
+    )
+
+
+class JobQueue:
+    """
+    Analysis jobs in a SQLite table, shared by the app and its workers.
+
+    Submitting a search that is already queued or running returns that job
+    instead of a new one, and so does submitting one that finished within
+    ``reuse_max_age`` seconds, so concurrent sessions searching the same
+    thing share one run across every process. Results are stored pickled;
+    the database is private to the app and its workers.
+    """
+
+    def __init__(self, path: str = DEFAULT_JOB_QUEUE_PATH, reuse_max_age: float = DEFAULT_SEARCH_MAX_AGE):
+        """
+        Args:
+            path (str): SQLite database file
+            reuse_max_age (float): Seconds a finished job's result is handed
+                to identical submissions
+        """
+        self.path = path
+        self.reuse_max_age = reuse_max_age
+        self._lock = threading.Lock()
+        # Submissions through this handle: new jobs, ones that joined a queued
+        # or running job, and ones handed a recently finished job's result
+        self._submissions = {'submitted': 0, 'coalesced': 0, 'reused': 0}
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Autocommit, with explicit transactions where reads and writes must agree
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " key TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " params TEXT NOT NULL,"
+            " submitted_at REAL NOT NULL,"
+            " started_at REAL,"
+            " finished_at REAL,"
+            " heartbeat REAL,"
+            " worker TEXT,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " progress REAL NOT NULL DEFAULT 0,"
+            " articles INTEGER NOT NULL DEFAULT 0,"
+            " result BLOB,"
+            " error TEXT,"
+            " timings TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, submitted_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_by_key ON jobs (key, submitted_at)")
+
+    def submit(self, queries: List[str], **params) -> str:
+        """
+        Queue an analysis, or join an identical one.
+
+        Args:
+            queries (List[str]): Queries to analyze
+            **params: Other iter_analyze_news arguments; JSON values, with
+                start_date and end_date as datetimes
+
+        Returns:
+            str: Job id
+        """
+        params = dict(params, queries=list(queries))
+        for name in ("start_date", "end_date"):
+            if isinstance(params.get(name), datetime):
+                params[name] = params[name].isoformat()
+        params_json = json.dumps(params, sort_keys=True)
+        # Jobs searching the same day's window are the same search
+        key = json.dumps({
+            name: value[:10] if name in ("start_date", "end_date") and value else value
+            for name, value in params.items()
+        }, sort_keys=True)
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                    (DONE, FAILED, now - JOB_RETENTION)
+                )
+                row = self._conn.execute(
+                    "SELECT id, status FROM jobs WHERE key = ?"
+                    " AND (status IN (?, ?) OR (status = ? AND error IS NULL AND finished_at >= ?))"
+                    " ORDER BY submitted_at DESC LIMIT 1",
+                    (key, QUEUED, RUNNING, DONE, now - self.reuse_max_age)
+                ).fetchone()
+                if row is not None:
+                    job_id, status = row
+                    outcome = 'reused' if status == DONE else 'coalesced'
+                    tracing.increment("jobs.coalesced")
+                else:
+                    job_id = uuid.uuid4().hex
+                    self._conn.execute(
+                        "INSERT INTO jobs (id, key, status, params, submitted_at) VALUES (?, ?, ?, ?, ?)",
+                        (job_id, key, QUEUED, params_json, now)
+                    )
+                    outcome = 'submitted'
+                    tracing.increment("jobs.submitted")
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._submissions[outcome] += 1
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _to_job(row) if row is not None else None
+
+    def result(self, job_id: str) -> pd.DataFrame:
+        """
+        Articles of a job so far: partial while it runs, final once done.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT result FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None or row[0] is None:
+            return empty_articles()
+        return pickle.loads(row[0])
+
+    def claim(self, worker: str) -> Optional[Job]:
+        """
+        Take the oldest queued job, first requeueing jobs whose worker went silent.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END,"
+                    " error = CASE WHEN attempts >= ? THEN 'worker stopped responding' ELSE error END,"
+                    " finished_at = CASE WHEN attempts >= ? THEN ? ELSE NULL END"
+                    " WHERE status = ? AND heartbeat < ?",
+                    (MAX_ATTEMPTS, FAILED, QUEUED, MAX_ATTEMPTS, MAX_ATTEMPTS, now, RUNNING, now - STALE_AFTER)
+                )
+                row = self._conn.execute(
+                    f"UPDATE jobs SET status = ?, worker = ?, started_at = ?, heartbeat = ?, attempts = attempts + 1"
+                    f" WHERE id = (SELECT id FROM jobs WHERE status = ? ORDER BY submitted_at LIMIT 1)"
+                    f" RETURNING {_JOB_COLUMNS}",
+                    (RUNNING, worker, now, now, QUEUED)
+                ).fetchone()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return _to_job(row) if row is not None else None
+
+    def heartbeat(self, job_id: str, worker: str) -> bool:
+        """
+        Tell the queue a running job's worker is still at it.
+
+        Returns:
+            bool: False if the job is no longer running on ``worker``, e.g.
+            because it was requeued after the worker went silent
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET heartbeat = ? WHERE id = ? AND worker = ? AND status = ?",
+                (time.time(), job_id, worker, RUNNING)
+            )
+        return cursor.rowcount > 0
+
+    def update(self,
+               job_id: str,
+               progress: float,
+               articles: Optional[pd.DataFrame] = None,
+               worker: Optional[str] = None) -> bool:
+        """
+        Report progress (0-1) and, if given, the articles so far.
+
+        With ``worker``, nothing is written unless the job is still running
+        on that worker, so a worker whose job was requeued and claimed
+        again can't overwrite the new run's progress.
+
+        Returns:
+            bool: Whether the job was updated
+        """
+        owner, owner_params = self._owner_clause(worker)
+        with self._lock:
+            if articles is None:
+                cursor = self._conn.execute(
+                    f"UPDATE jobs SET progress = ?, heartbeat = ? WHERE id = ?{owner}",
+                    (progress, time.time(), job_id, *owner_params)
+                )
+            else:
+                cursor = self._conn.execute(
+                    f"UPDATE jobs SET progress = ?, heartbeat = ?, articles = ?, result = ? WHERE id = ?{owner}",
+                    (progress, time.time(), len(articles), pickle.dumps(articles), job_id, *owner_params)
+                )
+        return cursor.rowcount > 0
+
+    def finish(self,
+               job_id: str,
+               articles: Optional[pd.DataFrame] = None,
+               error: Optional[str] = None,
+               timings: Optional[Dict] = None,
+               worker: Optional[str] = None) -> bool:
+        """
+        Mark a job done with its articles, or failed if there are none and ``error`` is set.
+
+        An error alongside articles is kept as a warning, e.g. when some
+        queries of the job failed. With ``worker``, the job is only finished
+        if it is still running on that worker, as for update.
+
+        Returns:
+            bool: Whether the job was finished
+        """
+        status = FAILED if articles is None and error is not None else DONE
+        result = pickle.dumps(articles) if articles is not None else None
+        owner, owner_params = self._owner_clause(worker)
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, progress = 1, finished_at = ?, articles = ?, result = ?,"
+                f" error = ?, timings = ? WHERE id = ?{owner}",
+                (status, time.time(), len(articles) if articles is not None else 0, result, error,
+                 json.dumps(timings) if timings is not None else None, job_id, *owner_params)
+            )
+        return cursor.rowcount > 0
+
+    @staticmethod
+    def _owner_clause(worker: Optional[str]):
+        if worker is None:
+            return "", ()
+        return " AND worker = ? AND status = ?", (worker, RUNNING)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Number of jobs per status in the queue, and submissions through this
+        handle: new jobs ('submitted'), ones that joined a queued or running
+        job ('coalesced') and ones given a recent result ('reused').
+        """
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            submissions = dict(self._submissions)
+        return dict({status: counts.get(status, 0) for status in (QUEUED, RUNNING, DONE, FAILED)}, **submissions)
+
+
+def run_job(queue: JobQueue, job: Job) -> None:
+    """
+    Run one claimed job through the pipeline, reporting as it goes.
+
+    A heartbeat thread keeps the job from looking stale while a single
+    stage (a slow search, rate limiter backoff, a large scoring batch)
+    runs longer than STALE_AFTER. Progress and the result are only written
+    while the job is still this worker's.
+    """
+    from utils.article_store import get_default_article_store
+    from utils.news_api import _combine_results, iter_analyze_news
+
+    params = dict(job.params)
+    queries = params.pop('queries')
+    save_articles = params.pop('save_articles', True)
+    for name in ("start_date", "end_date"):
+        if params.get(name):
+            params[name] = datetime.fromisoformat(params[name])
+
+    stop_heartbeat = threading.Event()
+
+    def heartbeat():
+        while not stop_heartbeat.wait(HEARTBEAT_INTERVAL):
+            if not queue.heartbeat(job.id, job.worker):
+                logger.warning("Job %s is no longer running on this worker", job.id)
+                return
+
+    heartbeat_thread = threading.Thread(target=heartbeat, name=f"heartbeat-{job.id}", daemon=True)
+    heartbeat_thread.start()
+    try:
+        with tracing.trace("job") as trace:
+            results = [[] for _ in queries]
+            errors = []
+            queries_done = 0
+            try:
+                for chunk in iter_analyze_news(queries, **params):
+                    if chunk.error is not None:
+                        errors.append(f"{chunk.query}: {chunk.error}")
+                    if chunk.query_done:
+                        queries_done += 1
+                    if not chunk.articles.empty:
+                        results[chunk.query_index].append(chunk.articles)
+                        queue.update(job.id, queries_done / len(queries), _combine_results(results),
+                                     worker=job.worker)
+                    elif chunk.query_done:
+                        queue.update(job.id, queries_done / len(queries), worker=job.worker)
+
+                df = _combine_results(results)
+                if save_articles and not df.empty:
+                    with tracing.span("store.add", articles=len(df)):
+                        get_default_article_store().add(df)
+            except Exception as e:
+                logger.exception("Job %s failed", job.id)
+                df = None
+                errors.append(str(e))
+    finally:
+        stop_heartbeat.set()
+        heartbeat_thread.join()
+    if not queue.finish(job.id, df, "; ".join(errors) or None, trace.to_dict(), worker=job.worker):
+        logger.warning("Job %s was taken over by another worker; its result is discarded", job.id)
+
+
+def run_worker(path: str = DEFAULT_JOB_QUEUE_PATH, parent_pid: Optional[int] = None) -> None:
+    """
+    Claim and run jobs until SIGTERM, or until the parent process exits.
+
+    Args:
+        path (str): Job queue database file
+        parent_pid (Optional[int]): Exit once this process is gone
+    """
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    # Ctrl-C reaches the whole process group; the parent stops workers itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    queue = JobQueue(path)
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    while not stop.is_set() and (parent_pid is None or os.getppid() == parent_pid):
+        job = queue.claim(worker)
+        if job is None:
+            stop.wait(POLL_INTERVAL)
+            continue
+        logger.info("Running job %s: %s", job.id, ", ".join(job.params['queries']))
+        run_job(queue, job)
+
+
+class WorkerPool:
+    """
+    Local worker processes running jobs from one queue.
+
+    Each worker is a fresh ``python -m utils.job_queue --worker`` process,
+    so it shares nothing with the app but the queue file (multiprocessing's
+    spawn would re-run the Streamlit script in every worker). Workers exit
+    on their own when the process that started them does.
+    """
+
+    def __init__(self, processes: int = DEFAULT_WORKERS, path: str = DEFAULT_JOB_QUEUE_PATH):
+        """
+        Args:
+            processes (int): Number of worker processes
+            path (str): Job queue database file
+        """
+        self.processes = processes
+        self.path = path
+        self._workers = []
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """
+        Start workers, replacing any that have exited.
+        """
+        with self._lock:
+            self._workers = [worker for worker in self._workers if worker.poll() is None]
+            while len(self._workers) < self.processes:
+                self._workers.append(subprocess.Popen(
+                    [sys.executable, "-m", "utils.job_queue", "--worker",
+                     "--queue", self.path, "--parent-pid", str(os.getpid())],
+                    cwd=APP_DIR,
+                    stdin=subprocess.DEVNULL
+                ))
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop after the jobs in progress, if any, finish.
+        """
+        with self._lock:
+            for worker in self._workers:
+                worker.terminate()
+            for worker in self._workers:
+                try:
+                    worker.wait(timeout)
+                except subprocess.TimeoutExpired:
+                    pass
+            self._workers = [worker for worker in self._workers if worker.poll() is None]
+
+    def alive(self) -> int:
+        with self._lock:
+            return sum(1 for worker in self._workers if worker.poll() is None)
+
+
+_default_queue = None
+_default_pool = None
+_default_lock = threading.Lock()
+
+
+def get_default_job_queue() -> JobQueue:
+    """
+    Process-wide handle on the default job queue.
+    """
+    global _default_queue
+    with _default_lock:
+        if _default_queue is None:
+            _default_queue = JobQueue()
+        return _default_queue
+
+
+def get_default_worker_pool() -> Optional[WorkerPool]:
+    """
+    Process-wide worker pool on the default queue, started on first use;
+    None when SENTIGRADE_WORKERS=0.
+    """
+    global _default_pool
+    if DEFAULT_WORKERS <= 0:
+        return None
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = WorkerPool()
+        _default_pool.start()
+        return _default_pool
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes to run")
+    parser.add_argument("--queue", default=DEFAULT_JOB_QUEUE_PATH, help="job queue database file")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--parent-pid", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(process)d %(levelname)s %(message)s")
+    if args.worker:
+        run_worker(args.queue, args.parent_pid)
+        return
+
+    pool = WorkerPool(args.workers, args.queue)
+    pool.start()
+    try:
+        while pool.alive():
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,90 @@
-import streamlit as st
-from googleapiclient.discovery import build
 import pandas as pd
+import queue
+import json
 import time
-import google.generativeai as genai
-import random
-from typing import List, Dict, Optional
+import math
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterator, List, Dict, NamedTuple, Optional, Tuple
 from datetime import datetime
+from utils import tracing
+from utils.article_store import get_default_article_store
+from utils.articles import Article, article_frame, empty_articles, typed_articles
+from utils.clients import execute, get_gemini_model, get_search_service
+from utils.dedup import HeadlineClusterer
+from utils.job_queue import DEFAULT_JOB_QUEUE_PATH
+from utils.publish_dates import extract_publish_date
+from utils.query_planner import SubQuery, keyword_coverage, plan_queries
+from utils.rate_limiter import AdaptiveRateLimiter, SharedBudget, TokenBucket
+from utils.reporting import report_error, report_warning, script_context_initializer
+from utils.result_cache import get_default_result_cache
+from utils.sentiment_backends import GeminiBackend, SentimentBackend
+from utils.sentiment_cache import SentimentCache, get_default_cache, make_key
+from utils.search_cache import DEFAULT_SEARCH_MAX_AGE, SearchCache, get_default_search_cache
+from utils.tiered_scorer import TieredRouter
+
+# Gemini model used for headline scoring
+GEMINI_MODEL_NAME = "gemini-2.0-flash"
+
+# Bump whenever the scoring prompts change so cached scores are not reused
+PROMPT_VERSION = "1"
+
+# Defaults for the concurrent scoring stage
+DEFAULT_MAX_CONCURRENCY = 5
+DEFAULT_REQUESTS_PER_SECOND = 5.0
+
+# Ceiling for Custom Search requests across all sessions and job workers
+DEFAULT_SEARCH_REQUESTS_PER_SECOND = 5.0
+
+# Number of queries searched and scored at the same time
+DEFAULT_MAX_PARALLEL_QUERIES = 4
+
+# Number of headlines sent to Gemini in a single batch prompt
+DEFAULT_BATCH_SIZE = 10
+
+BATCH_PROMPT = (
+    "Please analyze the sentiment of each of the following headlines. "
+    "Return only a JSON array with one object per headline of the form "
+    '{{"index": <headline index>, "score": <sentiment score between -10 (negative) and 10 (positive)>}}, '
+    "no explanations or reasons.\n\n{headlines}"
+)
+
+# Matches a ```json ... ``` fence the model sometimes wraps its answer in
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+# Score yielded for a headline that could not be scored, unlike None (neutral)
+SCORE_FAILED = object()
+
+# Shared by every session, so quota pushback seen by one slows them all. Their
+# tokens come from a budget next to the job table, which the app and its job
+# workers all draw on, so more workers don't multiply the quota
+_search_limiter = AdaptiveRateLimiter(DEFAULT_SEARCH_REQUESTS_PER_SECOND,
+                                      budget=SharedBudget(DEFAULT_JOB_QUEUE_PATH, "search"))
+_gemini_limiter = AdaptiveRateLimiter(DEFAULT_REQUESTS_PER_SECOND,
+                                      budget=SharedBudget(DEFAULT_JOB_QUEUE_PATH, "gemini"))
+
+# Custom Search returns at most 10 results per call and 100 per query
+SEARCH_PAGE_SIZE = 10
+MAX_SEARCH_RESULTS = 100
+
+# Shared so duplicate counts add up across sessions
+_headline_clusterer = HeadlineClusterer()
+
+_search_stats = {'searches': 0, 'calls': 0, 'cached_pages': 0, 'wasted_calls': 0, 'raw_items': 0, 'kept_items': 0}
+_search_stats_lock = threading.Lock()
+
+def get_rate_limiters() -> Dict[str, AdaptiveRateLimiter]:
+    """
+    The process-wide Custom Search and Gemini rate limiters.
+    """
+    return {'search': _search_limiter, 'gemini': _gemini_limiter}
+
+def dedup_stats() -> Dict[str, float]:
+    """
+    Near-duplicate headline counters since the process started.
+    """
+    return _headline_clusterer.stats()
 
 def setup_api_keys():
     """
@@ -24,60 +103,289 @@ def setup_api_keys():
     
     return api_key, cse_id, gemini_api_key, api_configured
 
-def search_news(query: str, api_key: Optional[str], cse_id: Optional[str], max_results: int = 10, start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[Dict[str, str]]:
-    if not api_key or not cse_id:
-        st.error("API Key or CSE ID not configured.")
+def _fetch_search_results(api_key: str,
+                          cse_id: str,
+                          base_query: str,
+                          max_results: int,
+                          start_date: Optional[str],
+                          end_date: Optional[str],
+                          cache: Optional[SearchCache],
+                          max_age: float,
+                          keep: Optional[Callable[[Dict], bool]] = None) -> List[Dict]:
+    """
+    Page through Custom Search results, serving fresh pages from the cache.
+
+    Items are filtered with ``keep`` as each page arrives, and paging stops
+    as soon as ``max_results`` items were kept, on an empty or short page
+    (the last one), or at Custom Search's limit of 100 results per query.
+    Full pages are always requested since a call costs the same whatever
+    its size and most raw results are filtered out.
+    """
+    refined_query = base_query
+    if start_date and end_date:
+        refined_query += f" after:{start_date} before:{end_date}"
+
+    results = []
+    start_index = 1
+    calls = cached_pages = wasted_calls = raw_items = 0
+    while len(results) < max_results and start_index <= MAX_SEARCH_RESULTS:
+        batch_size = min(SEARCH_PAGE_SIZE, MAX_SEARCH_RESULTS - start_index + 1)
+
+        items = None
+        if cache is not None:
+            items = cache.get_page(base_query, start_date or "", end_date or "", start_index, batch_size, max_age)
+        from_api = items is None
+        if from_api:
+            service = get_search_service(api_key)
+            res = _search_limiter.call(tracing.timed("search.page", execute, start=start_index),
+                                       service.cse().list(q=refined_query, cx=cse_id, num=batch_size, start=start_index))
+            items = res.get('items', [])
+            # Relative dates ("3 days ago") count back from the fetch, even when served from the cache later
+            fetched_at = time.time()
+            for item in items:
+                item['fetchedAt'] = fetched_at
+            calls += 1
+            if cache is not None:
+                cache.put_page(base_query, start_date or "", end_date or "", start_index, batch_size, items)
+        else:
+            cached_pages += 1
+
+        kept = [item for item in items if keep is None or keep(item)]
+        if from_api and not kept:
+            wasted_calls += 1
+        raw_items += len(items)
+        results.extend(kept)
+
+        if len(items) < batch_size:
+            break
+        start_index += batch_size
+
+    _record_search_stats(calls=calls, cached_pages=cached_pages, wasted_calls=wasted_calls,
+                         raw_items=raw_items, kept_items=len(results))
+    return results[:max_results]
+
+def _record_search_stats(**counts: int) -> None:
+    with _search_stats_lock:
+        _search_stats['searches'] += 1
+        for name, count in counts.items():
+            _search_stats[name] += count
+    tracing.increment("search.api_calls", counts['calls'])
+    tracing.increment("search.cache_hits", counts['cached_pages'])
+    tracing.increment("search.wasted_calls", counts['wasted_calls'])
+
+def search_stats() -> Dict[str, int]:
+    """
+    Custom Search paging counters since the process started.
+
+    Returns:
+        Dict[str, int]: Searches run, API calls made, pages served from the
+        cache, wasted calls (API pages with no matching article), and raw
+        and kept result items
+    """
+    with _search_stats_lock:
+        return dict(_search_stats)
+
+def _search_sub_query(sub_query: SubQuery,
+                      api_key: str,
+                      cse_id: str,
+                      max_results: int,
+                      start_date: Optional[str],
+                      end_date: Optional[str],
+                      cache: Optional[SearchCache],
+                      max_age: float,
+                      incremental: bool,
+                      in_window: Callable[[Dict], bool]) -> List[Dict]:
+    """
+    Result items of one planned sub-query whose titles mention one of its
+    keywords and whose publish dates pass ``in_window``.
+    """
+    base_query = sub_query.text  # Removed site restriction to improve results
+    lowered = [keyword.lower() for keyword in sub_query.keywords]
+
+    def matches(item: Dict) -> bool:
+        title = item.get('title', '').lower()
+        return any(keyword in title for keyword in lowered) and in_window(item)
+
+    if incremental and cache is not None and start_date and end_date:
+        run = cache.get_run(base_query)
+        if run is not None and start_date <= run[0] <= end_date:
+            run_end_date, fetched_at, previous = run
+            if run_end_date == end_date and time.time() - fetched_at < max_age:
+                results = previous
+            else:
+                # Only ask for what was published since the last run
+                newer = _fetch_search_results(api_key, cse_id, base_query, max_results,
+                                              run_end_date, end_date, cache, max_age, matches)
+                links = {item['link'] for item in newer}
+                results = newer + [item for item in previous if item['link'] not in links]
+                cache.put_run(base_query, end_date, results)
+        else:
+            results = _fetch_search_results(api_key, cse_id, base_query, max_results,
+                                            start_date, end_date, cache, max_age, matches)
+            cache.put_run(base_query, end_date, results)
+    else:
+        results = _fetch_search_results(api_key, cse_id, base_query, max_results,
+                                        start_date, end_date, cache, max_age, matches)
+
+    return [item for item in results if matches(item)]
+
+def _search_news(query: str,
+                 api_key: str,
+                 cse_id: str,
+                 max_results: int,
+                 start_date: Optional[str],
+                 end_date: Optional[str],
+                 cache: Optional[SearchCache],
+                 max_age: float,
+                 incremental: bool) -> List[Article]:
+    """
+    Search news like search_news, raising on API errors.
+    """
+    plan = plan_queries(query)
+    if not plan:
         return []
+    lowered = [keyword.lower() for sub_query in plan for keyword in sub_query.keywords]
+    first_day = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else None
+    last_day = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else None
 
-    try:
-        service = build("customsearch", "v1", developerKey=api_key)
+    def in_window(item: Dict) -> bool:
+        if first_day is None and last_day is None:
+            return True
+        # Results whose publish date is known must fall in the date window
+        published = extract_publish_date(item)
+        return published is None or (
+            (first_day is None or published.date() >= first_day)
+            and (last_day is None or published.date() <= last_day)
+        )
 
-        keywords = [k.strip() for k in query.split(",")]
-        refined_query = f'"{" AND ".join(keywords)}"'  # Removed site restriction to improve results
+    # Sub-queries share the result budget, so a split search costs about as many calls as one query
+    budget = math.ceil(max_results / len(plan))
+    search = lambda sub_query: _search_sub_query(sub_query, api_key, cse_id, budget, start_date, end_date,
+                                                 cache, max_age, incremental, in_window)
+    tracing.increment("search.sub_queries", len(plan))
+    if len(plan) == 1:
+        item_lists = [search(plan[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=len(plan), initializer=script_context_initializer()) as executor:
+            item_lists = list(executor.map(search, plan))
 
-        if start_date and end_date:
-            refined_query += f" after:{start_date} before:{end_date}"
+    # The same page found by several sub-queries is kept once
+    items = {}
+    for item_list in item_lists:
+        for item in item_list:
+            items.setdefault(item['link'], item)
 
-        results = []
-        start_index = 1
-        while len(results) < max_results:
-            remaining = max_results - len(results)
-            batch_size = min(10, remaining)
-            res = service.cse().list(q=refined_query, cx=cse_id, num=batch_size, start=start_index).execute()
-            items = res.get('items', [])
+    news_articles = []
+    coverage = {}
+    for item in items.values():
+        snippet = item.get('snippet', 'No snippet available')
+        news_articles.append(Article(
+            title=item['title'],
+            link=item['link'],
+            snippet=snippet,
+            source=item.get('displayLink', 'Unknown source'),
+            date=extract_publish_date(item)
+        ))
+        coverage[item['link']] = keyword_coverage(f"{item['title']} {snippet}", lowered)
 
-            if not items:
-                break
-
-            results.extend(items)
-            start_index += batch_size  # Increment by batch size
-
-        news_articles = []
-        for item in results[:max_results]:
-            if any(keyword.lower() in item['title'].lower() for keyword in keywords):
-                published_date = item.get('publishedTime', None)
-                if published_date:
-                    try:
-                        published_date = datetime.strptime(published_date, "%a, %d %b %Y %H:%M:%S %Z")
-                    except ValueError:
-                        published_date = None
-                news_articles.append({
-                    'title': item['title'],
-                    'link': item['link'],
-                    'snippet': item.get('snippet', 'No snippet available'),
-                    'source': item.get('displayLink', 'Unknown source'),
-                    'date': published_date if published_date else 'Unknown date'
-                })
-
-        news_articles.sort(key=lambda x: x['date'] if x['date'] != 'Unknown date' else datetime.min, reverse=True)
-
-        return news_articles[:max_results]
+    # Articles mentioning more of the keywords first, most recent first among equals
+    news_articles.sort(key=lambda article: article.date or datetime.min, reverse=True)
+    news_articles.sort(key=lambda article: coverage[article.link], reverse=True)
+
+    return news_articles[:max_results]
+
+def search_news(query: str,
+                api_key: Optional[str],
+                cse_id: Optional[str],
+                max_results: int = 10,
+                start_date: Optional[str] = None,
+                end_date: Optional[str] = None,
+                cache: Optional[SearchCache] = None,
+                max_age: float = DEFAULT_SEARCH_MAX_AGE,
+                incremental: bool = False) -> List[Article]:
+    """
+    Search Google Custom Search for news headlines matching the query.
+    
+    Each keyword is searched for on its own (see plan_queries), the
+    sub-queries run side by side and their results are merged by link.
+    With a cache, result pages fetched less than ``max_age`` seconds ago
+    are reused without any request. In incremental mode only results newer
+    than the last cached run of the query are fetched and merged with that
+    run.
+    
+    Args:
+        query (str): Comma-separated keywords
+        api_key (Optional[str]): Google API Key
+        cse_id (Optional[str]): Custom Search Engine ID
+        max_results (int): Maximum number of articles to return
+        start_date (Optional[str]): Start of the date window (YYYY-MM-DD)
+        end_date (Optional[str]): End of the date window (YYYY-MM-DD)
+        cache (Optional[SearchCache]): Result cache to consult first
+        max_age (float): Freshness window for cached results in seconds
+        incremental (bool): Only fetch results newer than the last cached run
+        
+    Returns:
+        List[Article]: Articles mentioning the most keywords first, then most
+        recent first (unknown dates last)
+    """
+    if not api_key or not cse_id:
+        report_error("API Key or CSE ID not configured.")
+        return []
 
+    try:
+        return _search_news(query, api_key, cse_id, max_results, start_date, end_date,
+                            cache, max_age, incremental)
     except Exception as e:
-        st.error(f"Error searching news: {str(e)}")
+        report_error(f"Error searching news: {str(e)}")
         return []
 
 
+def normalize_score(sentiment_score: float) -> Optional[int]:
+    """
+    Clamp a raw model score to [-10, 10] and round it.
+    
+    Args:
+        sentiment_score (float): Score returned by the model
+        
+    Returns:
+        Optional[int]: Rounded score, or None for neutral (0) sentiment
+    """
+    # Ensure the score is in the range [-10, 10]
+    sentiment_score = max(-10, min(10, sentiment_score))
+    
+    # Round the score to the nearest whole number
+    rounded_score = round(sentiment_score)
+    
+    # Remove neutral sentiment (score = 0)
+    if rounded_score == 0:
+        return None
+    
+    return rounded_score
+
+def _request_sentiment(text: str, api_key: str, model_name: str = GEMINI_MODEL_NAME) -> Optional[int]:
+    """
+    Score one headline with Gemini, raising on API or parse errors.
+    """
+    # Shared model, configured once per API key
+    model = get_gemini_model(api_key, model_name)
+    
+    # Call generate_content directly as shown in the notebook
+    response = model.generate_content(
+        f"Please analyze the sentiment of the following headline and return only the sentiment score between -10 (negative) and 10 (positive), no explanations or reasons: {text}."
+    )
+    
+    # Extract the sentiment score exactly as in the notebook
+    try:
+        return normalize_score(float(response.text.strip()))
+    except ValueError:
+        raise ValueError(f"Could not convert sentiment response to number: {response.text}")
+
+def _report_scoring_error(error: Exception) -> None:
+    if isinstance(error, ValueError):
+        report_warning(str(error))
+    else:
+        report_error(f"Error with Gemini API: {str(error)}")
+
 def gemini_analyze_sentiment(text: str, api_key: Optional[str]) -> Optional[int]:
     """
     Analyze sentiment of text using Google Gemini API.
@@ -90,139 +398,646 @@ def gemini_analyze_sentiment(text: str, api_key: Optional[str]) -> Optional[int]
         Optional[int]: Rounded sentiment score between -10 and 10
     """
     if not api_key:
-        st.error("Gemini API Key not configured.")
+        report_error("Gemini API Key not configured.")
         return None
     
     try:
-        # Configure the API key exactly as in the notebook
-        genai.configure(api_key=api_key)
+        return _gemini_limiter.call(_request_sentiment, text, api_key)
+    except Exception as e:
+        _report_scoring_error(e)
+        return None
+
+def parse_batch_scores(response_text: str, count: int) -> Dict[int, Optional[int]]:
+    """
+    Parse a batch response into validated scores keyed by headline index.
+    
+    Entries with a missing or out-of-range index, or a score that is not a
+    finite number, are left out so the caller can score them individually.
+    
+    Args:
+        response_text (str): Raw model output, expected to be a JSON array
+        count (int): Number of headlines in the batch
         
-        # Create the model with the exact same model name
-        model = genai.GenerativeModel("gemini-2.0-flash")
+    Returns:
+        Dict[int, Optional[int]]: Normalized scores for the entries that parsed
+    """
+    try:
+        entries = json.loads(_CODE_FENCE.sub("", response_text.strip()))
+    except ValueError:
+        return {}
+    
+    if not isinstance(entries, list):
+        return {}
+    
+    scores = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        index = entry.get('index')
+        score = entry.get('score')
+        if isinstance(index, bool) or not isinstance(index, int) or not 0 <= index < count:
+            continue
+        if isinstance(score, str):
+            try:
+                score = float(score)
+            except ValueError:
+                continue
+        if isinstance(score, bool) or not isinstance(score, (int, float)) or not math.isfinite(score):
+            continue
+        scores[index] = normalize_score(score)
+    return scores
+
+def _request_sentiment_batch(texts: List[str], api_key: str, model_name: str = GEMINI_MODEL_NAME) -> Dict[int, Optional[int]]:
+    """
+    Score several headlines with one Gemini request, raising on API errors.
+    
+    Returns:
+        Dict[int, Optional[int]]: Scores for the entries that parsed
+    """
+    model = get_gemini_model(api_key, model_name)
+    
+    headlines = "\n".join(f"[{i}] {text}" for i, text in enumerate(texts))
+    response = model.generate_content(BATCH_PROMPT.format(headlines=headlines))
+    return parse_batch_scores(response.text, len(texts))
+
+def gemini_analyze_sentiment_batch(texts: List[str],
+                                   api_key: Optional[str],
+                                   fallback: Optional[Callable[[str], Optional[int]]] = None) -> List[Optional[int]]:
+    """
+    Analyze sentiment of several headlines with a single Gemini request.
+    
+    Headlines whose entry in the JSON response is missing or invalid are
+    re-scored one at a time with ``fallback``.
+    
+    Args:
+        texts (List[str]): Headlines to analyze
+        api_key (Optional[str]): Gemini API Key
+        fallback (Optional[Callable[[str], Optional[int]]]): Per-headline scorer
+            used for entries that fail to parse (defaults to gemini_analyze_sentiment)
         
-        # Call generate_content directly as shown in the notebook
-        response = model.generate_content(
-            f"Please analyze the sentiment of the following headline and return only the sentiment score between -10 (negative) and 10 (positive), no explanations or reasons: {text}."
+    Returns:
+        List[Optional[int]]: Rounded scores in the same order as ``texts``
+    """
+    if not texts:
+        return []
+    
+    if not api_key:
+        report_error("Gemini API Key not configured.")
+        return [None] * len(texts)
+    
+    if fallback is None:
+        fallback = lambda text: gemini_analyze_sentiment(text, api_key)
+    
+    # A single headline gains nothing from the batch prompt
+    if len(texts) == 1:
+        return [fallback(texts[0])]
+    
+    try:
+        parsed = _gemini_limiter.call(_request_sentiment_batch, texts, api_key)
+    except Exception as e:
+        report_error(f"Error with Gemini API: {str(e)}")
+        return [None] * len(texts)
+    
+    return [parsed[i] if i in parsed else fallback(text) for i, text in enumerate(texts)]
+
+def iter_scored_headlines(titles: List[str],
+                          api_key: str,
+                          max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                          rate_limiter: Optional[TokenBucket] = None,
+                          batch_size: int = DEFAULT_BATCH_SIZE,
+                          cache: Optional[SentimentCache] = None,
+                          router: Optional[TieredRouter] = None,
+                          backend: Optional[SentimentBackend] = None) -> Iterator[List[Tuple[int, Optional[int]]]]:
+    """
+    Score headlines concurrently with Gemini, yielding scores as they arrive.
+
+    With a ``router``, headlines are scored locally with VADER first and
+    only the ambiguous ones go on to Gemini. Headlines found in ``cache``
+    are answered without a request and yielded first. The rest are
+    de-duplicated, grouped into batches of ``batch_size`` and each batch is
+    scored with one request. Requests run on a bounded thread pool and are
+    paced by a token bucket instead of a fixed sleep between calls; with an
+    AdaptiveRateLimiter, throttled requests are retried with backoff instead
+    of being lost. Successful scores are written back to the cache; failed
+    ones are not, and are yielded as SCORE_FAILED rather than None, which
+    means neutral. Another model can be plugged in as ``backend``; local
+    backends skip the rate limiter.
+
+    Args:
+        titles (List[str]): Headlines to score
+        api_key (str): Gemini API Key
+        max_concurrency (int): Maximum number of requests in flight
+        rate_limiter (Optional[TokenBucket]): Limiter to pace requests with
+            (defaults to the process-wide Gemini limiter)
+        batch_size (int): Headlines per request (1 disables batching)
+        cache (Optional[SentimentCache]): Score cache to consult first
+        router (Optional[TieredRouter]): Local-first router for tiered scoring
+        backend (Optional[SentimentBackend]): Model to score with (defaults to Gemini)
+
+    Yields:
+        List[Tuple[int, Optional[int]]]: (position in ``titles``, score) pairs,
+        one list per completed batch; the score is SCORE_FAILED if scoring failed
+    """
+    if not titles:
+        return
+
+    if router is not None:
+        with tracing.span("score.local", headlines=len(titles)):
+            local, remote = router.route(titles)
+        if local:
+            yield local
+        if remote:
+            for chunk in iter_scored_headlines([titles[position] for position in remote], api_key,
+                                               max_concurrency, rate_limiter, batch_size, cache,
+                                               backend=backend):
+                yield [(remote[i], score) for i, score in chunk]
+        return
+
+    if backend is None:
+        backend = GeminiBackend(api_key)
+    if rate_limiter is None:
+        rate_limiter = _gemini_limiter
+
+    def request(fn: Callable, *args):
+        timed = tracing.timed("score.request", fn, counter="score.requests", backend=backend.model_name)
+        return timed(*args) if backend.local else rate_limiter.call(timed, *args)
+
+    keys = [make_key(title, backend.model_name, backend.version) for title in titles]
+    cached = cache.get_many(keys) if cache is not None else {}
+
+    # One request per distinct uncached headline
+    pending = {}
+    positions = {}
+    hits = []
+    for position, (key, title) in enumerate(zip(keys, titles)):
+        if key in cached:
+            hits.append((position, cached[key]))
+        else:
+            pending.setdefault(key, title)
+            positions.setdefault(key, []).append(position)
+
+    tracing.increment("score.cache_hits", len(hits))
+    if hits:
+        tracing.increment("score.neutral_dropped", sum(1 for _, score in hits if score is None))
+        yield hits
+
+    if not pending:
+        return
+
+    def score(title: str) -> Tuple[Optional[int], bool]:
+        try:
+            return request(backend.score, title), True
+        except Exception as e:
+            _report_scoring_error(e)
+            return None, False
+
+    def score_batch(batch: List[str]) -> List[Tuple[Optional[int], bool]]:
+        if len(batch) == 1:
+            return [score(batch[0])]
+        try:
+            parsed = request(backend.score_batch, batch)
+        except Exception as e:
+            report_error(f"Error with Gemini API: {str(e)}")
+            return [(None, False)] * len(batch)
+        return [(parsed[i], True) if i in parsed else score(title) for i, title in enumerate(batch)]
+
+    pending_keys = list(pending)
+    batch_size = max(1, batch_size)
+    batches = [pending_keys[i:i + batch_size] for i in range(0, len(pending_keys), batch_size)]
+
+    workers = max(1, min(max_concurrency, len(batches)))
+    with ThreadPoolExecutor(max_workers=workers, initializer=script_context_initializer()) as executor:
+        futures = {
+            executor.submit(score_batch, [pending[key] for key in batch]): batch
+            for batch in batches
+        }
+        for future in as_completed(futures):
+            batch = futures[future]
+            results = future.result()
+
+            fresh = {key: result for key, (result, ok) in zip(batch, results) if ok}
+            if cache is not None:
+                cache.put_many(fresh)
+            tracing.increment("score.failed", len(results) - len(fresh))
+            tracing.increment("score.neutral_dropped", sum(1 for result in fresh.values() if result is None))
+
+            yield [
+                (position, result if ok else SCORE_FAILED)
+                for key, (result, ok) in zip(batch, results)
+                for position in positions[key]
+            ]
+
+def score_headlines(titles: List[str],
+                    api_key: str,
+                    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                    rate_limiter: Optional[TokenBucket] = None,
+                    batch_size: int = DEFAULT_BATCH_SIZE,
+                    cache: Optional[SentimentCache] = None,
+                    router: Optional[TieredRouter] = None,
+                    backend: Optional[SentimentBackend] = None) -> List[Optional[int]]:
+    """
+    Score headlines concurrently with Gemini.
+
+    Takes the same arguments as iter_scored_headlines and waits for every
+    batch to finish.
+
+    Returns:
+        List[Optional[int]]: Scores in the same order as ``titles``, with
+        SCORE_FAILED for headlines that could not be scored
+    """
+    scores = [None] * len(titles)
+    for chunk in iter_scored_headlines(titles, api_key, max_concurrency, rate_limiter, batch_size, cache, router,
+                                       backend):
+        for position, score in chunk:
+            scores[position] = score
+    return scores
+
+class ScoringError(RuntimeError):
+    """
+    Raised after a query's last chunk when some of its headlines could not be scored.
+    """
+
+class AnalysisChunk(NamedTuple):
+    """
+    Scored articles for one query, produced as soon as a batch is scored.
+
+    ``articles`` is indexed by each article's position in the query's search
+    results, so chunks can be put back in search order. ``query_done`` is set
+    on the last chunk of a query, which has no articles; its ``error`` is set
+    if the query failed part-way or some of its headlines could not be scored.
+    """
+    query_index: int
+    query: str
+    articles: pd.DataFrame
+    query_done: bool
+    error: Optional[str] = None
+
+def _iter_query_chunks(query_index: int,
+                       query: str,
+                       api_key: Optional[str],
+                       cse_id: Optional[str],
+                       gemini_api_key: Optional[str],
+                       max_results: int,
+                       start_date: str,
+                       end_date: str,
+                       rate_limiter: TokenBucket,
+                       max_concurrency: int,
+                       batch_size: int,
+                       cache: Optional[SentimentCache],
+                       search_cache: Optional[SearchCache],
+                       search_max_age: float,
+                       incremental: bool,
+                       router: Optional[TieredRouter],
+                       clusterer: Optional[HeadlineClusterer],
+                       backend: Optional[SentimentBackend]) -> Iterator[AnalysisChunk]:
+    """
+    Search one query and yield its scored articles batch by batch.
+
+    With a ``clusterer``, only the first headline of each group of
+    near-duplicates is scored; the other copies get its score and the
+    representative's link in ``duplicate_of``. Raises ScoringError once
+    every scored article is yielded if any headline failed to score.
+    """
+    if api_key is None or cse_id is None:
+        return
+
+    with tracing.span("search", query=query):
+        news_articles = _search_news(
+            query, api_key, cse_id, max_results,
+            start_date=start_date,
+            end_date=end_date,
+            cache=search_cache,
+            max_age=search_max_age,
+            incremental=incremental
         )
-        
-        # Extract the sentiment score exactly as in the notebook
+
+    titles = [article.title for article in news_articles]
+    if clusterer is not None:
+        with tracing.span("dedup"):
+            representatives = clusterer.cluster(titles)
+    else:
+        representatives = list(range(len(titles)))
+    members = {}
+    for position, representative in enumerate(representatives):
+        members.setdefault(representative, []).append(position)
+    unique = list(members)
+    tracing.increment("dedup.duplicates", len(titles) - len(unique))
+
+    # Analyze sentiment
+    if backend is not None:
+        chunks = iter_scored_headlines(
+            [titles[position] for position in unique],
+            gemini_api_key,
+            max_concurrency=max_concurrency,
+            rate_limiter=rate_limiter,
+            batch_size=batch_size,
+            cache=cache,
+            router=router,
+            backend=backend
+        )
+    else:
+        chunks = [list(enumerate([0] * len(unique)))]
+
+    failed = 0
+    for chunk in chunks:
+        scores = {}
+        for i, sentiment_score in chunk:
+            if sentiment_score is SCORE_FAILED:
+                failed += len(members[unique[i]])
+                continue
+            if sentiment_score is None:  # Only add if sentiment is not neutral
+                continue
+            for position in members[unique[i]]:
+                scores[position] = sentiment_score
+        if not scores:
+            continue
+        positions = sorted(scores)
+        yield AnalysisChunk(query_index, query, article_frame(
+            query,
+            [news_articles[position] for position in positions],
+            [scores[position] for position in positions],
+            [
+                news_articles[representatives[position]].link if representatives[position] != position else None
+                for position in positions
+            ],
+            index=positions
+        ), False)
+
+    if failed:
+        raise ScoringError(f"{failed} of {len(titles)} headlines could not be scored")
+
+def iter_analyze_news(queries: List[str],
+                      max_results_per_query: int = 20,
+                      max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                      requests_per_second: Optional[float] = None,
+                      batch_size: int = DEFAULT_BATCH_SIZE,
+                      use_cache: bool = True,
+                      search_max_age: float = DEFAULT_SEARCH_MAX_AGE,
+                      incremental: bool = False,
+                      max_parallel_queries: int = DEFAULT_MAX_PARALLEL_QUERIES,
+                      start_date: Optional[datetime] = None,
+                      end_date: Optional[datetime] = None,
+                      router: Optional[TieredRouter] = None,
+                      rate_limiter: Optional[TokenBucket] = None,
+                      dedup: bool = True,
+                      backend: Optional[SentimentBackend] = None) -> Iterator[AnalysisChunk]:
+    """
+    Fetch and score news for several queries in parallel, streaming results.
+
+    Each query is searched and scored on its own worker thread; all workers
+    share one rate limiter and cache. Chunks are yielded on the calling
+    thread in completion order, so the caller can render partial results.
+    Nothing here depends on the Streamlit UI; errors are logged when no
+    session is running, so batch jobs can use it directly.
+
+    Args:
+        queries (List[str]): List of search queries
+        max_results_per_query (int): Maximum results per query
+        max_concurrency (int): Maximum number of Gemini requests in flight per query
+        requests_per_second (Optional[float]): Gemini request ceiling for this call
+            alone (default: share the process-wide Gemini limiter)
+        batch_size (int): Headlines scored per Gemini request
+        use_cache (bool): Whether to reuse cached search results and sentiment scores
+        search_max_age (float): Freshness window for cached search results in seconds
+        incremental (bool): Only fetch search results newer than the last cached run
+        max_parallel_queries (int): Maximum number of queries processed at once
+        start_date (Optional[datetime]): Start of the date window (defaults to 7 days before end_date)
+        end_date (Optional[datetime]): End of the date window (defaults to today)
+        router (Optional[TieredRouter]): Send only headlines VADER is unsure about to Gemini
+        rate_limiter (Optional[TokenBucket]): Limiter shared with other callers;
+            overrides ``requests_per_second``
+        dedup (bool): Score one headline per group of near-duplicates and
+            copy its score to the others
+        backend (Optional[SentimentBackend]): Model to score with (defaults to Gemini)
+
+    Yields:
+        AnalysisChunk: Scored articles as each batch completes, plus one
+        empty chunk with ``query_done`` set per query, carrying the error if
+        the query failed
+    """
+    if not queries:
+        return
+
+    api_key, cse_id, gemini_api_key, api_configured = setup_api_keys()
+    if not api_configured:
+        return
+
+    # Fixed 7-day date range
+    if end_date is None:
+        end_date = datetime.today()
+    if start_date is None:
+        start_date = end_date - pd.Timedelta(days=7)
+
+    if rate_limiter is None:
+        if requests_per_second is None:
+            rate_limiter = _gemini_limiter
+        else:
+            rate_limiter = AdaptiveRateLimiter(requests_per_second)
+    cache = get_default_cache() if use_cache else None
+    search_cache = get_default_search_cache() if use_cache else None
+    clusterer = _headline_clusterer if dedup else None
+    if backend is None and gemini_api_key is not None:
+        backend = GeminiBackend(gemini_api_key)
+
+    chunks = queue.Queue()
+
+    def run(query_index: int, query: str) -> None:
+        error = None
         try:
-            sentiment_score = float(response.text.strip())
-            
-            # Ensure the score is in the range [-10, 10]
-            sentiment_score = max(-10, min(10, sentiment_score))
-            
-            # Round the score to the nearest whole number
-            rounded_score = round(sentiment_score)
-            
-            # Remove neutral sentiment (score = 0)
-            if rounded_score == 0:
-                return None
-            
-            return rounded_score
-        
-        except ValueError:
-            st.warning(f"Could not convert sentiment response to number: {response.text}")
-            return None
-    except Exception as e:
-        st.error(f"Error with Gemini API: {str(e)}")
-        return None
+            with tracing.span("query", query=query):
+                for chunk in _iter_query_chunks(
+                    query_index, query, api_key, cse_id, gemini_api_key, max_results_per_query,
+                    start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"),
+                    rate_limiter, max_concurrency, batch_size, cache, search_cache,
+                    search_max_age, incremental, router, clusterer, backend
+                ):
+                    chunks.put(chunk)
+        except ScoringError as e:
+            # The failed requests were reported as they happened
+            error = str(e)
+        except Exception as e:
+            # One failing query doesn't stop the others
+            error = str(e)
+            report_error(f"Error searching news: {error}")
+        finally:
+            chunks.put(AnalysisChunk(query_index, query, pd.DataFrame(), True, error))
 
-def fetch_and_analyze_news(queries: List[str], 
+    workers = max(1, min(max_parallel_queries, len(queries)))
+    with ThreadPoolExecutor(max_workers=workers, initializer=script_context_initializer()) as executor:
+        for i, query in enumerate(queries):
+            executor.submit(run, i, query)
+        remaining = len(queries)
+        try:
+            while remaining:
+                chunk = chunks.get()
+                if chunk.query_done:
+                    remaining -= 1
+                yield chunk
+        except BaseException:
+            # The caller stopped early; don't start the queries still queued
+            executor.shutdown(cancel_futures=True)
+            raise
+
+def fetch_and_analyze_news(queries: List[str],
                           max_results_per_query: int = 20,
-                          with_progress: bool = True) -> pd.DataFrame:
+                          with_progress: bool = True,
+                          max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                          requests_per_second: Optional[float] = None,
+                          batch_size: int = DEFAULT_BATCH_SIZE,
+                          use_cache: bool = True,
+                          search_max_age: float = DEFAULT_SEARCH_MAX_AGE,
+                          incremental: bool = False,
+                          max_parallel_queries: int = DEFAULT_MAX_PARALLEL_QUERIES,
+                          on_partial: Optional[Callable[[pd.DataFrame, int], None]] = None,
+                          router: Optional[TieredRouter] = None,
+                          save_articles: bool = True,
+                          dedup: bool = True,
+                          backend: Optional[SentimentBackend] = None) -> pd.DataFrame:
     """
     Fetch news for multiple queries and analyze sentiment.
-    
+
+    Streamlit front end for iter_analyze_news: shows the date range and
+    progress in the current session. Rows are returned in query order and,
+    within a query, in search result order.
+
+    With ``use_cache``, finished results are shared between sessions through
+    the process-wide result cache: a session asking for a search another
+    session is already running waits for that run instead of starting its
+    own, and gets no partial results or progress while it waits. Results
+    with a failed query, or headlines that could not be scored, are not
+    kept for later sessions.
+
     Args:
         queries (List[str]): List of search queries
         max_results_per_query (int): Maximum results per query
         with_progress (bool): Whether to show a progress bar
-        
+        max_concurrency (int): Maximum number of Gemini requests in flight per query
+        requests_per_second (Optional[float]): Gemini request ceiling for this call
+            alone (default: share the process-wide Gemini limiter)
+        batch_size (int): Headlines scored per Gemini request
+        use_cache (bool): Whether to reuse cached results, search results and
+            sentiment scores
+        search_max_age (float): Freshness window for cached search results in seconds
+        incremental (bool): Only fetch search results newer than the last cached run
+        max_parallel_queries (int): Maximum number of queries processed at once
+        on_partial (Optional[Callable[[pd.DataFrame, int], None]]): Called with
+            the results so far and an update counter whenever new articles arrive
+        router (Optional[TieredRouter]): Send only headlines VADER is unsure about to Gemini
+        save_articles (bool): Whether to append the results to the local article store
+        dedup (bool): Score one headline per group of near-duplicates and
+            copy its score to the others
+        backend (Optional[SentimentBackend]): Model to score with (defaults to Gemini)
+
     Returns:
         pd.DataFrame: DataFrame with news and sentiment data
     """
+    import streamlit as st
+    
     # Setup API keys
     api_key, cse_id, gemini_api_key, api_configured = setup_api_keys()
-    
+
     if not api_configured:
         st.error("API keys not configured. Please set GOOGLE_API_KEY and GOOGLE_CSE_ID environment variables.")
-        return pd.DataFrame()
-    
+        return empty_articles()
+
     # Fixed 7-day date range
     end_date = datetime.today()
     start_date = end_date - pd.Timedelta(days=7)
-    
+
     # Show the date range as display
     st.write(f"Date Range: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
-    
+
     # Show progress if requested
     if with_progress:
         progress_bar = st.progress(0)
         progress_text = st.empty()
-    
-    all_news = []
-    total_articles_analyzed = 0
+
     progress_bar = None
     progress_text = None
-    
-    # Process each query
-    for i, query in enumerate(queries):
-        if with_progress and progress_text is not None:
-            progress_text.text(f"Searching for news related to: {query}")
-        
-        # Search for news
-        if api_key is not None and cse_id is not None:
-            news_articles = search_news(query, api_key, cse_id, max_results_per_query, start_date=start_date.strftime("%Y-%m-%d"), end_date=end_date.strftime("%Y-%m-%d"))
-            
-            # Process each article
-            for article in news_articles:
+
+    if with_progress and progress_text is not None:
+        progress_text.text(f"Searching for news related to: {', '.join(queries)}")
+
+    # Errors of this session's run; results with any are not kept for other sessions
+    errors = []
+
+    def compute() -> pd.DataFrame:
+        # Articles received so far, per query
+        results = [[] for _ in queries]
+        queries_done = 0
+        updates = 0
+
+        for chunk in iter_analyze_news(
+            queries,
+            max_results_per_query=max_results_per_query,
+            max_concurrency=max_concurrency,
+            requests_per_second=requests_per_second,
+            batch_size=batch_size,
+            use_cache=use_cache,
+            search_max_age=search_max_age,
+            incremental=incremental,
+            max_parallel_queries=max_parallel_queries,
+            start_date=start_date,
+            end_date=end_date,
+            router=router,
+            dedup=dedup,
+            backend=backend
+        ):
+            if chunk.error is not None:
+                errors.append(chunk.error)
+            if not chunk.articles.empty:
+                results[chunk.query_index].append(chunk.articles)
+                updates += 1
+                if on_partial is not None:
+                    on_partial(_combine_results(results), updates)
+
+            # Update progress
+            if chunk.query_done:
+                queries_done += 1
+                if with_progress and progress_bar is not None:
+                    progress_bar.progress(queries_done / len(queries))
                 if with_progress and progress_text is not None:
-                    progress_text.text(f"Analyzing sentiment for: {article['title']}")
-                
-                # Analyze sentiment
-                sentiment_score = 0
-                if gemini_api_key is not None:
-                    sentiment_score = gemini_analyze_sentiment(article['title'], gemini_api_key)
-                
-                # Add to results
-                if sentiment_score is not None:  # Only add if sentiment is not neutral
-                    all_news.append({
-                        'query': query,
-                        'title': article['title'],
-                        'link': article['link'],
-                        'snippet': article['snippet'],
-                        'source': article['source'],
-                        'date': article['date'],
-                        'sentiment_score': sentiment_score
-                    })
-                    
-                    # Count analyzed articles
-                    total_articles_analyzed += 1
-                
-                # Add a small delay to avoid hitting API rate limits
-                time.sleep(random.uniform(0.5, 1.5))
-        
-        # Update progress
-        if with_progress and progress_bar is not None and len(queries) > 0:
-            progress_bar.progress((i + 1) / len(queries))
-    
-    # Clear progress indicators
-    if with_progress:
-        if progress_bar is not None:
-            progress_bar.empty()
-        if progress_text is not None:
-            progress_text.empty()
-    
-    # Create DataFrame
-    if all_news:
-        df = pd.DataFrame(all_news)
-        # Store the total number of articles analyzed in the session state
-        st.session_state.total_articles_analyzed = total_articles_analyzed
+                    progress_text.text(f"Finished analyzing news related to: {chunk.query}")
+
+        # Clear progress indicators
+        if with_progress:
+            if progress_bar is not None:
+                progress_bar.empty()
+            if progress_text is not None:
+                progress_text.empty()
+
+        # Create DataFrame
+        df = _combine_results(results)
+
+        # Keep the results for later sessions and trends
+        if save_articles and not df.empty:
+            with tracing.span("store.add", articles=len(df)):
+                get_default_article_store().add(df)
         return df
+
+    if use_cache:
+        backend_key = (backend.model_name, backend.version) if backend is not None else (GEMINI_MODEL_NAME, PROMPT_VERSION)
+        key = (tuple(queries), max_results_per_query, start_date.date(), incremental,
+               type(router).__name__ if router is not None else None, dedup, backend_key)
+        df, _ = get_default_result_cache().get_or_compute(key, compute, max_age=search_max_age,
+                                                          copy=pd.DataFrame.copy,
+                                                          cacheable=lambda df: not errors)
     else:
-        st.session_state.total_articles_analyzed = 0
-        return pd.DataFrame()
+        df = compute()
+
+    # Store the total number of articles analyzed in the session state
+    st.session_state.total_articles_analyzed = len(df)
+    return df
+
+def _combine_results(results: List[List[pd.DataFrame]]) -> pd.DataFrame:
+    """
+    Put streamed chunks back in query order, then search result order.
+    """
+    frames = [pd.concat(chunks).sort_index() for chunks in results if chunks]
+    if not frames:
+        return empty_articles()
+    # Categories differ between chunks, so concat leaves plain columns
+    return typed_articles(pd.concat(frames, ignore_index=True))
 
 def categorize_sentiment(score: float) -> str:
     """
@@ -0,0 +1,73 @@
+"""
+Plan Custom Search queries for comma-separated keyword lists.
+
+Quoting the whole list as one phrase ("a AND b") asks for pages containing
+that literal phrase, which hardly any page does. The planner instead gives
+each keyword its own quoted sub-query, so the sub-queries can run
+concurrently and their results be merged. Long lists are grouped into at
+most MAX_SUB_QUERIES sub-queries of OR-ed phrases, keeping the number of
+searches, and so latency and quota, bounded whatever the list's length.
+"""
+from typing import List, NamedTuple, Sequence, Tuple
+
+# Sub-queries a single search is split into at most
+MAX_SUB_QUERIES = 4
+
+
+class SubQuery(NamedTuple):
+    """
+    One Custom Search query of a plan.
+    """
+    text: str  # Query sent to Custom Search, e.g. '"inflation"' or '"a" OR "b"'
+    keywords: Tuple[str, ...]  # Keywords it searches for
+
+
+def split_keywords(query: str) -> List[str]:
+    """
+    Keywords of a comma-separated query, without blanks or duplicates
+    (ignoring case), in their original order.
+    """
+    keywords = {}
+    for keyword in query.split(","):
+        keyword = keyword.strip()
+        if keyword:
+            keywords.setdefault(keyword.lower(), keyword)
+    return list(keywords.values())
+
+
+def plan_queries(query: str, max_sub_queries: int = MAX_SUB_QUERIES) -> List[SubQuery]:
+    """
+    Split a comma-separated query into sub-queries to run side by side.
+
+    A single keyword gives the same quoted query as before planning, so its
+    cached search pages and runs stay valid.
+
+    Args:
+        query (str): Comma-separated keywords
+        max_sub_queries (int): Most sub-queries to plan; keywords beyond it
+            are OR-ed into the others
+
+    Returns:
+        List[SubQuery]: Sub-queries, empty if the query has no keywords
+    """
+    keywords = split_keywords(query)
+    groups = [keywords[i::max_sub_queries] for i in range(min(len(keywords), max_sub_queries))]
+    return [
+        SubQuery(text=" OR ".join(f'"{keyword}"' for keyword in group), keywords=tuple(group))
+        for group in groups
+    ]
+
+
+def keyword_coverage(text: str, keywords: Sequence[str]) -> int:
+    """
+    Number of keywords found in a text, ignoring case.
+
+    Args:
+        text (str): E.g. a headline and its snippet
+        keywords (Sequence[str]): Lowercase keywords
+
+    Returns:
+        int: Keywords the text mentions
+    """
+    text = text.lower()
+    return sum(1 for keyword in keywords if keyword in text)
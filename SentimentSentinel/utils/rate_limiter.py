@@ -0,0 +1,395 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+
+from utils import tracing
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying: quota exhaustion and transient server errors
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Statuses that mean the quota ceiling was hit, so the rate should drop
+THROTTLE_STATUSES = {429, 503}
+
+
+class SharedBudget:
+    """
+    Token bucket state kept in a SQLite table, shared by every process using the file.
+
+    Each process paces its own threads with a TokenBucket; a bucket given a
+    SharedBudget takes its tokens from the table instead, so the app and its
+    job workers together stay under one quota rather than each getting the
+    whole of it. Each take is one short write transaction. The refill rate
+    is passed in by the taker, so an AdaptiveRateLimiter's throttling
+    applies to the shared budget as soon as it takes its next token.
+    """
+
+    def __init__(self, path: str, name: str):
+        """
+        Args:
+            path (str): SQLite database file
+            name (str): Budget to draw on, e.g. the API's name
+        """
+        self.path = path
+        self.name = name
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Opened on first use, so importing a module with a shared limiter touches no files
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_budgets ("
+                " name TEXT PRIMARY KEY,"
+                " tokens REAL NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+        return self._conn
+
+    def take(self, tokens: float, rate: float, capacity: float) -> float:
+        """
+        Take tokens if the budget has them.
+
+        Returns:
+            float: 0 if the tokens were taken, else seconds until enough
+            will have accumulated
+        """
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT tokens, updated_at FROM rate_budgets WHERE name = ?",
+                                   (self.name,)).fetchone()
+                now = time.time()
+                available = capacity if row is None else min(capacity, row[0] + max(0.0, now - row[1]) * rate)
+                delay = 0.0
+                if available >= tokens:
+                    available -= tokens
+                else:
+                    delay = (tokens - available) / rate
+                conn.execute("INSERT OR REPLACE INTO rate_budgets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                             (self.name, available, now))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return delay
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket used to pace calls to the Google APIs.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``.
+    Each call to ``acquire`` takes one token, blocking until one is available,
+    so a burst of up to ``capacity`` requests goes out immediately and the
+    sustained request rate never exceeds ``rate``. With a ``budget``, the
+    tokens come from a SharedBudget, so the rate holds across processes.
+    """
+
+    def __init__(self,
+                 rate: float,
+                 capacity: Optional[float] = None,
+                 budget: Optional[SharedBudget] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Args:
+            rate (float): Tokens added per second
+            capacity (Optional[float]): Maximum number of stored tokens (defaults to ``rate``)
+            budget (Optional[SharedBudget]): Cross-process budget to take tokens from
+            clock (Callable[[], float]): Monotonic clock in seconds
+            sleep (Callable[[float], None]): Waits the given seconds; tests
+                pass one that advances their ``clock``
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity is not None else max(1.0, self.rate)
+        self.budget = budget
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._last_refill = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """
+        Take tokens without blocking.
+
+        Returns:
+            bool: True if the tokens were taken, False if the bucket is short
+        """
+        if self.budget is not None:
+            return self.budget.take(tokens, self.rate, self.capacity) == 0
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def set_rate(self, rate: float) -> None:
+        """
+        Change the refill rate, keeping the tokens already accumulated.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        with self._lock:
+            self._refill()
+            self.rate = float(rate)
+
+    def call(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Take a token, then call ``fn``.
+        """
+        waited = self.acquire()
+        if waited:
+            tracing.record("ratelimit.wait", waited)
+        return fn(*args, **kwargs)
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens, sleeping until enough have accumulated.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            if self.budget is not None:
+                delay = self.budget.take(tokens, self.rate, self.capacity)
+                if delay == 0:
+                    return waited
+            else:
+                with self._lock:
+                    self._refill()
+                    if self._tokens >= tokens:
+                        self._tokens -= tokens
+                        return waited
+                    delay = (tokens - self._tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised instead of calling an API whose circuit breaker is open.
+    """
+
+
+def _parse_retry_after(value) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header (delta-seconds or HTTP date).
+    """
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_error(error: Exception) -> Tuple[bool, bool, Optional[float]]:
+    """
+    Work out whether a failed Google API call is worth retrying.
+
+    Understands googleapiclient's HttpError (Custom Search) and
+    google.api_core's GoogleAPICallError (Gemini); connection errors and
+    timeouts are treated as transient.
+
+    Returns:
+        Tuple[bool, bool, Optional[float]]: (retryable, throttled, seconds
+        requested by a Retry-After header)
+    """
+    status = None
+    headers = {}
+    resp = getattr(error, "resp", None)
+    if resp is not None and hasattr(resp, "status"):
+        # googleapiclient.errors.HttpError wraps an httplib2.Response
+        status = int(resp.status)
+        headers = resp
+    elif isinstance(getattr(error, "code", None), int):
+        # google.api_core.exceptions.GoogleAPICallError
+        status = error.code
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    elif isinstance(error, (ConnectionError, TimeoutError)):
+        return True, False, None
+
+    if status not in RETRYABLE_STATUSES:
+        return False, False, None
+    retry_after = _parse_retry_after(headers.get("retry-after") or headers.get("Retry-After"))
+    return True, status in THROTTLE_STATUSES, retry_after
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    """
+    Token bucket that adapts to the quota it observes.
+
+    ``call`` retries throttled (429/503) and transient failures with
+    exponential backoff and full jitter, honouring Retry-After. The rate
+    follows AIMD: every throttle halves it (down to ``min_rate``) and every
+    success adds back a twentieth of ``ceiling``, so throughput climbs back
+    to the quota ceiling once the API stops pushing back. After
+    ``failure_threshold`` consecutive retryable failures the circuit opens
+    and calls fail fast with CircuitOpenError for ``reset_timeout`` seconds;
+    the first call after that is a trial that closes or reopens it.
+
+    One limiter is meant to be shared by every caller of the same API, and
+    its ``budget`` by every process calling it.
+    """
+
+    def __init__(self,
+                 ceiling: float,
+                 min_rate: Optional[float] = None,
+                 max_retries: int = 4,
+                 base_delay: float = 0.5,
+                 max_delay: float = 30.0,
+                 failure_threshold: int = 5,
+                 reset_timeout: float = 30.0,
+                 classify: Callable[[Exception], Tuple[bool, bool, Optional[float]]] = classify_error,
+                 budget: Optional[SharedBudget] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Args:
+            ceiling (float): Highest request rate per second (the quota)
+            min_rate (Optional[float]): Lowest rate throttling can push it to
+                (defaults to a twentieth of ``ceiling``)
+            max_retries (int): Retries per call after the first attempt
+            base_delay (float): Backoff before the first retry in seconds
+            max_delay (float): Cap on a single backoff in seconds
+            failure_threshold (int): Consecutive failures that open the circuit
+            reset_timeout (float): Seconds the circuit stays open
+            classify (Callable[[Exception], Tuple[bool, bool, Optional[float]]]): Maps an error to
+                (retryable, throttled, retry_after) like classify_error
+            budget (Optional[SharedBudget]): Cross-process budget to take tokens from
+            clock (Callable[[], float]): Monotonic clock in seconds
+            sleep (Callable[[float], None]): Waits the given seconds
+        """
+        super().__init__(ceiling, budget=budget, clock=clock, sleep=sleep)
+        self.ceiling = float(ceiling)
+        self.min_rate = float(min_rate) if min_rate is not None else self.ceiling / 20
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.classify = classify
+
+        self._state_lock = threading.Lock()
+        self._blocked_until = 0.0
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._stats = {'calls': 0, 'retries': 0, 'throttled': 0, 'failures': 0, 'circuit_opens': 0, 'rejected': 0}
+
+    def _check_circuit(self) -> None:
+        with self._state_lock:
+            if self._opened_at is None:
+                return
+            remaining = self.reset_timeout - (self._clock() - self._opened_at)
+            if remaining > 0:
+                self._stats['rejected'] += 1
+                raise CircuitOpenError(f"Too many failed requests; retrying in {remaining:.1f}s")
+            # Half-open: let this call through as a trial
+            self._opened_at = None
+            self._consecutive_failures = self.failure_threshold - 1
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens, also waiting out any Retry-After period in force.
+        """
+        waited = 0.0
+        while True:
+            with self._state_lock:
+                delay = self._blocked_until - self._clock()
+            if delay <= 0:
+                break
+            self._sleep(delay)
+            waited += delay
+        return waited + super().acquire(tokens)
+
+    def on_success(self) -> None:
+        with self._state_lock:
+            self._consecutive_failures = 0
+        if self.rate < self.ceiling:
+            self.set_rate(min(self.ceiling, self.rate + self.ceiling / 20))
+
+    def on_failure(self, throttled: bool, retry_after: Optional[float]) -> None:
+        with self._state_lock:
+            self._stats['failures'] += 1
+            self._consecutive_failures += 1
+            if throttled:
+                self._stats['throttled'] += 1
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, self._clock() + retry_after)
+            if self._consecutive_failures >= self.failure_threshold and self._opened_at is None:
+                self._opened_at = self._clock()
+                self._stats['circuit_opens'] += 1
+        if throttled:
+            self.set_rate(max(self.min_rate, self.rate / 2))
+
+    def call(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Call ``fn`` under the rate limit, retrying transient failures.
+
+        Errors that are not retryable, and the last error once retries run
+        out, are raised to the caller.
+        """
+        attempt = 0
+        while True:
+            self._check_circuit()
+            waited = self.acquire()
+            if waited:
+                tracing.record("ratelimit.wait", waited)
+            with self._state_lock:
+                self._stats['calls'] += 1
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                retryable, throttled, retry_after = self.classify(e)
+                if not retryable:
+                    raise
+                self.on_failure(throttled, retry_after)
+                if throttled:
+                    tracing.increment("ratelimit.throttled")
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                with self._state_lock:
+                    self._stats['retries'] += 1
+                tracing.increment("ratelimit.retries")
+                backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+                with tracing.span("ratelimit.backoff"):
+                    self._sleep(max(backoff, retry_after or 0.0))
+                continue
+            self.on_success()
+            return result
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Call, retry and throttle counters, the current rate and circuit state.
+        """
+        with self._state_lock:
+            stats = dict(self._stats)
+            stats['circuit_open'] = self._opened_at is not None
+        stats['rate'] = round(self.rate, 3)
+        return stats
@@ -0,0 +1,316 @@
+import logging
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from utils import tracing
+from utils.article_store import ArticleStore, get_default_article_store
+from utils.rate_limiter import TokenBucket
+
+logger = logging.getLogger("sentigrade.refresh")
+
+# Watchlist of queries refreshed for as long as the app runs, one per line,
+# optionally followed by "| <minutes>" to override the refresh interval
+DEFAULT_WATCHLIST_PATH = os.environ.get(
+    "SENTIGRADE_WATCHLIST",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "watchlist.txt")
+)
+
+DEFAULT_REFRESH_INTERVAL = 30 * 60
+
+# Set SENTIGRADE_BACKGROUND_REFRESH=0 to track queries without refreshing them
+REFRESH_ENABLED = os.environ.get("SENTIGRADE_BACKGROUND_REFRESH", "1") != "0"
+
+# Each run is moved by up to this fraction of its interval so queries
+# tracked together don't refresh in lockstep
+DEFAULT_JITTER = 0.1
+
+# Gemini requests a refresh keeps in flight; refreshes share the app's Gemini
+# limiter, and one request at a time keeps them from crowding out user searches
+DEFAULT_REFRESH_CONCURRENCY = 1
+
+# Searches from the app stay tracked this long after they were last run
+DEFAULT_HISTORY_TTL = 24 * 60 * 60
+
+# Upper bound on tracked queries, watchlist included
+MAX_TRACKED_QUERIES = 50
+
+# Matches the app, so refreshed results line up with its cached searches
+DEFAULT_REFRESH_MAX_RESULTS = 7
+
+
+class TrackedQuery:
+    """
+    Refresh schedule and last outcome of one query.
+    """
+
+    def __init__(self, query: str, interval: float, next_run: float, pinned: bool):
+        self.query = query
+        self.interval = interval
+        self.next_run = next_run
+        self.pinned = pinned
+        self.last_requested = time.time()
+        self.last_run = None
+        self.last_articles = 0
+        self.last_error = None
+
+
+def load_watchlist(path: str = DEFAULT_WATCHLIST_PATH) -> Dict[str, Optional[float]]:
+    """
+    Read a watchlist file.
+
+    Returns:
+        Dict[str, Optional[float]]: Query to refresh interval in seconds
+        (None for the default); empty if the file doesn't exist
+    """
+    watchlist = {}
+    if not os.path.exists(path):
+        return watchlist
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            query, _, minutes = line.partition("|")
+            try:
+                interval = float(minutes) * 60 if minutes.strip() else None
+            except ValueError:
+                logger.warning("Ignoring bad refresh interval in watchlist line: %s", line)
+                interval = None
+            watchlist[query.strip()] = interval
+    return watchlist
+
+
+class RefreshScheduler:
+    """
+    Background worker that keeps tracked queries fresh in the article store.
+
+    Queries come from the watchlist (refreshed for as long as the scheduler
+    runs) and from searches made in the app (dropped ``history_ttl`` seconds
+    after they were last searched). One daemon thread runs whichever query
+    is due next through iter_analyze_news and appends the results to the
+    article store, so the dashboard and its trends read precomputed data.
+
+    Refreshes draw on the process-wide Gemini limiter, and so on the same
+    quota as user searches, one request at a time; each query has its own
+    interval with random jitter. A failed refresh is retried
+    after a quarter of the query's interval.
+    """
+
+    def __init__(self,
+                 interval: float = DEFAULT_REFRESH_INTERVAL,
+                 jitter: float = DEFAULT_JITTER,
+                 rate_limiter: Optional[TokenBucket] = None,
+                 max_concurrency: int = DEFAULT_REFRESH_CONCURRENCY,
+                 history_ttl: float = DEFAULT_HISTORY_TTL,
+                 max_results: int = DEFAULT_REFRESH_MAX_RESULTS,
+                 store: Optional[ArticleStore] = None):
+        """
+        Args:
+            interval (float): Default seconds between refreshes of a query
+            jitter (float): Fraction of the interval each run is moved by at random
+            rate_limiter (Optional[TokenBucket]): Limiter to pace Gemini requests
+                with (defaults to the process-wide Gemini limiter)
+            max_concurrency (int): Gemini requests in flight per refresh
+            history_ttl (float): Seconds an app search stays tracked after it was last run
+            max_results (int): Articles fetched per refresh
+            store (Optional[ArticleStore]): Where results go (defaults to the shared store)
+        """
+        self.interval = interval
+        self.jitter = jitter
+        self.history_ttl = history_ttl
+        self.max_results = max_results
+        self.rate_limiter = rate_limiter
+        self.max_concurrency = max_concurrency
+        self.store = store
+        self.refreshes = 0
+        self.failures = 0
+        self._tracked = {}
+        self._wakeup = threading.Condition()
+        self._stopping = False
+        self._thread = None
+
+    def _jittered(self, seconds: float) -> float:
+        return seconds * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def track(self, query: str, interval: Optional[float] = None, pinned: bool = False) -> None:
+        """
+        Start refreshing a query, or mark it as searched again.
+
+        Args:
+            query (str): Query as passed to the pipeline
+            interval (Optional[float]): Seconds between refreshes (defaults to the scheduler's)
+            pinned (bool): Keep it tracked regardless of ``history_ttl`` (watchlist entries)
+        """
+        query = query.strip()
+        if not query:
+            return
+        with self._wakeup:
+            entry = self._tracked.get(query)
+            if entry is not None:
+                entry.last_requested = time.time()
+                entry.pinned = entry.pinned or pinned
+                if interval is not None:
+                    entry.interval = interval
+                return
+
+            if len(self._tracked) >= MAX_TRACKED_QUERIES:
+                self._expire(force=True)
+                if len(self._tracked) >= MAX_TRACKED_QUERIES:
+                    logger.warning("Not tracking %r: %d queries already tracked", query, MAX_TRACKED_QUERIES)
+                    return
+
+            interval = interval or self.interval
+            if pinned:
+                # Watchlist entries start soon, spread over the jitter window
+                first_run = time.time() + random.uniform(0, self.jitter * interval)
+            else:
+                # The app has just searched this query, so its first refresh
+                # is a full interval away
+                first_run = time.time() + self._jittered(interval)
+            self._tracked[query] = TrackedQuery(query, interval, first_run, pinned)
+            self._wakeup.notify()
+
+    def untrack(self, query: str) -> None:
+        with self._wakeup:
+            self._tracked.pop(query.strip(), None)
+
+    def _expire(self, force: bool = False) -> None:
+        """
+        Drop app searches past their TTL; with ``force``, also drop the
+        least recently searched one to make room. Caller holds the lock.
+        """
+        now = time.time()
+        for query, entry in list(self._tracked.items()):
+            if not entry.pinned and now - entry.last_requested > self.history_ttl:
+                del self._tracked[query]
+        if force:
+            unpinned = [entry for entry in self._tracked.values() if not entry.pinned]
+            if unpinned and len(self._tracked) >= MAX_TRACKED_QUERIES:
+                del self._tracked[min(unpinned, key=lambda entry: entry.last_requested).query]
+
+    def refresh(self, query: str) -> int:
+        """
+        Fetch, score and store one query now.
+
+        Returns:
+            int: Number of new articles stored
+        """
+        from utils.news_api import iter_analyze_news
+
+        with tracing.trace("refresh"):
+            frames = []
+            for chunk in iter_analyze_news(
+                [query],
+                max_results_per_query=self.max_results,
+                search_max_age=0,
+                max_concurrency=self.max_concurrency,
+                rate_limiter=self.rate_limiter
+            ):
+                if chunk.error is not None:
+                    raise RuntimeError(chunk.error)
+                if not chunk.articles.empty:
+                    frames.append(chunk.articles)
+
+            if not frames:
+                return 0
+            store = self.store or get_default_article_store()
+            with tracing.span("store.add"):
+                return store.add(pd.concat(frames).sort_index())
+
+    def _next_due(self) -> Optional[TrackedQuery]:
+        self._expire()
+        if not self._tracked:
+            return None
+        return min(self._tracked.values(), key=lambda entry: entry.next_run)
+
+    def _run(self) -> None:
+        while True:
+            with self._wakeup:
+                while not self._stopping:
+                    entry = self._next_due()
+                    delay = entry.next_run - time.time() if entry is not None else None
+                    if delay is not None and delay <= 0:
+                        break
+                    self._wakeup.wait(delay)
+                if self._stopping:
+                    return
+
+            try:
+                entry.last_articles = self.refresh(entry.query)
+                entry.last_error = None
+                next_delay = entry.interval
+                self.refreshes += 1
+            except Exception as e:
+                logger.warning("Refreshing %r failed: %s", entry.query, e)
+                entry.last_error = str(e)
+                next_delay = entry.interval / 4
+                self.failures += 1
+
+            with self._wakeup:
+                entry.last_run = time.time()
+                entry.next_run = entry.last_run + self._jittered(next_delay)
+
+    def start(self) -> None:
+        """
+        Start the background thread if it isn't running.
+        """
+        with self._wakeup:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="sentigrade-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop after the refresh in progress, if any, finishes.
+        """
+        with self._wakeup:
+            self._stopping = True
+            self._wakeup.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def status(self) -> List[Dict]:
+        """
+        Tracked queries, next due first.
+        """
+        with self._wakeup:
+            entries = sorted(self._tracked.values(), key=lambda entry: entry.next_run)
+            return [
+                {
+                    'query': entry.query,
+                    'watchlist': entry.pinned,
+                    'interval_minutes': round(entry.interval / 60, 1),
+                    'last_run': entry.last_run,
+                    'next_run': entry.next_run,
+                    'new_articles': entry.last_articles,
+                    'error': entry.last_error,
+                }
+                for entry in entries
+            ]
+
+
+_default_scheduler = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_default_scheduler() -> RefreshScheduler:
+    """
+    Process-wide scheduler with the watchlist already tracked, started
+    unless background refresh is disabled.
+    """
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RefreshScheduler()
+            for query, interval in load_watchlist().items():
+                _default_scheduler.track(query, interval, pinned=True)
+            if REFRESH_ENABLED:
+                _default_scheduler.start()
+        return _default_scheduler
@@ -0,0 +1,60 @@
+import logging
+import sys
+from typing import Callable
+
+from utils import tracing
+
+logger = logging.getLogger("sentigrade")
+
+
+def _script_run_ctx():
+    """
+    The current Streamlit script run context, or None outside the app.
+
+    Streamlit is only consulted if something already imported it, so
+    headless callers never load the UI framework.
+    """
+    if "streamlit" not in sys.modules:
+        return None
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    return get_script_run_ctx(suppress_warning=True)
+
+
+def report_error(message: str) -> None:
+    """
+    Show an error in the running Streamlit session, or log it when headless.
+    """
+    if _script_run_ctx() is not None:
+        import streamlit as st
+        st.error(message)
+    else:
+        logger.error(message)
+
+
+def report_warning(message: str) -> None:
+    """
+    Show a warning in the running Streamlit session, or log it when headless.
+    """
+    if _script_run_ctx() is not None:
+        import streamlit as st
+        st.warning(message)
+    else:
+        logger.warning(message)
+
+
+def script_context_initializer() -> Callable[[], None]:
+    """
+    Thread pool initializer that attaches the caller's Streamlit script run
+    context, so errors reported on worker threads still reach the current
+    session, and the caller's trace, so their stages are timed in it.
+    """
+    ctx = _script_run_ctx()
+    trace = tracing.current_trace()
+
+    def attach_context():
+        tracing.attach(trace)
+        if ctx is not None:
+            from streamlit.runtime.scriptrunner import add_script_run_ctx
+            add_script_run_ctx(ctx=ctx)
+
+    return attach_context
@@ -0,0 +1,210 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, NamedTuple, Optional, Tuple, TypeVar
+
+from utils import tracing
+
+T = TypeVar("T")
+
+# Memory budget for finished results shared between sessions
+DEFAULT_MAX_BYTES = int(float(os.environ.get("SENTIGRADE_RESULT_CACHE_MB", "64")) * 1024 * 1024)
+
+
+class _Entry(NamedTuple):
+    value: object
+    size: int
+    created: float
+
+
+class _Flight:
+    """
+    One computation in progress, waited on by every caller asking for the same key.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.finished = False
+        self.waiters = 0
+
+
+def estimate_size(value: object) -> int:
+    """
+    Approximate memory held by a cached value, in bytes.
+    """
+    if hasattr(value, "memory_usage"):
+        return int(value.memory_usage(deep=True).sum())
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """
+    Process-wide cache of finished pipeline results, shared by every session.
+
+    Lookups are single-flight: while one caller computes a key, other callers
+    asking for the same key wait for that computation and share its result
+    (or its exception) instead of starting their own. Finished results are
+    kept in an LRU bounded by ``max_bytes`` and served while younger than
+    the caller's ``max_age``. Failures are never cached, nor are results the
+    caller marks as incomplete; if the computing caller is interrupted
+    (e.g. a Streamlit rerun), one of the waiting callers takes over.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            max_bytes (int): Memory budget for cached results; results larger
+                than this are returned but not kept
+        """
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expired = 0
+        self._entries = OrderedDict()
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self,
+                       key: Hashable,
+                       compute: Callable[[], T],
+                       max_age: Optional[float] = None,
+                       copy: Callable[[T], T] = lambda value: value,
+                       cacheable: Callable[[T], bool] = lambda value: True) -> Tuple[T, str]:
+        """
+        Cached value for ``key``, computing it at most once across threads.
+
+        Args:
+            key (Hashable): What identifies the result
+            compute (Callable[[], T]): Builds the result on a miss
+            max_age (Optional[float]): Serve cached results only if younger
+                than this many seconds (default: any age)
+            copy (Callable[[T], T]): Applied to results handed to callers
+                other than the one that computed them, so sessions can't
+                change each other's data
+            cacheable (Callable[[T], bool]): Whether a computed result may be
+                kept, e.g. False if part of it failed; callers already waiting
+                still share a result it rejects
+
+        Returns:
+            Tuple[T, str]: The result and how it was obtained: 'hit',
+            'coalesced' (waited on another caller's computation) or 'computed'
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and max_age is not None and time.time() - entry.created > max_age:
+                    self._drop(key)
+                    self.expired += 1
+                    entry = None
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    tracing.increment("results.hits")
+                    return copy(entry.value), 'hit'
+
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+                    self.misses += 1
+                else:
+                    flight.waiters += 1
+
+            if leader:
+                return self._compute(key, flight, compute, cacheable), 'computed'
+
+            with tracing.span("results.wait"):
+                flight.done.wait()
+            if not flight.finished:
+                # The computing caller was interrupted; try again
+                continue
+            with self._lock:
+                self.coalesced += 1
+            tracing.increment("results.coalesced")
+            if flight.error is not None:
+                raise flight.error
+            return copy(flight.value), 'coalesced'
+
+    def _compute(self,
+                 key: Hashable,
+                 flight: _Flight,
+                 compute: Callable[[], T],
+                 cacheable: Callable[[T], bool]) -> T:
+        keep = False
+        try:
+            flight.value = compute()
+            flight.finished = True
+            keep = cacheable(flight.value)
+        except Exception as e:
+            flight.error = e
+            flight.finished = True
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+                if keep:
+                    self._put(key, flight.value)
+            flight.done.set()
+        return flight.value
+
+    def _put(self, key: Hashable, value: object) -> None:
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        self._drop(key)
+        self._entries[key] = _Entry(value, size, time.time())
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry.size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Lookup counters since the cache was created, and current usage.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'expired': self.expired,
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'in_flight': len(self._flights),
+                'waiting': sum(flight.waiters for flight in self._flights.values()),
+            }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_result_cache() -> ResultCache:
+    """
+    Process-wide result cache shared by every session.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResultCache()
+        return _default_cache
@@ -0,0 +1,149 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from utils.sentiment_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_SEARCH_CACHE_PATH = os.environ.get(
+    "SENTIGRADE_SEARCH_CACHE",
+    os.path.join(DEFAULT_CACHE_DIR, "search_cache.sqlite3")
+)
+
+# How long a fetched Custom Search page is served without refetching
+DEFAULT_SEARCH_MAX_AGE = 15 * 60
+
+# Raw items kept per query for incremental refreshes
+MAX_RUN_ITEMS = 100
+
+
+class SearchCache:
+    """
+    SQLite-backed cache of raw Custom Search results.
+
+    Pages are keyed on (refined query, date window, page start, page size)
+    and served while younger than the caller's freshness window. For
+    incremental refreshes the merged items of the last run of each query are
+    kept together with the end of the date window they cover.
+    """
+
+    def __init__(self, path: str = DEFAULT_SEARCH_CACHE_PATH):
+        """
+        Args:
+            path (str): SQLite database file (":memory:" for a throwaway cache)
+        """
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_pages ("
+            " query TEXT NOT NULL,"
+            " start_date TEXT NOT NULL,"
+            " end_date TEXT NOT NULL,"
+            " start_index INTEGER NOT NULL,"
+            " num INTEGER NOT NULL,"
+            " items TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " PRIMARY KEY (query, start_date, end_date, start_index, num))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_runs ("
+            " query TEXT PRIMARY KEY,"
+            " end_date TEXT NOT NULL,"
+            " items TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get_page(self, query: str, start_date: str, end_date: str,
+                 start_index: int, num: int, max_age: float) -> Optional[List[Dict]]:
+        """
+        Cached items of one result page, or None if absent or stale.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT items FROM search_pages WHERE query = ? AND start_date = ? AND end_date = ?"
+                " AND start_index = ? AND num = ? AND fetched_at >= ?",
+                (query, start_date, end_date, start_index, num, time.time() - max_age)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put_page(self, query: str, start_date: str, end_date: str,
+                 start_index: int, num: int, items: List[Dict]) -> None:
+        """
+        Store the items of one result page.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_pages VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (query, start_date, end_date, start_index, num, json.dumps(items), time.time())
+            )
+            self._conn.commit()
+
+    def get_run(self, query: str) -> Optional[Tuple[str, float, List[Dict]]]:
+        """
+        Last run of a query.
+
+        Returns:
+            Optional[Tuple[str, float, List[Dict]]]: (window end date, fetch
+            timestamp, raw items), or None if the query was never run
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT end_date, fetched_at, items FROM search_runs WHERE query = ?", (query,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], json.loads(row[2])
+
+    def put_run(self, query: str, end_date: str, items: List[Dict]) -> None:
+        """
+        Record the merged items of a run, newest first.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_runs VALUES (?, ?, ?, ?)",
+                (query, end_date, json.dumps(items[:MAX_RUN_ITEMS]), time.time())
+            )
+            self._conn.commit()
+
+    def prune(self, max_age: float) -> None:
+        """
+        Delete pages older than ``max_age`` seconds.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM search_pages WHERE fetched_at < ?", (time.time() - max_age,))
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Page hit/miss counters since the cache was opened.
+        """
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_search_cache() -> SearchCache:
+    """
+    Process-wide search cache shared by every session.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = SearchCache()
+        return _default_cache
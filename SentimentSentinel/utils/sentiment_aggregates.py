@@ -0,0 +1,171 @@
+import json
+import sqlite3
+import threading
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import pandas as pd
+
+# Scores run from -10 to 10, one histogram bin per score
+MIN_SCORE = -10
+HISTOGRAM_BINS = 21
+
+# Rolling windows served to the dashboard, in days
+DEFAULT_WINDOWS = (1, 7, 30)
+
+
+def day_of(timestamp: float) -> str:
+    """
+    Local calendar day (YYYY-MM-DD) of a Unix timestamp.
+    """
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d")
+
+
+class SentimentAggregates:
+    """
+    Running sentiment totals per (query, source, day).
+
+    Each bucket keeps the article count, the score sum, positive and
+    negative counts and a histogram of scores. New articles are folded in
+    with ``apply`` in O(new rows), so rolling windows and trend series are
+    answered from at most one row per source and day instead of rescanning
+    stored articles.
+
+    The table lives in the article store's database and shares its
+    connection and lock; ArticleStore calls ``apply`` for every article it
+    actually inserts, so duplicates are never counted twice.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, lock: threading.Lock):
+        self._conn = conn
+        self._lock = lock
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS daily_sentiment ("
+            " query TEXT NOT NULL,"
+            " source TEXT NOT NULL,"
+            " day TEXT NOT NULL,"
+            " count INTEGER NOT NULL,"
+            " score_sum INTEGER NOT NULL,"
+            " positive INTEGER NOT NULL,"
+            " negative INTEGER NOT NULL,"
+            " histogram TEXT NOT NULL,"
+            " PRIMARY KEY (query, day, source))"
+        )
+
+    def apply(self, rows: Iterable[Tuple[str, str, str, int]]) -> None:
+        """
+        Fold new articles into their buckets.
+
+        The caller must hold the shared lock and commit afterwards.
+
+        Args:
+            rows (Iterable[Tuple[str, str, str, int]]): (query, source, day, score)
+                for each newly stored article
+        """
+        buckets = defaultdict(lambda: [0, 0, 0, 0, [0] * HISTOGRAM_BINS])
+        for query, source, day, score in rows:
+            bucket = buckets[(query, source, day)]
+            bucket[0] += 1
+            bucket[1] += score
+            bucket[2] += score > 0
+            bucket[3] += score < 0
+            bucket[4][min(max(score - MIN_SCORE, 0), HISTOGRAM_BINS - 1)] += 1
+
+        for (query, source, day), (count, score_sum, positive, negative, histogram) in buckets.items():
+            row = self._conn.execute(
+                "SELECT count, score_sum, positive, negative, histogram FROM daily_sentiment"
+                " WHERE query = ? AND day = ? AND source = ?",
+                (query, day, source)
+            ).fetchone()
+            if row is not None:
+                count += row[0]
+                score_sum += row[1]
+                positive += row[2]
+                negative += row[3]
+                histogram = [a + b for a, b in zip(histogram, json.loads(row[4]))]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO daily_sentiment VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (query, source, day, count, score_sum, positive, negative, json.dumps(histogram))
+            )
+
+    def is_empty(self) -> bool:
+        """
+        Whether no article has been aggregated yet. Caller holds the lock.
+        """
+        return self._conn.execute("SELECT 1 FROM daily_sentiment LIMIT 1").fetchone() is None
+
+    def rolling(self,
+                query: str,
+                windows: Sequence[int] = DEFAULT_WINDOWS,
+                today: Optional[date] = None) -> Dict[int, Dict[str, Optional[float]]]:
+        """
+        Sentiment over the last N days for each window, today included.
+
+        Args:
+            query (str): Stored query
+            windows (Sequence[int]): Window lengths in days
+            today (Optional[date]): Last day of every window (defaults to today)
+
+        Returns:
+            Dict[int, Dict[str, Optional[float]]]: Per window, the article
+            count, mean score (None without articles) and positive/negative counts
+        """
+        today = today or date.today()
+        daily = self._daily_totals(query, today - timedelta(days=max(windows) - 1), today)
+
+        result = {}
+        for window in windows:
+            first_day = (today - timedelta(days=window - 1)).isoformat()
+            totals = [row for day, row in daily.items() if day >= first_day]
+            count = sum(row[0] for row in totals)
+            result[window] = {
+                'count': count,
+                'mean': sum(row[1] for row in totals) / count if count else None,
+                'positive': sum(row[2] for row in totals),
+                'negative': sum(row[3] for row in totals),
+            }
+        return result
+
+    def daily(self, query: str, days: int = 30, today: Optional[date] = None) -> pd.DataFrame:
+        """
+        Daily sentiment series for a trend chart.
+
+        Returns:
+            pd.DataFrame: One row per day with articles, oldest first, with
+            columns day, count, mean, positive and negative
+        """
+        today = today or date.today()
+        daily = self._daily_totals(query, today - timedelta(days=days - 1), today)
+        return pd.DataFrame(
+            [
+                (pd.Timestamp(day), count, score_sum / count, positive, negative)
+                for day, (count, score_sum, positive, negative) in sorted(daily.items())
+            ],
+            columns=['day', 'count', 'mean', 'positive', 'negative']
+        )
+
+    def histogram(self, query: str, days: int = 30, today: Optional[date] = None) -> Dict[int, int]:
+        """
+        Article count per score over the last ``days`` days.
+        """
+        today = today or date.today()
+        first_day = (today - timedelta(days=days - 1)).isoformat()
+        totals = [0] * HISTOGRAM_BINS
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT histogram FROM daily_sentiment WHERE query = ? AND day BETWEEN ? AND ?",
+                (query, first_day, today.isoformat())
+            ).fetchall()
+        for (histogram,) in rows:
+            totals = [a + b for a, b in zip(totals, json.loads(histogram))]
+        return {MIN_SCORE + i: count for i, count in enumerate(totals)}
+
+    def _daily_totals(self, query: str, first_day: date, last_day: date) -> Dict[str, Tuple[int, int, int, int]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT day, SUM(count), SUM(score_sum), SUM(positive), SUM(negative)"
+                " FROM daily_sentiment WHERE query = ? AND day BETWEEN ? AND ? GROUP BY day",
+                (query, first_day.isoformat(), last_day.isoformat())
+            ).fetchall()
+        return {day: (count, score_sum, positive, negative) for day, count, score_sum, positive, negative in rows}
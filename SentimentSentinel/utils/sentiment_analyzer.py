@@ -1,15 +1,51 @@
-import nltk
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
+import numpy as np
+import pandas as pd
 import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Iterable, Optional, Union
 
-# Initialize NLTK resources
-try:
-    nltk.data.find('vader_lexicon')
-except LookupError:
-    nltk.download('vader_lexicon')
+@lru_cache(maxsize=None)
+def get_analyzer():
+    """
+    Shared VADER analyzer, created on first use.
+    
+    NLTK is only imported, and the VADER lexicon only downloaded if missing,
+    when sentiment is first scored locally, so importing this module stays
+    cheap.
+    
+    Returns:
+        SentimentIntensityAnalyzer: Initialized analyzer
+    """
+    import nltk
+    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+    
+    # Initialize NLTK resources
+    try:
+        nltk.data.find('sentiment/vader_lexicon.zip')
+    except LookupError:
+        nltk.download('vader_lexicon')
+    
+    return SentimentIntensityAnalyzer()
+
+def __getattr__(name):
+    # Keep the old module-level ``sia`` working without building it at import
+    if name == 'sia':
+        return get_analyzer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# URLs, removed before anything else: a URL inside a mention ("@abwww.x")
+# has to go first for the mention to end where it always did
+_URL_PATTERN = re.compile(r'https?://\S+|www\.\S+')
+
+# Mentions (with any whitespace around them) or runs of whitespace, matched
+# in a single pass once the URLs are gone
+_CLEAN_PATTERN = re.compile(r'(?:\s*@\w+)+\s*|\s+')
 
-# Initialize sentiment analyzer
-sia = SentimentIntensityAnalyzer()
+_WHITESPACE = re.compile(r'\s')
+
+# Batches at least this large are scored on a process pool
+PROCESS_POOL_THRESHOLD = 20000
 
 def analyze_sentiment(text, language_code="en"):
     """
@@ -30,7 +66,7 @@ def analyze_sentiment(text, language_code="en"):
     text = clean_text(text)
     
     # Use VADER for sentiment analysis
-    scores = sia.polarity_scores(text)
+    scores = get_analyzer().polarity_scores(text)
     
     # Return the compound score which is in range [-1, 1]
     return scores['compound']
@@ -48,16 +84,61 @@ def clean_text(text):
     if not text:
         return ""
         
-    # Convert to lowercase
-    text = text.lower()
+    # Convert to lowercase and remove URLs, then remove mentions and
+    # collapse whitespace in one pass
+    text = _URL_PATTERN.sub('', text.lower())
+    return _CLEAN_PATTERN.sub(_clean_replacement, text).strip()
+
+def _clean_replacement(match):
+    # Removed mentions only leave a space behind if whitespace was
+    # part of the match, the same result as removing them and then
+    # collapsing whitespace
+    return ' ' if _WHITESPACE.search(match.group()) else ''
+
+def _score_cleaned(texts):
+    sia = get_analyzer()
+    return [sia.polarity_scores(text)['compound'] if text else 0.0 for text in texts]
+
+def analyze_sentiment_batch(texts: Union[Iterable[str], pd.Series],
+                            processes: Optional[int] = None,
+                            chunk_size: int = 5000) -> np.ndarray:
+    """
+    Analyze sentiment of many texts with VADER.
     
-    # Remove URLs
-    text = re.sub(r'https?://\S+|www\.\S+', '', text)
+    Texts are cleaned with the same rules as clean_text and identical
+    cleaned texts are scored once. Batches of at least
+    PROCESS_POOL_THRESHOLD distinct texts are split across a process pool.
+    
+    Args:
+        texts (Union[Iterable[str], pd.Series]): Texts to analyze; missing
+            values score 0.0
+        processes (Optional[int]): Worker processes for large batches
+            (None uses the CPU count, 1 disables the pool)
+        chunk_size (int): Texts per task sent to a worker process
+        
+    Returns:
+        np.ndarray: Compound scores between -1 and 1, in input order
+    """
+    texts = pd.Series(texts, dtype=object) if not isinstance(texts, pd.Series) else texts
+    if texts.empty:
+        return np.zeros(0, dtype=np.float64)
     
-    # Remove mentions 
-    text = re.sub(r'@\w+', '', text)
+    cleaned = (
+        texts.fillna('')
+        .astype(str)
+        .str.lower()
+        .str.replace(_URL_PATTERN, '', regex=True)
+        .str.replace(_CLEAN_PATTERN, _clean_replacement, regex=True)
+        .str.strip()
+    )
+    codes, uniques = pd.factorize(cleaned)
+    uniques = list(uniques)
     
-    # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
+    if processes != 1 and len(uniques) >= PROCESS_POOL_THRESHOLD:
+        chunks = [uniques[i:i + chunk_size] for i in range(0, len(uniques), chunk_size)]
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            unique_scores = [score for chunk in executor.map(_score_cleaned, chunks) for score in chunk]
+    else:
+        unique_scores = _score_cleaned(uniques)
     
-    return text
+    return np.asarray(unique_scores, dtype=np.float64)[codes]
@@ -0,0 +1,190 @@
+import asyncio
+import random
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Protocol, runtime_checkable
+
+from utils.tiered_scorer import vader_to_scale
+
+
+@runtime_checkable
+class SentimentBackend(Protocol):
+    """
+    Scores headlines on the pipeline's -10..10 scale.
+
+    Neutral headlines score None, like normalize_score. ``score_batch``
+    raises when the request as a whole fails; headlines it leaves out of
+    the result could not be parsed and are scored one at a time by the
+    caller. ``model_name`` and ``version`` key the score cache, so bump the
+    version whenever a backend's scores change. Requests to backends that
+    aren't ``local`` are paced by the pipeline's rate limiter.
+    """
+
+    model_name: str
+    version: str
+    local: bool
+
+    def score(self, text: str) -> Optional[int]:
+        ...
+
+    def score_batch(self, texts: List[str]) -> Dict[int, Optional[int]]:
+        ...
+
+    async def ascore(self, text: str) -> Optional[int]:
+        ...
+
+    async def ascore_batch(self, texts: List[str]) -> Dict[int, Optional[int]]:
+        ...
+
+
+class BaseBackend:
+    """
+    Async methods for backends whose client is synchronous, run on a worker thread.
+    """
+
+    async def ascore(self, text: str) -> Optional[int]:
+        return await asyncio.get_running_loop().run_in_executor(None, self.score, text)
+
+    async def ascore_batch(self, texts: List[str]) -> Dict[int, Optional[int]]:
+        return await asyncio.get_running_loop().run_in_executor(None, self.score_batch, texts)
+
+
+class GeminiBackend(BaseBackend):
+    """
+    Gemini through the shared client registry, with the single and batch prompts.
+    """
+
+    local = False
+
+    def __init__(self, api_key: str, model_name: Optional[str] = None):
+        from utils import news_api
+
+        self.api_key = api_key
+        self.model_name = model_name or news_api.GEMINI_MODEL_NAME
+        self.version = news_api.PROMPT_VERSION
+
+    def score(self, text: str) -> Optional[int]:
+        from utils.news_api import _request_sentiment
+
+        return _request_sentiment(text, self.api_key, self.model_name)
+
+    def score_batch(self, texts: List[str]) -> Dict[int, Optional[int]]:
+        from utils.news_api import _request_sentiment_batch
+
+        return _request_sentiment_batch(texts, self.api_key, self.model_name)
+
+
+class VaderBackend(BaseBackend):
+    """
+    Local VADER scoring, with compound scores mapped onto -10..10.
+
+    Needs no API quota, so it also serves as an offline fallback.
+    """
+
+    model_name = "vader"
+    version = "1"
+    local = True
+
+    def score(self, text: str) -> Optional[int]:
+        return self.score_batch([text]).get(0)
+
+    def score_batch(self, texts: List[str]) -> Dict[int, Optional[int]]:
+        from utils.sentiment_analyzer import analyze_sentiment_batch
+
+        scores = vader_to_scale(analyze_sentiment_batch(texts, processes=1))
+        return {i: int(score) or None for i, score in enumerate(scores)}
+
+
+def mock_score(text: str) -> int:
+    """
+    Deterministic pseudo sentiment score in [-10, 10] for a headline.
+    """
+    return zlib.crc32(text.encode("utf-8")) % 21 - 10
+
+
+class MockBackend(BaseBackend):
+    """
+    Deterministic in-process backend for tests and load tests.
+
+    Each call waits ``latency`` seconds, and fails with a ConnectionError
+    at ``error_rate``, so retry and concurrency behaviour can be exercised
+    without a server. ``answers`` maps headlines to fixed scores. It counts
+    as remote, so the pipeline paces it like Gemini.
+    """
+
+    model_name = "mock"
+    version = "1"
+    local = False
+
+    def __init__(self,
+                 latency: float = 0.0,
+                 error_rate: float = 0.0,
+                 answers: Optional[Dict[str, int]] = None,
+                 seed: Optional[int] = None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.answers = answers or {}
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _start_request(self) -> bool:
+        """
+        Count a request and decide whether it fails.
+        """
+        with self._lock:
+            self.requests += 1
+            return self._random.random() < self.error_rate
+
+    def _request(self) -> None:
+        failed = self._start_request()
+        if self.latency:
+            time.sleep(self.latency)
+        if failed:
+            raise ConnectionError("mock backend: simulated request failure")
+
+    def _answer(self, text: str) -> Optional[int]:
+        return self.answers.get(text, mock_score(text)) or None
+
+    def score(self, text: str) -> Optional[int]:
+        self._request()
+        return self._answer(text)
+
+    def score_batch(self, texts: List[str]) -> Dict[int, Optional[int]]:
+        self._request()
+        return {i: self._answer(text) for i, text in enumerate(texts)}
+
+    async def ascore(self, text: str) -> Optional[int]:
+        return (await self.ascore_batch([text]))[0]
+
+    async def ascore_batch(self, texts: List[str]) -> Dict[int, Optional[int]]:
+        failed = self._start_request()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if failed:
+            raise ConnectionError("mock backend: simulated request failure")
+        return {i: self._answer(text) for i, text in enumerate(texts)}
+
+
+# Names accepted by get_backend and the CLI's --backend option
+BACKENDS = ("gemini", "vader", "mock")
+
+
+def get_backend(name: str, api_key: Optional[str] = None) -> SentimentBackend:
+    """
+    Build a backend by name.
+
+    Args:
+        name (str): One of BACKENDS
+        api_key (Optional[str]): Gemini API key (required for "gemini")
+    """
+    if name == "gemini":
+        if not api_key:
+            raise ValueError("the gemini backend needs an API key")
+        return GeminiBackend(api_key)
+    if name == "vader":
+        return VaderBackend()
+    if name == "mock":
+        return MockBackend()
+    raise ValueError(f"unknown sentiment backend {name!r}; expected one of {', '.join(BACKENDS)}")
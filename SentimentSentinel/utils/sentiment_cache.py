@@ -0,0 +1,275 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional
+
+# Default location of the on-disk cache, next to the app
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")
+DEFAULT_CACHE_PATH = os.environ.get(
+    "SENTIGRADE_SENTIMENT_CACHE",
+    os.path.join(DEFAULT_CACHE_DIR, "sentiment_cache.sqlite3")
+)
+
+DEFAULT_TTL_SECONDS = 30 * 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 100_000
+DEFAULT_MEMORY_ENTRIES = 4096
+
+# Memory hits whose access times are written back to disk together
+TOUCH_BATCH = 256
+
+# Writes between sweeps of expired rows and recounts of the table, which
+# both scan it; in between, the row count is tracked from the inserts
+SWEEP_INTERVAL = 256
+
+# An overflowing table is trimmed to this share of max_entries, so the next
+# trim is a while away rather than due on the next write
+TRIM_TO = 0.9
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_headline(text: str) -> str:
+    """
+    Normalize a headline so trivially different copies share a cache entry.
+    """
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+def make_key(text: str, model_name: str, prompt_version: str) -> str:
+    """
+    Content-addressed cache key for a headline scored by a model and prompt.
+
+    Args:
+        text (str): Headline
+        model_name (str): Model used to score it
+        prompt_version (str): Version of the prompt used to score it
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    payload = "\x1f".join((normalize_headline(text), model_name, prompt_version))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SentimentCache:
+    """
+    Two-tier cache of headline sentiment scores.
+
+    An in-process LRU sits in front of a SQLite table. Entries expire after
+    ``ttl_seconds`` and the table is trimmed to ``max_entries`` by least
+    recent access; hits served from memory count as accesses too, written
+    to disk in batches. Scores are stored as returned by the scorer, with
+    None meaning the headline was scored as neutral.
+    """
+
+    def __init__(self,
+                 path: str = DEFAULT_CACHE_PATH,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            path (str): SQLite database file (":memory:" for a throwaway cache)
+            ttl_seconds (float): Lifetime of an entry
+            max_entries (int): Maximum number of rows kept on disk
+            memory_entries (int): Maximum number of entries kept in memory
+            clock (Callable[[], float]): Wall clock in seconds, stamped on
+                entries for expiry and access order
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._clock = clock
+
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        # Access times of memory hits not yet written to disk
+        self._touched = {}
+        self._writes_since_sweep = 0
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sentiment_cache ("
+            " key TEXT PRIMARY KEY,"
+            " score INTEGER,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS sentiment_cache_accessed ON sentiment_cache (accessed_at)"
+        )
+        (self._disk_rows,) = self._conn.execute("SELECT COUNT(*) FROM sentiment_cache").fetchone()
+        self._conn.commit()
+
+    def _remember(self, key: str, score: Optional[int], created_at: float) -> None:
+        self._memory[key] = (score, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Optional[int]]:
+        """
+        Look up several keys at once.
+
+        Returns:
+            Dict[str, Optional[int]]: Scores for the keys that were found and
+            not expired; missing keys are absent from the result
+        """
+        now = self._clock()
+        expiry = now - self.ttl_seconds
+        found = {}
+        with self._lock:
+            pending = []
+            for key in dict.fromkeys(keys):
+                entry = self._memory.get(key)
+                if entry is not None and entry[1] >= expiry:
+                    self._memory.move_to_end(key)
+                    found[key] = entry[0]
+                    self._touched[key] = now
+                    self.memory_hits += 1
+                else:
+                    self._memory.pop(key, None)
+                    pending.append(key)
+
+            # SQLite caps the number of bound parameters per statement
+            for i in range(0, len(pending), 500):
+                chunk = pending[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, score, created_at FROM sentiment_cache "
+                    f"WHERE key IN ({placeholders}) AND created_at >= ?",
+                    (*chunk, expiry)
+                ).fetchall()
+                for key, score, created_at in rows:
+                    found[key] = score
+                    self._remember(key, score, created_at)
+                if rows:
+                    self._conn.executemany(
+                        "UPDATE sentiment_cache SET accessed_at = ? WHERE key = ?",
+                        [(now, row[0]) for row in rows]
+                    )
+            flush = len(self._touched) >= TOUCH_BATCH
+            if flush:
+                self._flush_touched()
+            if pending or flush:
+                self._conn.commit()
+
+            self.hits += len(found)
+            self.misses += sum(1 for key in pending if key not in found)
+        return found
+
+    def put_many(self, scores: Dict[str, Optional[int]]) -> None:
+        """
+        Store scores and trim the cache back under its size cap.
+        """
+        if not scores:
+            return
+        now = self._clock()
+        rows = [(key, score, now, now) for key, score in scores.items()]
+        with self._lock:
+            # New keys are counted; existing ones are overwritten in place
+            cursor = self._conn.executemany(
+                "INSERT OR IGNORE INTO sentiment_cache (key, score, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._disk_rows += max(cursor.rowcount, 0)
+            self._conn.executemany(
+                "UPDATE sentiment_cache SET score = ?, created_at = ?, accessed_at = ? WHERE key = ?",
+                [(score, created_at, accessed_at, key) for key, score, created_at, accessed_at in rows]
+            )
+            for key, score in scores.items():
+                self._remember(key, score, now)
+                self._touched.pop(key, None)
+            self._writes_since_sweep += 1
+            if self._writes_since_sweep >= SWEEP_INTERVAL or self._disk_rows > self.max_entries:
+                self._evict(now)
+            self._conn.commit()
+
+    def _flush_touched(self) -> None:
+        """
+        Write the access times of memory hits back to disk; the caller commits.
+        """
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE sentiment_cache SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def _evict(self, now: float) -> None:
+        """
+        Drop expired rows and, if the table is over max_entries, the least
+        recently accessed ones down to TRIM_TO of it. Other processes share
+        the table, so the row count is taken afresh here.
+        """
+        self._writes_since_sweep = 0
+        self._flush_touched()
+        cursor = self._conn.execute(
+            "DELETE FROM sentiment_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+        )
+        self.evictions += max(cursor.rowcount, 0)
+        (self._disk_rows,) = self._conn.execute("SELECT COUNT(*) FROM sentiment_cache").fetchone()
+        if self._disk_rows > self.max_entries:
+            cursor = self._conn.execute(
+                "DELETE FROM sentiment_cache WHERE key IN ("
+                " SELECT key FROM sentiment_cache ORDER BY accessed_at LIMIT ?)",
+                (self._disk_rows - int(self.max_entries * TRIM_TO),)
+            )
+            self.evictions += max(cursor.rowcount, 0)
+            self._disk_rows -= max(cursor.rowcount, 0)
+
+    def clear(self) -> None:
+        """
+        Drop every entry from both tiers.
+        """
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+            self._conn.execute("DELETE FROM sentiment_cache")
+            self._disk_rows = 0
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Hit/miss counters since the cache was opened.
+        """
+        with self._lock:
+            (disk_entries,) = self._conn.execute("SELECT COUNT(*) FROM sentiment_cache").fetchone()
+            return {
+                'hits': self.hits,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.hits - self.memory_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'memory_entries': len(self._memory),
+                'disk_entries': disk_entries,
+            }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> SentimentCache:
+    """
+    Process-wide cache shared by every session.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = SentimentCache()
+        return _default_cache
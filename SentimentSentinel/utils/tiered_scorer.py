@@ -0,0 +1,92 @@
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.sentiment_analyzer import analyze_sentiment_batch
+
+# VADER compound scores inside this band are too uncertain to trust and are
+# sent to Gemini
+DEFAULT_UNCERTAINTY_BAND = (-0.5, 0.5)
+
+
+def vader_to_scale(compound: np.ndarray) -> np.ndarray:
+    """
+    Map VADER compound scores in [-1, 1] onto Gemini's -10..10 scale.
+
+    Args:
+        compound (np.ndarray): Compound scores
+
+    Returns:
+        np.ndarray: Rounded integer scores between -10 and 10
+    """
+    return np.clip(np.rint(np.asarray(compound, dtype=np.float64) * 10), -10, 10).astype(np.int64)
+
+
+class TieredRouter:
+    """
+    Routes headlines between local VADER scoring and Gemini.
+
+    Every headline is scored locally first. Headlines whose compound score
+    falls inside ``band`` (inclusive) are ambiguous and left for Gemini; the
+    rest keep their local score mapped onto the -10..10 scale. Routing
+    counters are kept across calls.
+    """
+
+    def __init__(self, band: Tuple[float, float] = DEFAULT_UNCERTAINTY_BAND):
+        """
+        Args:
+            band (Tuple[float, float]): (low, high) compound scores treated as ambiguous
+        """
+        low, high = band
+        if low > high:
+            raise ValueError("band must be (low, high) with low <= high")
+        self.band = (float(low), float(high))
+        self.local = 0
+        self.remote = 0
+        self._lock = threading.Lock()
+
+    def route(self, titles: List[str]) -> Tuple[List[Tuple[int, Optional[int]]], List[int]]:
+        """
+        Score headlines locally and pick out the ambiguous ones.
+
+        Args:
+            titles (List[str]): Headlines to score
+
+        Returns:
+            Tuple[List[Tuple[int, Optional[int]]], List[int]]: (position, score)
+            pairs for confidently scored headlines, and the positions of
+            headlines that need Gemini
+        """
+        if not titles:
+            return [], []
+
+        compound = analyze_sentiment_batch(titles)
+        low, high = self.band
+        ambiguous = (compound >= low) & (compound <= high)
+        scores = vader_to_scale(compound)
+
+        # A confident score never rounds to 0 unless the band is empty
+        local = [
+            (int(position), int(scores[position]) or None)
+            for position in np.flatnonzero(~ambiguous)
+        ]
+        remote = [int(position) for position in np.flatnonzero(ambiguous)]
+
+        with self._lock:
+            self.local += len(local)
+            self.remote += len(remote)
+        return local, remote
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Routing counters since the router was created.
+        """
+        with self._lock:
+            total = self.local + self.remote
+            return {
+                'total': total,
+                'local': self.local,
+                'gemini': self.remote,
+                'quota_saved': self.local / total if total else 0.0,
+            }
@@ -0,0 +1,257 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, TypeVar
+
+T = TypeVar("T")
+
+logger = logging.getLogger("sentigrade.trace")
+
+# Set SENTIGRADE_TRACE_LOG to a file path to append every finished trace
+# to it as one JSON line
+TRACE_LOG_PATH = os.environ.get("SENTIGRADE_TRACE_LOG")
+
+# Set SENTIGRADE_OTEL=0 to skip OpenTelemetry even when it is installed
+OTEL_ENABLED = os.environ.get("SENTIGRADE_OTEL", "1") != "0"
+
+
+class SpanRecord(NamedTuple):
+    """
+    One timed stage: seconds from the start of its trace, and its duration.
+    """
+    name: str
+    start: float
+    duration: float
+    thread: str
+    attributes: Dict[str, object]
+
+
+class Trace:
+    """
+    Spans and counters recorded while handling one request.
+
+    A trace is current on the thread that opened it with ``trace()`` and on
+    worker threads started by the pipeline (see reporting's
+    script_context_initializer), so stages running in parallel all land in
+    the same trace.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.duration = None
+        self.spans = []
+        self.counters = Counter()
+        self._lock = threading.Lock()
+
+    def add_span(self, name: str, started: float, duration: float, attributes: Dict[str, object]) -> None:
+        record = SpanRecord(name, started - self.started, duration, threading.current_thread().name, attributes)
+        with self._lock:
+            self.spans.append(record)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += amount
+
+    def summary(self) -> List[Dict[str, object]]:
+        """
+        Time per stage, slowest total first.
+
+        Returns:
+            List[Dict[str, object]]: Per span name, the number of spans and
+            their total, mean and longest duration in milliseconds
+        """
+        durations = defaultdict(list)
+        with self._lock:
+            for span in self.spans:
+                durations[span.name].append(span.duration)
+        rows = [
+            {
+                'stage': name,
+                'count': len(values),
+                'total_ms': round(sum(values) * 1000, 2),
+                'mean_ms': round(sum(values) / len(values) * 1000, 2),
+                'max_ms': round(max(values) * 1000, 2),
+            }
+            for name, values in durations.items()
+        ]
+        return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+
+    def to_dict(self) -> Dict[str, object]:
+        with self._lock:
+            counters = dict(self.counters)
+        return {
+            'trace': self.name,
+            'duration_ms': round(self.duration * 1000, 2) if self.duration is not None else None,
+            'stages': self.summary(),
+            'counters': counters,
+        }
+
+
+_local = threading.local()
+
+# Totals since the process started, across every trace
+_totals_lock = threading.Lock()
+_span_totals = defaultdict(lambda: [0, 0.0, 0.0])
+_counter_totals = Counter()
+
+
+def current_trace() -> Optional[Trace]:
+    return getattr(_local, "trace", None)
+
+
+def attach(trace: Optional[Trace]) -> None:
+    """
+    Make ``trace`` current on this thread, e.g. in a thread pool initializer.
+    """
+    _local.trace = trace
+
+
+@lru_cache(maxsize=None)
+def _otel_tracer():
+    """
+    OpenTelemetry tracer if the API is installed, else None.
+
+    Spans are only exported if the application configured an OpenTelemetry
+    SDK; without one the API's tracer does nothing.
+    """
+    if not OTEL_ENABLED:
+        return None
+    try:
+        from opentelemetry import trace as otel_trace
+    except ImportError:
+        return None
+    return otel_trace.get_tracer("sentigrade")
+
+
+@lru_cache(maxsize=None)
+def _trace_log_handler() -> Optional[logging.Handler]:
+    if not TRACE_LOG_PATH:
+        return None
+    os.makedirs(os.path.dirname(os.path.abspath(TRACE_LOG_PATH)), exist_ok=True)
+    handler = logging.FileHandler(TRACE_LOG_PATH, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    return handler
+
+
+def record(name: str, duration: float, **attributes) -> None:
+    """
+    Record a stage that was timed elsewhere, e.g. a rate limiter's wait.
+    """
+    with _totals_lock:
+        totals = _span_totals[name]
+        totals[0] += 1
+        totals[1] += duration
+        totals[2] = max(totals[2], duration)
+    trace_ = current_trace()
+    if trace_ is not None:
+        trace_.add_span(name, time.perf_counter() - duration, duration, attributes)
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[None]:
+    """
+    Time a stage and record it in the current trace and the process totals.
+
+    Also opens an OpenTelemetry span of the same name when the API is
+    installed.
+    """
+    tracer = _otel_tracer()
+    otel_span = tracer.start_as_current_span(name, attributes=attributes) if tracer is not None else None
+    started = time.perf_counter()
+    try:
+        if otel_span is None:
+            yield
+        else:
+            with otel_span:
+                yield
+    finally:
+        record(name, time.perf_counter() - started, **attributes)
+
+
+def timed(name: str, fn: Callable[..., T], counter: Optional[str] = None, **attributes) -> Callable[..., T]:
+    """
+    Wrap ``fn`` so every call is timed as a span, e.g. inside a rate limiter
+    so only the request itself is timed, not the wait for a token.
+
+    Args:
+        name (str): Span name
+        fn (Callable[..., T]): Function to time
+        counter (Optional[str]): Counter to increment on every call
+        **attributes: Span attributes
+    """
+    def wrapper(*args, **kwargs) -> T:
+        if counter is not None:
+            increment(counter)
+        with span(name, **attributes):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def increment(name: str, amount: int = 1) -> None:
+    """
+    Add to a counter in the current trace and the process totals.
+    """
+    if not amount:
+        return
+    with _totals_lock:
+        _counter_totals[name] += amount
+    trace_ = current_trace()
+    if trace_ is not None:
+        trace_.increment(name, amount)
+
+
+@contextmanager
+def trace(name: str) -> Iterator[Trace]:
+    """
+    Collect the spans and counters of one request.
+
+    When the block ends, the trace's summary is logged to the
+    ``sentigrade.trace`` logger (and SENTIGRADE_TRACE_LOG, if set).
+    """
+    previous = current_trace()
+    trace_ = Trace(name)
+    attach(trace_)
+    try:
+        with span(name):
+            yield trace_
+    finally:
+        trace_.duration = time.perf_counter() - trace_.started
+        attach(previous)
+        _log(trace_)
+
+
+def _log(trace_: Trace) -> None:
+    stages = ", ".join(
+        f"{row['stage']} {row['count']}x {row['total_ms']:.0f}ms" for row in trace_.summary() if row['stage'] != trace_.name
+    )
+    counters = ", ".join(f"{name}={count}" for name, count in sorted(trace_.counters.items()))
+    logger.info("%s took %.0fms: %s%s", trace_.name, trace_.duration * 1000, stages or "no stages",
+                f" [{counters}]" if counters else "")
+    handler = _trace_log_handler()
+    if handler is not None:
+        handler.handle(logger.makeRecord(logger.name, logging.INFO, __file__, 0,
+                                         json.dumps(trace_.to_dict()), None, None))
+
+
+def stats() -> Dict[str, Dict]:
+    """
+    Span and counter totals since the process started.
+
+    Returns:
+        Dict[str, Dict]: 'spans' maps each stage to its count, total and
+        longest duration in milliseconds; 'counters' maps counter names to values
+    """
+    with _totals_lock:
+        return {
+            'spans': {
+                name: {'count': count, 'total_ms': round(total * 1000, 2), 'max_ms': round(longest * 1000, 2)}
+                for name, (count, total, longest) in _span_totals.items()
+            },
+            'counters': dict(_counter_totals),
+        }
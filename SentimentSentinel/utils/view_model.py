@@ -0,0 +1,346 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+# View models kept in memory, most recently used last
+MAX_VIEW_MODELS = 32
+
+# Google palette used across the dashboard
+POSITIVE_COLOR = "#34A853"
+NEUTRAL_COLOR = "#FBBC05"
+NEGATIVE_COLOR = "#EA4335"
+UNKNOWN_COLOR = "#9AA0A6"
+
+CARD_TEMPLATE = """
+        <div class="news-card">
+            <div style="display: flex; justify-content: space-between; align-items: flex-start;">
+                <div style="flex: 1;">
+                    <h4 style="margin-top: 0; font-family: 'Google Sans', 'Roboto', Arial, sans-serif; font-weight: 400; color: #202124;">
+                        <a href="{link}" target="_blank" style="color: #1a73e8; text-decoration: none;">
+                            {title}
+                        </a>
+                    </h4>
+                    <p style="color: #5f6368; margin-bottom: 8px; font-size: 14px; font-family: 'Roboto', Arial, sans-serif;">
+                        <span style="font-weight: 500;">Source:</span> {source} |
+                        <span style="font-weight: 500;">Query:</span> {query}
+                    </p>
+                    <p style="margin-bottom: 0; color: #3c4043; font-family: 'Roboto', Arial, sans-serif; line-height: 1.5;">
+                        {snippet}
+                    </p>
+                </div>
+                <div style="margin-left: 15px;">
+                    <span class="sentiment-badge {sentiment}">{label}<br>{score:.2f}</span>
+                </div>
+            </div>
+        </div>"""
+
+
+class DashboardViewModel(NamedTuple):
+    """
+    Everything the dashboard renders for one analysis result.
+    """
+    total_articles: int
+    positive_articles: int
+    neutral_articles: int
+    negative_articles: int
+    overall_sentiment: Optional[float]
+    sentiment_label: str
+    sentiment_color: str
+    figures: Dict[str, object]
+    cards_html: str
+
+
+def content_hash(news_data: pd.DataFrame) -> str:
+    """
+    Hash of a DataFrame's contents, used to memoize its view model.
+    """
+    row_hashes = pd.util.hash_pandas_object(news_data, index=True).to_numpy()
+    digest = hashlib.sha1(row_hashes.tobytes())
+    digest.update(",".join(map(str, news_data.columns)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def overall_sentiment(news_data: pd.DataFrame) -> Optional[float]:
+    """
+    Mean sentiment counting each story once.
+
+    Rows marked as near-duplicates of another headline are left out, so a
+    wire story carried by many sites doesn't outweigh the rest.
+
+    Returns:
+        Optional[float]: Mean score, or None without articles
+    """
+    if news_data.empty:
+        return None
+    if 'duplicate_of' in news_data.columns:
+        news_data = news_data[news_data['duplicate_of'].isna()]
+    return news_data['sentiment_score'].mean()
+
+
+def sentiment_label_and_color(overall_sentiment: Optional[float]):
+    """
+    Label and color for the overall sentiment using Google's palette.
+    """
+    if overall_sentiment is None:
+        return "Unknown", UNKNOWN_COLOR
+    elif overall_sentiment > 0.05:
+        return "Positive", POSITIVE_COLOR
+    elif overall_sentiment < -0.05:
+        return "Negative", NEGATIVE_COLOR
+    else:
+        return "Neutral", NEUTRAL_COLOR
+
+
+def _build_figures(news_df: pd.DataFrame, overall_sentiment: Optional[float], sentiment_color: str) -> Dict[str, object]:
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    figures = {}
+
+    # Create a professional gauge chart for sentiment
+    fig = go.Figure(go.Indicator(
+        mode = "gauge+number",
+        value = overall_sentiment,
+        domain = {'x': [0, 1], 'y': [0, 1]},
+        title = {'text': "Sentiment Gauge", 'font': {'size': 24}},
+        gauge = {
+            'axis': {'range': [-1, 1], 'tickwidth': 1, 'tickcolor': "darkblue"},
+            'bar': {'color': sentiment_color},
+            'bgcolor': "white",
+            'borderwidth': 2,
+            'bordercolor': "gray",
+            'steps': [
+                {'range': [-1, -0.05], 'color': 'rgba(234, 67, 53, 0.3)'},  # Google red
+                {'range': [-0.05, 0.05], 'color': 'rgba(251, 188, 5, 0.3)'}, # Google yellow
+                {'range': [0.05, 1], 'color': 'rgba(52, 168, 83, 0.3)'}      # Google green
+            ],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': overall_sentiment
+            }
+        }
+    ))
+
+    fig.update_layout(
+        height=300,
+        margin=dict(l=20, r=20, t=50, b=20),
+        paper_bgcolor="white",
+        font={"color": "#1f77b4", "family": "Arial"}
+    )
+    figures['gauge'] = fig
+
+    # Sentiment distribution chart - upgraded pie chart
+    sentiment_counts = news_df['sentiment_category'].value_counts().reset_index()
+    sentiment_counts.columns = ['Sentiment', 'Count']
+
+    # Set a custom color scale for sentiment categories using Google colors
+    color_map = {'positive': POSITIVE_COLOR, 'neutral': NEUTRAL_COLOR, 'negative': NEGATIVE_COLOR}
+
+    fig = px.pie(
+        sentiment_counts,
+        values='Count',
+        names='Sentiment',
+        title="<b>Sentiment Distribution</b>",
+        color='Sentiment',
+        color_discrete_map=color_map,
+        hole=0.4,
+    )
+
+    fig.update_traces(
+        textinfo='percent+label',
+        textfont_size=14,
+        marker=dict(line=dict(color='#FFFFFF', width=2))
+    )
+
+    fig.update_layout(
+        legend_title_text='',
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=-0.1,
+            xanchor="center",
+            x=0.5
+        ),
+        height=350,
+        margin=dict(l=20, r=20, t=50, b=80),
+        title_x=0.5,
+        paper_bgcolor="white",
+        font={"family": "Arial"}
+    )
+    figures['distribution'] = fig
+
+    # Top headlines by absolute sentiment; the sort is stable so ties keep
+    # their original order
+    sorted_df = news_df.head(8)
+
+    # Create a custom color scale based on sentiment values
+    fig = px.bar(
+        sorted_df,
+        x='sentiment_score',
+        y='short_title',
+        orientation='h',
+        title="<b>Top Headlines by Sentiment Impact</b>",
+        color='sentiment_score',
+        color_continuous_scale=[NEGATIVE_COLOR, NEUTRAL_COLOR, POSITIVE_COLOR],  # Google colors
+        labels={'sentiment_score': 'Sentiment Score', 'short_title': 'Headline'}
+    )
+
+    # Add a vertical line at x=0 to indicate neutral sentiment
+    fig.add_vline(x=0, line_dash="dash", line_color="gray")
+
+    # Format the y-axis labels to truncate long headlines
+    fig.update_traces(hovertemplate='<b>%{customdata}</b><br>Sentiment: %{x:.2f}', customdata=sorted_df['title'])
+
+    fig.update_layout(
+        height=300,
+        margin=dict(l=20, r=20, t=50, b=20),
+        title_x=0.5,
+        xaxis_title="Sentiment Score",
+        yaxis_title="",
+        coloraxis_colorbar=dict(
+            title="Sentiment",
+            tickvals=[-1, 0, 1],
+            ticktext=["Negative", "Neutral", "Positive"],
+        ),
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        font={"family": "Arial"}
+    )
+    figures['headlines'] = fig
+
+    # Source distribution
+    source_sentiment = news_df.groupby('source', observed=True)['sentiment_score'].mean().reset_index()
+    source_sentiment = source_sentiment.sort_values('sentiment_score', ascending=False)
+
+    fig = px.bar(
+        source_sentiment,
+        x='source',
+        y='sentiment_score',
+        title="<b>Average Sentiment by News Source</b>",
+        color='sentiment_score',
+        color_continuous_scale=[NEGATIVE_COLOR, NEUTRAL_COLOR, POSITIVE_COLOR],  # Google colors
+        labels={'sentiment_score': 'Avg. Sentiment', 'source': 'News Source'}
+    )
+
+    fig.add_hline(y=0, line_dash="dash", line_color="gray")
+
+    fig.update_layout(
+        height=350,
+        margin=dict(l=20, r=20, t=50, b=80),
+        title_x=0.5,
+        xaxis_title="",
+        yaxis_title="Average Sentiment",
+        xaxis_tickangle=-45,
+        paper_bgcolor="white",
+        plot_bgcolor="white",
+        font={"family": "Arial"}
+    )
+    figures['sources'] = fig
+
+    return figures
+
+
+def _render_cards(news_df: pd.DataFrame) -> str:
+    """
+    HTML for every article card, rendered in a single pass.
+    """
+    return "\n".join(
+        CARD_TEMPLATE.format(
+            link=link, title=title, source=source, query=query, snippet=snippet,
+            sentiment=sentiment, label=sentiment.upper(), score=score
+        )
+        for link, title, source, query, snippet, sentiment, score in zip(
+            news_df['link'], news_df['title'], news_df['source'], news_df['query'],
+            news_df['snippet'], news_df['sentiment_category'], news_df['sentiment_score']
+        )
+    )
+
+
+def build_view_model(news_data: pd.DataFrame, overall_sentiment: Optional[float]) -> DashboardViewModel:
+    """
+    Compute counts, categories, figures and card HTML for an analysis result.
+
+    Args:
+        news_data (pd.DataFrame): Output of fetch_and_analyze_news
+        overall_sentiment (Optional[float]): Mean sentiment score
+
+    Returns:
+        DashboardViewModel: Precomputed dashboard contents
+    """
+    scores = news_data['sentiment_score'].to_numpy()
+    total_articles = len(news_data)
+    positive_articles = int((scores > 0.05).sum())
+    negative_articles = int((scores < -0.05).sum())
+    neutral_articles = total_articles - positive_articles - negative_articles
+
+    sentiment_label, sentiment_color = sentiment_label_and_color(overall_sentiment)
+
+    # Vectorized equivalents of categorize_sentiment, abs() and title truncation,
+    # sorted once by absolute sentiment for both the bar chart and the cards
+    titles = news_data['title'].astype(str)
+    news_df = pd.DataFrame({
+        'query': news_data['query'],
+        'title': titles,
+        'link': news_data['link'],
+        'snippet': news_data['snippet'],
+        'source': news_data['source'],
+        'sentiment_score': news_data['sentiment_score'],
+        'sentiment_category': np.where(scores > 0, "positive", "negative"),
+        'abs_sentiment': np.abs(scores),
+        'short_title': titles.str.slice(0, 40) + np.where(titles.str.len() > 40, '...', ''),
+    }).sort_values('abs_sentiment', ascending=False, kind='stable')
+
+    return DashboardViewModel(
+        total_articles=total_articles,
+        positive_articles=positive_articles,
+        neutral_articles=neutral_articles,
+        negative_articles=negative_articles,
+        overall_sentiment=overall_sentiment,
+        sentiment_label=sentiment_label,
+        sentiment_color=sentiment_color,
+        figures=_build_figures(news_df, overall_sentiment, sentiment_color),
+        cards_html=_render_cards(news_df),
+    )
+
+
+_view_models = OrderedDict()
+_view_models_lock = threading.Lock()
+
+
+def get_view_model(news_data: pd.DataFrame,
+                   overall_sentiment: Optional[float],
+                   data_hash: Optional[str] = None) -> DashboardViewModel:
+    """
+    Memoized build_view_model, keyed on the content hash of ``news_data``.
+
+    Args:
+        news_data (pd.DataFrame): Output of fetch_and_analyze_news
+        overall_sentiment (Optional[float]): Mean sentiment score
+        data_hash (Optional[str]): Precomputed content_hash(news_data), so
+            reruns skip hashing the data again
+
+    Returns:
+        DashboardViewModel: Precomputed dashboard contents
+    """
+    if data_hash is None:
+        data_hash = content_hash(news_data)
+    key = (data_hash, overall_sentiment)
+
+    with _view_models_lock:
+        view_model = _view_models.get(key)
+        if view_model is not None:
+            _view_models.move_to_end(key)
+            return view_model
+
+    view_model = build_view_model(news_data, overall_sentiment)
+
+    with _view_models_lock:
+        _view_models[key] = view_model
+        while len(_view_models) > MAX_VIEW_MODELS:
+            _view_models.popitem(last=False)
+    return view_model